@@ -0,0 +1,77 @@
+"""Audits, and optionally cleans, the shading group assignments of many scene files under a headless interpreter.
+
+Usage: mayapy -m batch.run_audit PATH [PATH ...] [--file-list FILE] --report report.jsonl
+           [--strip-components] [--remove-empty] [--save] [--save-suffix _clean]
+           [--processes 4] [--max-tasks-per-child 50] [--timeout 3600] [--extensions .ma,.mb] [--backend maya]
+
+Paths may be scene files or directories, which are searched recursively for files with the given extensions.
+Files saved by an earlier run with the save suffix are not audited again.
+Running the same command again resumes an interrupted run from its report.
+"""
+import argparse
+import os
+
+from models.batch_auditor import (AuditOptions, BACKEND_FACTORIES, DEFAULT_MAX_TASKS_PER_CHILD, DEFAULT_TASK_TIMEOUT,
+                                  run_audit)
+
+
+def collect_paths(paths, extensions):
+    scene_paths = []
+    for path in paths:
+        if not os.path.isdir(path):
+            scene_paths.append(os.path.abspath(path))
+            continue
+        for directory, directory_names, file_names in os.walk(path):
+            directory_names.sort()
+            for file_name in sorted(file_names):
+                if os.path.splitext(file_name)[1].lower() in extensions:
+                    scene_paths.append(os.path.abspath(os.path.join(directory, file_name)))
+    return scene_paths
+
+
+def print_progress(result, done_count, total_count):
+    print('[{0}/{1}] {2:<5} {3:7.2f}s  {4}'.format(done_count, total_count, result['status'], result['seconds'],
+                                                   result['path']))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Audit and clean shading group assignments across scene files.')
+    parser.add_argument('paths', nargs='*', help='Scene files or directories to search for scene files.')
+    parser.add_argument('--file-list', help='A text file listing one scene file per line.')
+    parser.add_argument('--report', required=True, help='The JSON lines report, which is appended to when resuming.')
+    parser.add_argument('--strip-components', action='store_true',
+                        help='Replace component assignments with an object assignment to the majority shading group.')
+    parser.add_argument('--remove-empty', action='store_true', help='Delete empty shading groups.')
+    parser.add_argument('--save', action='store_true', help='Save files that were changed.')
+    parser.add_argument('--save-suffix', default='', help='Save changed files next to the originals with this suffix.')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='The number of worker processes, defaulting to the CPU count. 0 runs in this process.')
+    parser.add_argument('--max-tasks-per-child', type=int, default=DEFAULT_MAX_TASKS_PER_CHILD)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TASK_TIMEOUT,
+                        help='Seconds to wait for the result of a file before reporting it as an error. 0 waits forever.')
+    parser.add_argument('--extensions', default='.ma,.mb')
+    parser.add_argument('--backend', default='maya', choices=sorted(BACKEND_FACTORIES))
+    arguments = parser.parse_args(args)
+
+    paths = list(arguments.paths)
+    if arguments.file_list:
+        with open(arguments.file_list) as file_list:
+            paths.extend(line.strip() for line in file_list if line.strip())
+    extensions = [extension.strip().lower() for extension in arguments.extensions.split(',')]
+
+    options = AuditOptions(remove_empty=arguments.remove_empty,
+                           strip_components=arguments.strip_components,
+                           save=arguments.save,
+                           save_suffix=arguments.save_suffix)
+    summary = run_audit(collect_paths(paths, extensions), arguments.report, options,
+                        backend_name=arguments.backend,
+                        process_count=arguments.processes,
+                        max_tasks_per_child=arguments.max_tasks_per_child,
+                        progress_func=print_progress,
+                        task_timeout=arguments.timeout or None)
+    print('{0} ok, {1} errors, {2} skipped'.format(summary['ok'], summary['error'], summary['skipped']))
+    return 0 if summary['error'] == 0 else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
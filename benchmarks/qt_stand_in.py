@@ -0,0 +1,178 @@
+"""A minimal stand-in for the parts of PySide2 that the models and the tree model use, so that benchmarks can drive
+the shipped code outside of Maya. It is only installed when PySide2 itself cannot be imported.
+Signals call their slots directly, timers never fire and item models keep no view state."""
+import sys
+import types
+
+
+class Signal(object):
+    """A class level signal declaration, which gives each instance its own bound signal."""
+
+    def __init__(self, *argument_types):
+        pass
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        bound_signals = instance.__dict__.setdefault('_bound_signals', {})
+        if id(self) not in bound_signals:
+            bound_signals[id(self)] = BoundSignal()
+        return bound_signals[id(self)]
+
+
+class BoundSignal(object):
+
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def disconnect(self, slot):
+        self.slots.remove(slot)
+
+    def emit(self, *args):
+        for slot in list(self.slots):
+            slot(*args)
+
+
+class QObject(object):
+
+    def __init__(self, parent=None):
+        self._parent = parent
+
+    def parent(self):
+        return self._parent
+
+
+class QTimer(QObject):
+
+    timeout = Signal()
+
+    def __init__(self, parent=None):
+        super(QTimer, self).__init__(parent)
+        self.active = False
+
+    def setInterval(self, interval):
+        pass
+
+    def setSingleShot(self, is_single_shot):
+        pass
+
+    def start(self, interval=None):
+        self.active = True
+
+    def stop(self):
+        self.active = False
+
+    def isActive(self):
+        return self.active
+
+
+class QModelIndex(object):
+
+    def __init__(self, row=-1, column=-1, pointer=None, model=None):
+        self._row = row
+        self._column = column
+        self._pointer = pointer
+        self._model = model
+
+    def isValid(self):
+        return self._model is not None
+
+    def row(self):
+        return self._row
+
+    def column(self):
+        return self._column
+
+    def internalPointer(self):
+        return self._pointer
+
+    def model(self):
+        return self._model
+
+
+class QAbstractItemModel(QObject):
+
+    dataChanged = Signal()
+
+    def hasIndex(self, row, column, parent=QModelIndex()):
+        return 0 <= row < self.rowCount(parent) and 0 <= column < self.columnCount(parent)
+
+    def createIndex(self, row, column, pointer=None):
+        return QModelIndex(row, column, pointer, self)
+
+    def beginResetModel(self):
+        pass
+
+    def endResetModel(self):
+        pass
+
+    def beginInsertRows(self, parent, first, last):
+        pass
+
+    def endInsertRows(self):
+        pass
+
+    def beginRemoveRows(self, parent, first, last):
+        pass
+
+    def endRemoveRows(self):
+        pass
+
+
+class QSize(object):
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+
+class Qt(object):
+    DisplayRole = 0
+    DecorationRole = 1
+    FontRole = 6
+    ForegroundRole = 9
+    SizeHintRole = 13
+    UserRole = 256
+    NoItemFlags = 0
+    ItemIsSelectable = 1
+    ItemIsEnabled = 32
+
+
+class QFont(object):
+
+    def setBold(self, is_bold):
+        pass
+
+
+class QColor(object):
+
+    def __init__(self, *args):
+        pass
+
+
+class QBrush(object):
+
+    def __init__(self, *args):
+        pass
+
+
+def install():
+    """Registers the stand-in as the PySide2 package, unless PySide2 can be imported."""
+    try:
+        import PySide2
+        return
+    except ImportError:
+        pass
+    qt_core = types.ModuleType('PySide2.QtCore')
+    for value in (Signal, QObject, QTimer, QModelIndex, QAbstractItemModel, QSize, Qt):
+        setattr(qt_core, value.__name__, value)
+    qt_gui = types.ModuleType('PySide2.QtGui')
+    for value in (QFont, QColor, QBrush):
+        setattr(qt_gui, value.__name__, value)
+    package = types.ModuleType('PySide2')
+    package.QtCore = qt_core
+    package.QtGui = qt_gui
+    sys.modules.update({'PySide2': package, 'PySide2.QtCore': qt_core, 'PySide2.QtGui': qt_gui})
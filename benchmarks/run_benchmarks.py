@@ -0,0 +1,165 @@
+"""Times the scene operations of the tool against synthetic in-memory scenes and writes the results to a JSON file.
+
+Usage: python -m benchmarks.run_benchmarks [--scales 1k,10k,50k] [--repeat 3] [--output benchmark_results.json]
+"""
+import argparse
+import json
+import platform
+import time
+import timeit
+
+from benchmarks import qt_stand_in
+from benchmarks.scene_generator import SCALES, generate_scene, get_component_count
+
+# The index and the tree model are built on Qt, so a stand-in is installed before they are imported.
+qt_stand_in.install()
+
+from models import assignment
+from models import component_resolver
+from models import scene
+from models.assignment_index import AssignmentIndex
+from views.ShadingGroupTreeModel import ShadingGroupTreeModel
+
+
+RESULTS_VERSION = 2
+
+
+def create_tree_model():
+    return ShadingGroupTreeModel(AssignmentIndex())
+
+
+def no_setup(backend):
+    return None
+
+
+def benchmark_populate(backend, state):
+    """Builds the assignment index and populates the tree model, as opening the tool and its other tabs does."""
+    tree_model = create_tree_model()
+    tree_model.assignment_index.build()
+    tree_model.populate()
+    return sum(len(records) for records in tree_model.assignment_index.member_records.values())
+
+
+def setup_refresh(backend):
+    """Builds the index and reads every group into the tree model, then moves the first face of one mesh in every
+    hundred to another shading group."""
+    tree_model = create_tree_model()
+    tree_model.assignment_index.build()
+    tree_model.populate()
+    tree_model.get_component_member_rows()
+    shading_group_names = [scene.get_node_name(shading_group) for shading_group in scene.get_shading_groups()]
+    for mesh_index, mesh in enumerate(list(backend.meshes.values())[::100]):
+        backend.assign_to_shading_group(['{0}.f[0]'.format(mesh.transform_name)],
+                                        shading_group_names[mesh_index % len(shading_group_names)])
+    return tree_model
+
+
+def benchmark_refresh(backend, tree_model):
+    """Refreshes the assignment index and reconciles the tree model against the scene, as the Refresh button does."""
+    tree_model.assignment_index.refresh()
+    tree_model.refresh()
+    return len(tree_model.all_shading_group_nodes)
+
+
+def benchmark_select_components(backend, state):
+    """Finds the component rows of the tree model and selects their members in the scene."""
+    tree_model = create_tree_model()
+    tree_model.populate()
+    names = []
+    for row, member_rows in tree_model.get_component_member_rows():
+        node = tree_model.shading_group_nodes[row]
+        for member_row in member_rows:
+            names.extend(node.member_records[member_row].get_member_strings())
+    scene.select_names(names)
+    return len(names)
+
+
+def benchmark_reassign(backend, state):
+    meshes = list(backend.meshes.values())[:1000]
+    backend.set_selection_from_names(['{0}.f[0:1]'.format(mesh.transform_name) for mesh in meshes])
+    shading_group = scene.get_shading_groups()[0]
+    assignment.assign_selection_to_shading_group(shading_group)
+    return len(meshes)
+
+
+def setup_remove(backend):
+    """Returns a selection of ten faces from the shading group with the most members, along with that group."""
+    shading_group = max(scene.get_shading_groups(), key=lambda node: len(node.members))
+    mesh = backend.meshes[next(iter(shading_group.members))]
+    return scene.get_selection_list_from_names(['{0}.f[0:9]'.format(mesh.transform_name)]), shading_group
+
+
+def benchmark_remove(backend, state):
+    selection_list, shading_group = state
+    scene.remove_from_shading_group(selection_list, shading_group)
+    return 10
+
+
+def benchmark_remove_components(backend, state):
+    object_names = [mesh.transform_name for mesh in backend.meshes.values()]
+    component_resolver.remove_components(object_names)
+    return len(object_names)
+
+
+# Each benchmark is an operation name, a setup function that is not timed, and the timed function,
+# which is passed the state returned by the setup function and returns the number of items it processed.
+BENCHMARKS = [
+    ('populate', no_setup, benchmark_populate),
+    ('refresh', setup_refresh, benchmark_refresh),
+    ('select_components', no_setup, benchmark_select_components),
+    ('reassign', no_setup, benchmark_reassign),
+    ('remove', setup_remove, benchmark_remove),
+    ('remove_components', no_setup, benchmark_remove_components),
+]
+
+
+def run_scale(scale, repeat):
+    results = []
+    for operation, setup, func in BENCHMARKS:
+        timings = []
+        item_count = 0
+        for iteration in range(repeat):
+            # Every run gets a fresh scene so that edits made by earlier runs do not skew the timings.
+            backend = generate_scene(**SCALES[scale])
+            scene.set_backend(backend)
+            state = setup(backend)
+            start = timeit.default_timer()
+            item_count = func(backend, state)
+            timings.append(timeit.default_timer() - start)
+        results.append({
+            'scale': scale,
+            'shading_groups': SCALES[scale]['group_count'],
+            'components': get_component_count(scale),
+            'operation': operation,
+            'items': item_count,
+            'seconds_min': min(timings),
+            'seconds_mean': sum(timings) / len(timings),
+            'repeat': repeat,
+        })
+        print('{0:>4} {1:<18} {2:10.4f}s  {3} items'.format(scale, operation, min(timings), item_count))
+    return results
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Shading Group Manager against synthetic scenes.')
+    parser.add_argument('--scales', default='1k,10k,50k', help='Comma separated scales out of: ' + ', '.join(sorted(SCALES)))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default='benchmark_results.json')
+    arguments = parser.parse_args(args)
+
+    results = []
+    for scale in arguments.scales.split(','):
+        results.extend(run_scale(scale.strip(), arguments.repeat))
+
+    with open(arguments.output, 'w') as output_file:
+        json.dump({
+            'version': RESULTS_VERSION,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'backend': 'memory',
+            'results': results,
+        }, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Checks the behaviour of the models against small in-memory scenes, stopping at the first check that fails.
+
+Usage: python -m benchmarks.run_checks
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks import qt_stand_in
+
+# The models import Qt, so a stand-in is installed before they are imported.
+qt_stand_in.install()
+
+from models import batch_auditor
+from models import consolidation
+from models import scene
+from models import swatches
+from models.dispatcher import SceneEventDispatcher
+from models.memory_backend import MemoryBackend
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def expect(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+
+def get_lambert_network(shader_name, group_id_names):
+    """Returns a network of a single lambert shader, with a groupId connection for each per-face assignment."""
+    roots = [('surfaceShader', shader_name, 'outColor')]
+    roots.extend(('groupNodes[{0}]'.format(index), group_id_name, 'message')
+                 for index, group_id_name in enumerate(group_id_names))
+    nodes = {shader_name: ('lambert', [('diffuse', 0.8)], [])}
+    for group_id_name in group_id_names:
+        nodes[group_id_name] = ('groupId', [('groupId', int(group_id_name[len('groupId'):]))], [])
+    return {'roots': roots, 'attributes': [], 'nodes': nodes}
+
+
+def check_duplicates_assigned_per_face(backend):
+    """Identical materials assigned to different faces are duplicates, whatever groupId nodes record their members."""
+    backend.load_description({
+        'meshes': [['a', 10], ['b', 10]],
+        'shading_groups': [
+            ['lambert2SG', ['a.f[0:4]'], get_lambert_network('lambert2', ['groupId1'])],
+            ['lambert3SG', ['a.f[5:9]', 'b.f[2]'], get_lambert_network('lambert3', ['groupId2', 'groupId3'])],
+        ],
+    })
+    clusters = consolidation.find_duplicate_shading_groups()
+    expect(clusters == [['lambert2SG', 'lambert3SG']], 'Expected one cluster of both groups, got {0}'.format(clusters))
+
+
+def check_material_edits_reported(backend):
+    """Editing the material of a shading group must be reported by the dispatcher and change its swatch hash,
+    while member edits must not be reported as material edits."""
+    backend.load_description({
+        'meshes': [['a', 10]],
+        'shading_groups': [['lambert2SG', ['a.f[0:4]'], get_lambert_network('lambert2', [])]],
+    })
+    shading_group = scene.get_node_from_name('lambert2SG')
+    network_hash = swatches.get_network_hash(shading_group, 64)
+    dispatcher = SceneEventDispatcher()
+    reported = []
+    dispatcher.materials_modified.connect(lambda shading_groups: reported.extend(
+        scene.get_node_name(node) for node in shading_groups))
+    dispatcher.register()
+    try:
+        backend.assign_to_shading_group(['a.f[5]'], 'lambert2SG')
+        dispatcher.flush()
+        expect(reported == [], 'Member edits were reported as material edits: {0}'.format(reported))
+        network = get_lambert_network('lambert2', [])
+        network['nodes']['lambert2'] = ('lambert', [('diffuse', 0.2)], [])
+        backend.set_material_network(shading_group, network)
+        dispatcher.flush()
+        expect(reported == ['lambert2SG'], 'Expected the edited group to be reported, got {0}'.format(reported))
+        expect(swatches.get_network_hash(shading_group, 64) != network_hash, 'The swatch hash ignored the edit')
+    finally:
+        dispatcher.deregister()
+
+
+def write_description(path, shading_groups):
+    with open(path, 'w') as description_file:
+        json.dump({'meshes': [['a', 10]], 'shading_groups': shading_groups}, description_file)
+
+
+def check_batch_audit(backend):
+    """Audits files with one worker, where a file that never opens must time out without stalling the files after it,
+    a broken file must be reported as an error, and running again must only audit the files that did not succeed."""
+    if not hasattr(os, 'mkfifo'):
+        return
+    directory = tempfile.mkdtemp()
+    try:
+        # Opening a pipe that nothing writes to blocks the worker, as a scene that hangs Maya would.
+        hung_path = os.path.join(directory, 'hung.json')
+        os.mkfifo(hung_path)
+        ok_paths = [os.path.join(directory, 'ok{0}.json'.format(index)) for index in range(2)]
+        for ok_path in ok_paths:
+            write_description(ok_path, [['lambert2SG', ['a.f[0:4]']], ['lambert3SG', []]])
+        broken_path = os.path.join(directory, 'broken.json')
+        with open(broken_path, 'w') as broken_file:
+            broken_file.write('{')
+        report_path = os.path.join(directory, 'report.jsonl')
+        paths = [hung_path] + ok_paths + [broken_path]
+
+        start = time.time()
+        summary = batch_auditor.run_audit(paths, report_path, batch_auditor.AuditOptions(), backend_name='memory',
+                                          process_count=1, task_timeout=1)
+        expect(time.time() - start < 10, 'Files after a timed out file waited for it')
+        expect((summary['ok'], summary['error'], summary['skipped']) == (2, 2, 0),
+               'Expected 2 ok and 2 errors, got {0}'.format(dict(summary)))
+        with open(report_path) as report_file:
+            statuses = dict((result['path'], result['status']) for result in map(json.loads, report_file))
+        expect(statuses == dict([(hung_path, 'error'), (broken_path, 'error')] + [(path, 'ok') for path in ok_paths]),
+               'Unexpected report {0}'.format(statuses))
+        with open(report_path) as report_file:
+            scans = [result['scan'] for result in map(json.loads, report_file) if result['status'] == 'ok']
+        expect(all(scan['empty_shading_groups'] == ['lambert3SG'] for scan in scans), 'Unexpected scans {0}'.format(scans))
+
+        summary = batch_auditor.run_audit(paths[1:], report_path, batch_auditor.AuditOptions(), backend_name='memory',
+                                          process_count=1, task_timeout=1)
+        expect((summary['ok'], summary['error'], summary['skipped']) == (0, 1, 2),
+               'Expected the ok files to be skipped when resuming, got {0}'.format(dict(summary)))
+    finally:
+        shutil.rmtree(directory)
+
+
+# Each check is passed a fresh in-memory scene and raises CheckFailed when the behaviour differs from what it expects.
+CHECKS = [
+    check_duplicates_assigned_per_face,
+    check_material_edits_reported,
+    check_batch_audit,
+]
+
+
+def main():
+    for check in CHECKS:
+        backend = MemoryBackend()
+        scene.set_backend(backend)
+        check(backend)
+        print('{0:<40} ok'.format(check.__name__))
+
+
+if __name__ == '__main__':
+    main()
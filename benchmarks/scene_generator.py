@@ -0,0 +1,37 @@
+import random
+
+from models.memory_backend import MemoryBackend
+
+
+SCALES = {
+    '1k': {'group_count': 1000, 'mesh_count': 2000, 'faces_per_mesh': 50},
+    '10k': {'group_count': 10000, 'mesh_count': 10000, 'faces_per_mesh': 50},
+    '50k': {'group_count': 50000, 'mesh_count': 20000, 'faces_per_mesh': 50},
+}
+
+
+def generate_scene(group_count, mesh_count, faces_per_mesh, component_mesh_ratio=0.1, blocks_per_mesh=4, seed=0):
+    """Returns a MemoryBackend holding a synthetic scene.
+    Every mesh is assigned to a shading group as a whole, then a share of the meshes has its faces split
+    into blocks that are assigned to random shading groups as components."""
+    generator = random.Random(seed)
+    backend = MemoryBackend()
+    shading_group_names = ['material{0}SG'.format(index) for index in range(group_count)]
+    for shading_group_name in shading_group_names:
+        backend.create_shading_group(shading_group_name)
+
+    block_size = max(1, faces_per_mesh // blocks_per_mesh)
+    for mesh_index in range(mesh_count):
+        mesh = backend.create_mesh('mesh{0}'.format(mesh_index), faces_per_mesh)
+        backend.assign_to_shading_group([mesh.name], shading_group_names[mesh_index % group_count])
+        if generator.random() >= component_mesh_ratio:
+            continue
+        for start in range(0, faces_per_mesh, block_size):
+            end = min(start + block_size, faces_per_mesh) - 1
+            member_string = '{0}.f[{1}:{2}]'.format(mesh.transform_name, start, end)
+            backend.assign_to_shading_group([member_string], generator.choice(shading_group_names))
+    return backend
+
+
+def get_component_count(scale):
+    return SCALES[scale]['mesh_count'] * SCALES[scale]['faces_per_mesh']
@@ -0,0 +1,241 @@
+"""A scanner for the assignment problems that Maya leaves behind, found in one pass over the shading group connections
+of every shape in the scene, and the batched fixes for them."""
+from collections import Counter, OrderedDict
+
+from models import assignment
+from models import component_resolver
+from models import scene
+from models.components import get_index_ranges
+from models.profiler import profiler
+from models.scene import DEFAULT_SHADING_GROUP_NAMES
+
+
+MIXED_ASSIGNMENTS = 'mixed_assignments'
+UNASSIGNED_FACES = 'unassigned_faces'
+INSTANCE_ASSIGNMENTS = 'instance_assignments'
+RESIDUAL_CONNECTIONS = 'residual_connections'
+EMPTY_SHADING_GROUPS = 'empty_shading_groups'
+
+CATEGORY_LABELS = OrderedDict([
+    (MIXED_ASSIGNMENTS, 'Mixed Object And Component Assignments'),
+    (UNASSIGNED_FACES, 'Unassigned Faces'),
+    (INSTANCE_ASSIGNMENTS, 'Instance Specific Assignments'),
+    (RESIDUAL_CONNECTIONS, 'Orphaned Connections'),
+    (EMPTY_SHADING_GROUPS, 'Empty Shading Groups'),
+])
+
+DEFAULT_SHADING_GROUP_NAME = 'initialShadingGroup'
+
+
+class Anomaly(object):
+    """A single problem found by the scanner.
+    It holds its category, a label describing it, the names to select to show it in the scene, and the data that
+    its fix needs, which depends on its category. Anomalies fixed by assigning members hold a list of
+    (target shading group name, member strings) pairs and the names of the shading groups that lose members."""
+
+    __slots__ = ('category', 'label', 'names', 'fix_data')
+
+    def __init__(self, category, label, names, fix_data):
+        self.category = category
+        self.label = label
+        self.names = names
+        self.fix_data = fix_data
+
+
+def get_majority_shading_group_name(face_shading_groups):
+    """Returns the name of the shading group assigned to the most faces of a mesh, or None if no face is assigned."""
+    shading_group_names, face_indices = face_shading_groups
+    counts = Counter(face_indices)
+    counts.pop(-1, None)
+    if not counts:
+        return None
+    return shading_group_names[max(counts, key=lambda index: (counts[index], -index))]
+
+
+def get_face_member_strings(object_path, face_indices):
+    return ['{0}.f[{1}]'.format(object_path, start) if start == end else '{0}.f[{1}:{2}]'.format(object_path, start, end)
+            for start, end in get_index_ranges(face_indices)]
+
+
+def get_instance_assignment(face_shading_groups, live_connections):
+    """Returns what is assigned to a single instance of a shape, comparable between its instances."""
+    if face_shading_groups is None:
+        return sorted(live_connections)
+    shading_group_names, face_indices = face_shading_groups
+    return [shading_group_names[index] if index >= 0 else None for index in face_indices]
+
+
+def scan_unassigned_faces(object_path, face_shading_groups):
+    """Returns the anomaly of a mesh with faces assigned to no shading group, or None if every face is assigned.
+    Its faces are fixed by assigning them to the shading group of most of the other faces, or to the default one."""
+    shading_group_names, face_indices = face_shading_groups
+    if -1 not in face_indices:
+        return None
+    unassigned_indices = [face_index for face_index, index in enumerate(face_indices) if index < 0]
+    target_name = get_majority_shading_group_name(face_shading_groups) or DEFAULT_SHADING_GROUP_NAME
+    if len(unassigned_indices) == len(face_indices):
+        member_strings = [object_path]
+    else:
+        member_strings = get_face_member_strings(object_path, unassigned_indices)
+    label = '{0}  ({1} faces)'.format(object_path, len(unassigned_indices))
+    return Anomaly(UNASSIGNED_FACES, label, member_strings, ([(target_name, member_strings)], set()))
+
+
+def get_copied_assignments(object_path, face_shading_groups):
+    """Returns (shading group name, member strings) pairs that give a mesh instance the given per-face assignment.
+    Shading groups assigned every face are assigned the whole instance, and unassigned faces are left untouched."""
+    shading_group_names, face_indices = face_shading_groups
+    shading_group_face_indices = OrderedDict()
+    for face_index, index in enumerate(face_indices):
+        if index >= 0:
+            shading_group_face_indices.setdefault(index, []).append(face_index)
+    assignments = []
+    for index, indices in shading_group_face_indices.items():
+        if len(indices) == len(face_indices):
+            member_strings = [object_path]
+        else:
+            member_strings = get_face_member_strings(object_path, indices)
+        assignments.append((shading_group_names[index], member_strings))
+    return assignments
+
+
+def scan_instances(instances):
+    """Returns the anomaly of a shape whose instances are not all assigned the same way, or None if they are.
+    Instances are (object path, instance assignment, face shading groups, object shading group name, shading group
+    names) tuples. The instances that differ from the first one are fixed by copying its assignment to them: face by
+    face for meshes, and its object assignment for other shapes. The first instance is left untouched."""
+    first_object_path, first_assignment, first_face_shading_groups, first_object_name, first_source_names = instances[0]
+    differing_object_paths = [object_path for object_path, instance_assignment, face_shading_groups, object_name,
+                              source_names in instances if instance_assignment != first_assignment]
+    if not differing_object_paths:
+        return None
+    assignments = OrderedDict()
+    for object_path in differing_object_paths:
+        if first_face_shading_groups is None:
+            copied_assignments = [(first_object_name, [object_path])] if first_object_name is not None else []
+        else:
+            copied_assignments = get_copied_assignments(object_path, first_face_shading_groups)
+        for shading_group_name, member_strings in copied_assignments:
+            assignments.setdefault(shading_group_name, []).extend(member_strings)
+    if not assignments:
+        return None
+    source_names = set()
+    for object_path, instance_assignment, face_shading_groups, object_name, instance_source_names in instances:
+        if object_path in differing_object_paths:
+            source_names.update(instance_source_names)
+    object_paths = [instance[0] for instance in instances]
+    label = '{0}  ({1} instances)'.format(first_object_path, len(object_paths))
+    return Anomaly(INSTANCE_ASSIGNMENTS, label, object_paths, (list(assignments.items()), source_names))
+
+
+def get_anomaly_count(result, *args, **kwargs):
+    return sum(len(anomalies) for anomalies in result.values())
+
+
+@profiler.profiled('anomaly_scanner.scan_scene', get_anomaly_count)
+def scan_scene():
+    """Returns an ordered dictionary mapping each category to the list of anomalies of that category in the scene.
+    Everything is found from a single read of the shading group connections of every shape instance:
+    - shapes assigned both as objects and through component groups,
+    - meshes with faces assigned to no shading group,
+    - instanced shapes whose instances are assigned differently,
+    - instObjGroups and objectGroups connections that no longer contribute members to their shading group,
+    - shading groups other than the default and referenced ones that have no members left, shapes or otherwise."""
+    connections = scene.get_assignment_connections()
+    anomalies = OrderedDict((category, []) for category in CATEGORY_LABELS)
+    assigned_shading_group_names = set(name for name, member_count in connections['shading_groups'].items() if member_count)
+    shape_instances = OrderedDict()
+
+    for object_path, shape_hash, instance_number, instance_count, face_shading_groups, shape_connections in connections['shapes']:
+        live_connections = set()
+        for shading_group_name, is_component_group, is_residual in shape_connections:
+            if is_residual:
+                label = '{0}  ->  {1}'.format(object_path, shading_group_name)
+                anomalies[RESIDUAL_CONNECTIONS].append(
+                    Anomaly(RESIDUAL_CONNECTIONS, label, [object_path, shading_group_name], (shading_group_name, object_path)))
+            else:
+                live_connections.add((shading_group_name, is_component_group))
+        assigned_shading_group_names.update(shading_group_name for shading_group_name, is_component_group in live_connections)
+
+        object_names = sorted(name for name, is_component_group in live_connections if not is_component_group)
+        component_names = sorted(name for name, is_component_group in live_connections if is_component_group)
+        if object_names and component_names:
+            label = '{0}  ({1} / {2})'.format(object_path, ', '.join(object_names), ', '.join(component_names))
+            anomalies[MIXED_ASSIGNMENTS].append(Anomaly(MIXED_ASSIGNMENTS, label, [object_path], object_path))
+
+        if face_shading_groups is not None:
+            anomaly = scan_unassigned_faces(object_path, face_shading_groups)
+            if anomaly is not None:
+                anomalies[UNASSIGNED_FACES].append(anomaly)
+
+        if instance_count > 1:
+            source_names = set(name for name, is_component_group in live_connections)
+            shape_instances.setdefault(shape_hash, []).append(
+                (object_path, get_instance_assignment(face_shading_groups, live_connections), face_shading_groups,
+                 object_names[0] if object_names else None, source_names))
+
+    for instances in shape_instances.values():
+        anomaly = scan_instances(instances)
+        if anomaly is not None:
+            anomalies[INSTANCE_ASSIGNMENTS].append(anomaly)
+
+    # Referenced groups cannot be deleted, so they are not reported as anomalies that could be fixed.
+    for shading_group_name in sorted(connections['shading_groups']):
+        if shading_group_name in assigned_shading_group_names or shading_group_name in DEFAULT_SHADING_GROUP_NAMES:
+            continue
+        if scene.get_reference_name(scene.get_node_from_name(shading_group_name)) is not None:
+            continue
+        anomalies[EMPTY_SHADING_GROUPS].append(
+            Anomaly(EMPTY_SHADING_GROUPS, shading_group_name, [shading_group_name], shading_group_name))
+    return anomalies
+
+
+def get_fixed_anomaly_count(result, anomalies, *args, **kwargs):
+    return len(anomalies)
+
+
+@profiler.profiled('anomaly_scanner.fix_anomalies', get_fixed_anomaly_count)
+def fix_anomalies(anomalies, dispatcher=None):
+    """Fixes the given anomalies within a single undo chunk, with one batch of edits per kind of fix.
+    Unassigned faces and instances are reassigned with one command per target shading group, instances taking the
+    assignment of their first instance, mixed assignments are
+    replaced by an object assignment to the shading group of most of their faces, orphaned connections are
+    disconnected, and empty shading groups that are still empty and not referenced are deleted.
+    Returns a dictionary mapping each category to the number of anomalies that were fixed."""
+    categories = OrderedDict((category, []) for category in CATEGORY_LABELS)
+    for anomaly in anomalies:
+        categories[anomaly.category].append(anomaly)
+
+    with scene.undo_chunk('Fix Assignment Anomalies'):
+        plan = assignment.AssignmentPlan()
+        for anomaly in categories[UNASSIGNED_FACES] + categories[INSTANCE_ASSIGNMENTS]:
+            assignments, source_names = anomaly.fix_data
+            for target_name, member_strings in assignments:
+                plan.add(target_name, member_strings)
+                plan.source_shading_group_names[target_name].update(source_names.difference([target_name]))
+        assignment.apply_assignments(plan, dispatcher, 'Fix Assignment Anomalies')
+
+        if categories[MIXED_ASSIGNMENTS]:
+            component_resolver.remove_components([anomaly.fix_data for anomaly in categories[MIXED_ASSIGNMENTS]],
+                                                 dispatcher=dispatcher)
+
+        residual_object_paths = OrderedDict()
+        for anomaly in categories[RESIDUAL_CONNECTIONS]:
+            shading_group_name, object_path = anomaly.fix_data
+            residual_object_paths.setdefault(shading_group_name, []).append(object_path)
+        for shading_group_name, object_paths in residual_object_paths.items():
+            shading_group = scene.get_node_from_name(shading_group_name)
+            if shading_group is not None:
+                scene.remove_residual_connections(shading_group, object_paths)
+
+        # Groups are checked again in case they were given members since the scan.
+        empty_shading_groups = []
+        for anomaly in categories[EMPTY_SHADING_GROUPS]:
+            shading_group = scene.get_node_from_name(anomaly.fix_data)
+            if (shading_group is not None and scene.get_reference_name(shading_group) is None
+                    and not scene.get_shading_group_members(shading_group)):
+                empty_shading_groups.append(shading_group)
+        if empty_shading_groups:
+            scene.delete_nodes(empty_shading_groups)
+    categories[EMPTY_SHADING_GROUPS] = empty_shading_groups
+    return OrderedDict((category, len(category_anomalies)) for category, category_anomalies in categories.items())
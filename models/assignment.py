@@ -0,0 +1,99 @@
+from collections import OrderedDict
+
+from models import scene
+from models.profiler import profiler
+
+
+class AssignmentPlan(object):
+    """The changes that an assignment will make, grouped per target shading group.
+    Each target maps to the member strings that will be assigned to it, and to the names of the
+    shading groups those members are currently assigned to, which will lose them."""
+
+    def __init__(self):
+        self.member_strings = OrderedDict()
+        self.source_shading_group_names = OrderedDict()
+
+    def add(self, shading_group_name, member_strings):
+        self.member_strings.setdefault(shading_group_name, []).extend(member_strings)
+        self.source_shading_group_names.setdefault(shading_group_name, set())
+
+    def is_empty(self):
+        return not any(self.member_strings.values())
+
+    def get_affected_shading_group_names(self):
+        names = set(self.member_strings.keys())
+        for source_names in self.source_shading_group_names.values():
+            names.update(source_names)
+        return sorted(names)
+
+    def get_summary(self):
+        return [{
+            'shading_group': shading_group_name,
+            'members': list(member_strings),
+            'sources': sorted(self.source_shading_group_names[shading_group_name]),
+        } for shading_group_name, member_strings in self.member_strings.items()]
+
+
+def plan_assignments(assignments, assignment_index=None):
+    """Returns an AssignmentPlan for a dictionary mapping shading group names to lists of member strings.
+    Current assignments are looked up in the reverse map of the assignment index when it is built,
+    and otherwise queried from the scene for every object at once."""
+    plan = AssignmentPlan()
+    for shading_group_name, member_strings in assignments.items():
+        # Drop duplicates while preserving order.
+        plan.add(shading_group_name, list(OrderedDict.fromkeys(member_strings)))
+
+    object_names = OrderedDict.fromkeys(member_string.partition('.')[0]
+                                        for member_strings in plan.member_strings.values()
+                                        for member_string in member_strings)
+    if assignment_index is not None and assignment_index.is_built:
+        object_shading_group_names = dict(
+            (object_name, [scene.get_node_name(shading_group)
+                           for shading_group in assignment_index.get_object_shading_groups(object_name)])
+            for object_name in object_names)
+    else:
+        object_shading_group_names = scene.get_assigned_shading_group_names_by_object(list(object_names))
+
+    for shading_group_name, member_strings in plan.member_strings.items():
+        source_names = plan.source_shading_group_names[shading_group_name]
+        for object_name in OrderedDict.fromkeys(member_string.partition('.')[0] for member_string in member_strings):
+            source_names.update(object_shading_group_names.get(object_name, []))
+        source_names.discard(shading_group_name)
+    return plan
+
+
+def get_plan_member_count(result, plan, *args, **kwargs):
+    return sum(len(member_strings) for member_strings in plan.member_strings.values())
+
+
+@profiler.profiled('assignment.apply_assignments', get_plan_member_count)
+def apply_assignments(plan, dispatcher=None, undo_name='Reassign Selection'):
+    """Applies an AssignmentPlan with one command per target shading group, inside a single undo chunk.
+    When a dispatcher is given its set member callbacks are suspended during the apply, and every
+    affected shading group is reported to it once afterwards."""
+    if plan.is_empty():
+        return
+    if dispatcher is not None:
+        dispatcher.suspend()
+    try:
+        with scene.undo_chunk(undo_name):
+            for shading_group_name, member_strings in plan.member_strings.items():
+                scene.assign_to_shading_group(member_strings, shading_group_name)
+    finally:
+        if dispatcher is not None:
+            affected_shading_groups = [scene.get_node_from_name(name) for name in plan.get_affected_shading_group_names()]
+            dispatcher.resume([node for node in affected_shading_groups if node is not None])
+
+
+def assign(assignments, dry_run=False, dispatcher=None, assignment_index=None):
+    """Plans and, unless dry_run is set, applies a dictionary mapping shading group names to lists of member strings.
+    Returns the AssignmentPlan in both cases."""
+    plan = plan_assignments(assignments, assignment_index)
+    if not dry_run:
+        apply_assignments(plan, dispatcher)
+    return plan
+
+
+def assign_selection_to_shading_group(shading_group, dry_run=False, dispatcher=None, assignment_index=None):
+    assignments = {scene.get_node_name(shading_group): scene.get_selection_strings()}
+    return assign(assignments, dry_run, dispatcher, assignment_index)
@@ -0,0 +1,245 @@
+from PySide2 import QtCore
+
+from models import scene
+from models import snapshot
+from models.components import get_member_records
+from models.name_index import NameIndex
+
+
+class AssignmentIndex(QtCore.QObject):
+    """An in-memory index of shading group assignments.
+    The forward map from shading groups to their member records is filled lazily, one group at a time.
+    Building the index fills it for every shading group along with the reverse map, which maps object paths
+    to the shading groups assigned to them and the member records of those assignments. Groups that have already been
+    read are not read again, so the build can be spread out by reading groups ahead of it.
+    Once a shading group has been read, it is kept up to date by calling update_shading_group and
+    remove_shading_group as the scene changes, and objects_changed is emitted with the affected object paths.
+    Once the index is built, shading_group_changed is also emitted with the hash of each updated or removed group.
+    The name index used for filtering is kept up to date in the same way once it has been built.
+    The index can also be built from a snapshot written when the tool was last closed on the same scene file, after
+    which each shading group adopted from it is checked with is_snapshot_stale and updated if it has changed."""
+
+    objects_changed = QtCore.Signal(list)
+    shading_group_changed = QtCore.Signal(object)
+
+    def __init__(self, parent=None):
+        super(AssignmentIndex, self).__init__(parent)
+
+        self.is_built = False
+        self.shading_groups = {}
+        self.member_records = {}
+        self.object_assignments = {}
+        self.snapshot_signatures = {}
+        self.name_index = NameIndex()
+
+    def build(self):
+        """Reads the shading groups that have not been read yet and fills the reverse map from the member records.
+        Groups that have been read are kept up to date as the scene changes, so their records are reused."""
+        shading_group_hashes = set()
+        self.object_assignments = {}
+        for shading_group in scene.get_shading_groups():
+            shading_group_hash = scene.get_node_hash(shading_group)
+            shading_group_hashes.add(shading_group_hash)
+            if shading_group_hash not in self.member_records:
+                self.read_shading_group(shading_group, False)
+            self.add_object_assignments(shading_group_hash)
+        for shading_group_hash in [key for key in self.member_records if key not in shading_group_hashes]:
+            self.shading_groups.pop(shading_group_hash, None)
+            self.member_records.pop(shading_group_hash)
+            self.snapshot_signatures.pop(shading_group_hash, None)
+            self.name_index.remove_shading_group(shading_group_hash)
+        self.is_built = True
+
+    def read_shading_groups(self, shading_groups):
+        """Reads the given shading groups ahead of a build, skipping those that have already been read."""
+        for shading_group in shading_groups:
+            if scene.get_node_hash(shading_group) not in self.member_records:
+                self.read_shading_group(shading_group, False)
+
+    # Snapshots.
+
+    def load_snapshot(self, cache_directory=None):
+        """Builds the index from the snapshot of the current scene file, only reading the members of shading groups
+        that are missing from it. Returns the shading groups adopted from the snapshot, or None if there is no
+        snapshot for this version of the scene file, in which case the index is left untouched."""
+        scene_signature = snapshot.get_scene_signature()
+        if scene_signature is None:
+            return None
+        snapshot_path = snapshot.get_snapshot_path(cache_directory or snapshot.get_default_cache_directory(),
+                                                   scene.get_scene_path())
+        snapshot_groups = snapshot.read_snapshot(snapshot_path, scene_signature)
+        if snapshot_groups is None:
+            return None
+
+        self.shading_groups = {}
+        self.member_records = {}
+        self.object_assignments = {}
+        self.snapshot_signatures = {}
+        adopted_shading_groups = []
+        for shading_group in scene.get_shading_groups():
+            entry = snapshot_groups.get(scene.get_node_name(shading_group))
+            if entry is None:
+                self.read_shading_group(shading_group, True)
+                continue
+            shading_group_hash = scene.get_node_hash(shading_group)
+            self.shading_groups[shading_group_hash] = shading_group
+            self.snapshot_signatures[shading_group_hash], self.member_records[shading_group_hash] = entry
+            self.add_object_assignments(shading_group_hash)
+            if self.name_index.is_built:
+                self.update_name_index(shading_group_hash)
+            adopted_shading_groups.append(shading_group)
+        self.is_built = True
+        return adopted_shading_groups
+
+    def is_snapshot_stale(self, shading_group):
+        """Returns whether a shading group adopted from a snapshot has changed since the snapshot was written.
+        Each group is only checked once, and groups that were read from the scene since are never stale."""
+        snapshot_signature = self.snapshot_signatures.pop(scene.get_node_hash(shading_group), None)
+        return snapshot_signature is not None and snapshot_signature != scene.get_shading_group_signature(shading_group)
+
+    def save_snapshot(self, cache_directory=None):
+        """Writes a snapshot of the index for the current scene file.
+        The index is never built for this, since that would stall the caller on large scenes, so nothing is written
+        until it has been built by loading a snapshot, by a view that needs every assignment or in the background.
+        Groups adopted from a previous snapshot that have not been checked yet keep their previous signature, so they
+        are still checked after the next load. Returns whether the snapshot was written, which requires a built index,
+        a saved scene without unsaved changes and a writable cache directory."""
+        if not self.is_built:
+            return False
+        scene_signature = snapshot.get_scene_signature()
+        if scene_signature is None:
+            return False
+        snapshot_path = snapshot.get_snapshot_path(cache_directory or snapshot.get_default_cache_directory(),
+                                                   scene.get_scene_path())
+        shading_groups = []
+        for shading_group_hash, records in self.member_records.items():
+            shading_group = self.shading_groups[shading_group_hash]
+            signature = self.snapshot_signatures.get(shading_group_hash)
+            if signature is None:
+                signature = scene.get_shading_group_signature(shading_group)
+            shading_groups.append((scene.get_node_name(shading_group), signature, records))
+        try:
+            snapshot.write_snapshot(snapshot_path, scene_signature, shading_groups)
+        except (IOError, OSError):
+            return False
+        return True
+
+    def build_name_index(self):
+        if self.name_index.is_built:
+            return
+        if not self.is_built:
+            self.build()
+        self.name_index.clear()
+        for shading_group_hash in self.member_records:
+            self.update_name_index(shading_group_hash)
+        self.name_index.is_built = True
+
+    def update_name_index(self, shading_group_hash):
+        self.name_index.set_shading_group(shading_group_hash,
+                                          scene.get_node_name(self.shading_groups[shading_group_hash]),
+                                          [record.get_display_name() for record in self.member_records[shading_group_hash]])
+
+    def read_shading_group(self, shading_group, update_reverse_map):
+        shading_group_hash = scene.get_node_hash(shading_group)
+        self.snapshot_signatures.pop(shading_group_hash, None)
+        self.shading_groups[shading_group_hash] = shading_group
+        self.member_records[shading_group_hash] = get_member_records(scene.get_shading_group_members(shading_group))
+        if update_reverse_map:
+            self.add_object_assignments(shading_group_hash)
+        if self.name_index.is_built:
+            self.update_name_index(shading_group_hash)
+        return shading_group_hash
+
+    def get_member_object_paths(self, shading_group_hash):
+        return set(record.object_path for record in self.member_records.get(shading_group_hash, []))
+
+    def add_object_assignments(self, shading_group_hash):
+        for record in self.member_records[shading_group_hash]:
+            assignments = self.object_assignments.setdefault(record.object_path, {})
+            assignments.setdefault(shading_group_hash, []).append(record)
+
+    def remove_object_assignments(self, shading_group_hash):
+        for object_path in self.get_member_object_paths(shading_group_hash):
+            assignments = self.object_assignments.get(object_path)
+            if assignments is None:
+                continue
+            assignments.pop(shading_group_hash, None)
+            if not assignments:
+                del self.object_assignments[object_path]
+
+    # Lookups.
+
+    def get_member_records(self, shading_group):
+        """Returns the member records of the given shading group, reading them from the scene if they are not indexed yet."""
+        shading_group_hash = scene.get_node_hash(shading_group)
+        if shading_group_hash not in self.member_records:
+            self.read_shading_group(shading_group, False)
+        return self.member_records[shading_group_hash]
+
+    def get_member_strings(self, shading_group):
+        member_strings = []
+        for record in self.get_member_records(shading_group):
+            member_strings.extend(record.get_member_strings())
+        return member_strings
+
+    def get_shading_group(self, shading_group_hash):
+        return self.shading_groups.get(shading_group_hash)
+
+    def get_object_paths(self):
+        return list(self.object_assignments.keys())
+
+    def get_object_assignments(self, name):
+        """Returns a dictionary mapping the hash of each shading group assigned to the given object to its member records."""
+        object_path = name if name in self.object_assignments else scene.get_object_path(name)
+        return self.object_assignments.get(object_path, {})
+
+    def get_object_shading_groups(self, name):
+        return [self.shading_groups[shading_group_hash] for shading_group_hash in self.get_object_assignments(name)]
+
+    # Updates.
+
+    def update_shading_group(self, shading_group):
+        """Re-reads an indexed shading group and returns the object paths whose assignments were affected."""
+        shading_group_hash = scene.get_node_hash(shading_group)
+        if not self.is_built and shading_group_hash not in self.member_records:
+            return []
+        affected_object_paths = self.get_member_object_paths(shading_group_hash)
+        if self.is_built:
+            self.remove_object_assignments(shading_group_hash)
+        self.read_shading_group(shading_group, self.is_built)
+        affected_object_paths.update(self.get_member_object_paths(shading_group_hash))
+        affected_object_paths = list(affected_object_paths)
+        if self.is_built and affected_object_paths:
+            self.objects_changed.emit(affected_object_paths)
+        if self.is_built:
+            self.shading_group_changed.emit(shading_group_hash)
+        return affected_object_paths
+
+    def add_shading_group(self, shading_group):
+        if self.is_built:
+            self.update_shading_group(shading_group)
+
+    def remove_shading_group(self, shading_group_hash):
+        affected_object_paths = list(self.get_member_object_paths(shading_group_hash))
+        if self.is_built:
+            self.remove_object_assignments(shading_group_hash)
+        self.shading_groups.pop(shading_group_hash, None)
+        self.member_records.pop(shading_group_hash, None)
+        self.snapshot_signatures.pop(shading_group_hash, None)
+        self.name_index.remove_shading_group(shading_group_hash)
+        if self.is_built and affected_object_paths:
+            self.objects_changed.emit(affected_object_paths)
+        if self.is_built:
+            self.shading_group_changed.emit(shading_group_hash)
+        return affected_object_paths
+
+    def refresh(self):
+        """Re-reads every indexed shading group, adds new ones when the index is built and drops deleted ones."""
+        shading_group_hashes = set()
+        for shading_group in scene.get_shading_groups():
+            shading_group_hash = scene.get_node_hash(shading_group)
+            shading_group_hashes.add(shading_group_hash)
+            if self.is_built or shading_group_hash in self.member_records:
+                self.update_shading_group(shading_group)
+        for shading_group_hash in [key for key in self.member_records if key not in shading_group_hashes]:
+            self.remove_shading_group(shading_group_hash)
@@ -0,0 +1,179 @@
+"""Exports the shading group assignments of the scene as a stream of rows, and imports them again.
+Each row holds a shading group name, an object path, a component type, which is None for object assignments,
+and a list of (start, end) component index ranges. Rows are generated one shading group at a time, so the
+assignments of the whole scene are never held in memory at once. Maps are written to JSON lines files,
+or to CSV files when the path ends in .csv."""
+import csv
+import json
+import sys
+from collections import OrderedDict
+
+from models import scene
+from models.components import get_member_records
+from models.profiler import profiler
+
+
+CSV_COLUMNS = ('shading_group', 'object', 'component_type', 'ranges')
+DEFAULT_BATCH_SIZE = 5000
+
+
+# Rows.
+
+def iterate_assignment_rows(shading_groups=None):
+    """Yields a row for each object and component type assigned to each of the given shading groups,
+    or to every shading group in the scene."""
+    if shading_groups is None:
+        shading_groups = scene.get_shading_groups()
+    for shading_group in shading_groups:
+        shading_group_name = scene.get_node_name(shading_group)
+        for record in get_member_records(scene.get_shading_group_members(shading_group)):
+            yield shading_group_name, record.object_path, record.component_type, record.get_ranges()
+
+
+def get_row_member_strings(object_path, component_type, ranges):
+    if component_type is None:
+        return [object_path]
+    if not ranges:
+        return ['{0}.{1}'.format(object_path, component_type)]
+    return ['{0}.{1}[{2}]'.format(object_path, component_type, start) if start == end
+            else '{0}.{1}[{2}:{3}]'.format(object_path, component_type, start, end)
+            for start, end in ranges]
+
+
+def format_ranges(ranges):
+    return ' '.join(str(start) if start == end else '{0}:{1}'.format(start, end) for start, end in ranges)
+
+
+def parse_ranges(text):
+    ranges = []
+    for range_string in text.split():
+        start, separator, end = range_string.partition(':')
+        ranges.append((int(start), int(end) if separator else int(start)))
+    return ranges
+
+
+# Files.
+
+def is_csv_path(path):
+    return path.lower().endswith('.csv')
+
+
+def open_csv_file(path, mode):
+    if sys.version_info[0] < 3:
+        return open(path, mode + 'b')
+    return open(path, mode, newline='')
+
+
+def write_rows(rows, path):
+    """Writes rows to a JSON lines or CSV file as they are generated and returns the number of rows written."""
+    row_count = 0
+    if is_csv_path(path):
+        with open_csv_file(path, 'w') as map_file:
+            writer = csv.writer(map_file)
+            writer.writerow(CSV_COLUMNS)
+            for shading_group_name, object_path, component_type, ranges in rows:
+                writer.writerow((shading_group_name, object_path, component_type or '', format_ranges(ranges)))
+                row_count += 1
+        return row_count
+    with open(path, 'w') as map_file:
+        for shading_group_name, object_path, component_type, ranges in rows:
+            map_file.write(json.dumps(OrderedDict([
+                ('shading_group', shading_group_name),
+                ('object', object_path),
+                ('component_type', component_type),
+                ('ranges', [[start, end] for start, end in ranges]),
+            ])) + '\n')
+            row_count += 1
+    return row_count
+
+
+def read_rows(path):
+    """Yields the rows of a JSON lines or CSV file one line at a time."""
+    if is_csv_path(path):
+        with open_csv_file(path, 'r') as map_file:
+            for row in csv.DictReader(map_file):
+                yield (row['shading_group'], row['object'], row['component_type'] or None,
+                       parse_ranges(row['ranges']))
+        return
+    with open(path) as map_file:
+        for line in map_file:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            yield (row['shading_group'], row['object'], row['component_type'],
+                   [(start, end) for start, end in row['ranges']])
+
+
+@profiler.profiled('assignment_map.export_assignments', lambda result, *args, **kwargs: result)
+def export_assignments(path, shading_groups=None):
+    """Streams the assignments of the given shading groups, or of the whole scene, to a file and returns the row count."""
+    return write_rows(iterate_assignment_rows(shading_groups), path)
+
+
+# Import.
+
+@profiler.profiled('assignment_map.import_assignments', lambda result, *args, **kwargs: result['assigned'])
+def import_assignments(rows, batch_size=DEFAULT_BATCH_SIZE, dispatcher=None, undo_name='Import Assignments'):
+    """Re-applies rows, such as those read from a saved map, to the scene inside a single undo chunk.
+    Rows are gathered into batches of up to batch_size member strings, and each batch is applied with one command
+    per shading group. Rows whose shading group or object no longer exists are skipped.
+    When a dispatcher is given its set member callbacks are suspended during the import, and the shading groups
+    that the import touched, which are the targets and the groups that the imported objects were assigned to before
+    each batch, are reported to it once afterwards. Returns a summary of the import."""
+    summary = OrderedDict([
+        ('assigned', 0),
+        ('batches', 0),
+        ('missing_shading_groups', []),
+        ('missing_objects', []),
+    ])
+    shading_group_exists = {}
+    missing_object_paths = OrderedDict()
+    batch = OrderedDict()
+    batch_member_count = 0
+    touched_shading_group_names = OrderedDict()
+
+    def apply_batch():
+        if dispatcher is not None:
+            object_names = [member_string for member_strings in batch.values() for member_string in member_strings]
+            for shading_group_names in scene.get_assigned_shading_group_names_by_object(object_names).values():
+                touched_shading_group_names.update(OrderedDict.fromkeys(shading_group_names))
+            touched_shading_group_names.update(OrderedDict.fromkeys(batch))
+        for shading_group_name, member_strings in batch.items():
+            scene.assign_to_shading_group(member_strings, shading_group_name)
+        summary['assigned'] += batch_member_count
+        summary['batches'] += 1
+        batch.clear()
+
+    if dispatcher is not None:
+        dispatcher.suspend()
+    try:
+        with scene.undo_chunk(undo_name):
+            for shading_group_name, object_path, component_type, ranges in rows:
+                if shading_group_name not in shading_group_exists:
+                    shading_group_exists[shading_group_name] = scene.is_shading_group(
+                        scene.get_node_from_name(shading_group_name))
+                if not shading_group_exists[shading_group_name]:
+                    continue
+                if scene.get_object_path(object_path) is None:
+                    missing_object_paths[object_path] = None
+                    continue
+                member_strings = get_row_member_strings(object_path, component_type, ranges)
+                batch.setdefault(shading_group_name, []).extend(member_strings)
+                batch_member_count += len(member_strings)
+                if batch_member_count >= batch_size:
+                    apply_batch()
+                    batch_member_count = 0
+            if batch:
+                apply_batch()
+    finally:
+        if dispatcher is not None:
+            touched_shading_groups = [scene.get_node_from_name(name) for name in touched_shading_group_names]
+            dispatcher.resume([node for node in touched_shading_groups if node is not None])
+
+    summary['missing_shading_groups'] = [name for name, exists in shading_group_exists.items() if not exists]
+    summary['missing_objects'] = list(missing_object_paths)
+    return summary
+
+
+def import_assignments_from_file(path, batch_size=DEFAULT_BATCH_SIZE, dispatcher=None):
+    return import_assignments(read_rows(path), batch_size, dispatcher)
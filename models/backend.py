@@ -0,0 +1,184 @@
+# Shading group attributes whose incoming connections record its members, such as the groupId of each per-face
+# assignment, rather than being part of its material network.
+MEMBER_ATTRIBUTES = ('dagSetMembers', 'dnSetMembers', 'memberWireframeColor', 'groupNodes')
+
+
+def is_member_attribute(attribute):
+    """Returns whether a shading group attribute, or an element of it such as groupNodes[2], records members."""
+    return attribute.partition('[')[0] in MEMBER_ATTRIBUTES
+
+
+class SceneBackend(object):
+    """The interface that the functions in models.scene are built on.
+    Nodes, node handles, selection lists and callback ids are opaque objects that are only ever passed back to the
+    backend that produced them. Callback functions are called with the node that triggered them."""
+
+    # Nodes.
+
+    def get_shading_groups(self):
+        """Returns a list of every shading group node in the scene."""
+        raise NotImplementedError
+
+    def get_node_name(self, node):
+        raise NotImplementedError
+
+    def get_node_from_name(self, name):
+        """Returns the node of the given name, or None if it does not exist."""
+        raise NotImplementedError
+
+    def get_node_hash(self, node):
+        """Returns a hash that uniquely identifies the given node for as long as it exists."""
+        raise NotImplementedError
+
+    def get_node_handle(self, node):
+        """Returns a handle that can be used to test whether the given node still exists at a later time."""
+        raise NotImplementedError
+
+    def get_node_from_handle(self, handle):
+        """Returns the node referenced by the given handle, or None if it has since been deleted."""
+        raise NotImplementedError
+
+    def is_shading_group(self, node):
+        raise NotImplementedError
+
+    def get_reference_name(self, node):
+        """Returns the name of the reference node that the given node was loaded from, or None if it is not referenced."""
+        raise NotImplementedError
+
+    # Members.
+
+    def get_shading_group_members(self, shading_group):
+        """Returns a list of (member string, object path) pairs for the members of the given shading group."""
+        raise NotImplementedError
+
+    def get_shading_group_signature(self, shading_group):
+        """Returns a string that changes whenever the members of the given shading group change, read without listing
+        the members themselves."""
+        raise NotImplementedError
+
+    def get_object_path(self, name):
+        """Returns the path of the object of the given name or member string, or None if it does not exist."""
+        raise NotImplementedError
+
+    def get_assigned_shading_group_names(self, name):
+        """Returns the names of the shading groups that the object of the given name or member string is assigned to."""
+        raise NotImplementedError
+
+    def get_assigned_shading_group_names_by_object(self, names):
+        """Returns a dictionary mapping the object name of each of the given names or member strings to the names of the
+        shading groups that it is assigned to, looked up for all of the objects together."""
+        raise NotImplementedError
+
+    def get_face_shading_groups(self, name):
+        """Returns the shading group names of the mesh of the given name, and an array holding the index into those names
+        of the shading group assigned to each face, or -1 for unassigned faces. Returns None if it is not a mesh."""
+        raise NotImplementedError
+
+    def get_assignment_connections(self):
+        """Returns the shading group connections of every shape instance in the scene, read in a single pass.
+        The result is a dictionary whose shapes are (object path, shape hash, instance number, instance count, face
+        shading groups, connections) tuples, where face shading groups are as returned by get_face_shading_groups, or
+        None for shapes that are not meshes, and each connection is a (shading group name, is component group,
+        is residual) tuple. A connection is residual when it no longer contributes any member to its shading group.
+        Its shading_groups map the name of every shading group to its number of members that are not among those shapes,
+        such as transforms, intermediate objects and dependency nodes."""
+        raise NotImplementedError
+
+    # Selection lists.
+
+    def get_selection_list_from_names(self, names):
+        raise NotImplementedError
+
+    def has_components(self, selection_list):
+        raise NotImplementedError
+
+    def merge_selection_lists(self, selection_lists):
+        raise NotImplementedError
+
+    def get_selection_strings(self):
+        raise NotImplementedError
+
+    def select_names(self, names):
+        """Replaces the active selection with the given node names and member strings in a single operation,
+        making it visible in the outliner and viewport. Sets are selected as nodes rather than expanded to their members."""
+        raise NotImplementedError
+
+    # Edits.
+
+    def assign_to_shading_group(self, element_names, shading_group_name):
+        """Assigns a list of element names to a shading group, removing them from any other shading group."""
+        raise NotImplementedError
+
+    def remove_from_shading_group(self, selection_list, shading_group):
+        raise NotImplementedError
+
+    def remove_residual_connections(self, shading_group, object_paths):
+        """Disconnects the connections of the given objects to the shading group that no longer contribute members."""
+        raise NotImplementedError
+
+    def delete_nodes(self, nodes):
+        raise NotImplementedError
+
+    def undo_chunk(self, name):
+        """Returns a context manager that groups all edits made within it into a single undo step."""
+        raise NotImplementedError
+
+    # Materials.
+
+    def get_material_network_signature(self, shading_group):
+        """Returns a string that changes whenever the look of the material network of the given shading group changes."""
+        raise NotImplementedError
+
+    def get_material_network(self, shading_group):
+        """Returns the nodes upstream of the given shading group as a dictionary.
+        Its roots are (shading group attribute, node name, attribute) tuples for every incoming connection of the
+        shading group other than those recording its members, its attributes are the (attribute, value) pairs of the shading
+        group itself, and its nodes map node names to (node type, (attribute, value) pairs, incoming connections)
+        tuples, where each connection is a (destination attribute, source node name, source attribute) tuple."""
+        raise NotImplementedError
+
+    def render_swatch(self, shading_group, path, size):
+        """Renders a square swatch of the material of the given shading group to a PNG file.
+        Returns whether a swatch was rendered."""
+        raise NotImplementedError
+
+    # Files.
+
+    def get_scene_path(self):
+        """Returns the path of the current scene file, or None if the scene has never been saved."""
+        raise NotImplementedError
+
+    def is_scene_modified(self):
+        """Returns whether the scene has changed since it was last opened or saved."""
+        raise NotImplementedError
+
+    def open_file(self, path):
+        """Opens a scene file in place of the current scene, discarding any unsaved changes."""
+        raise NotImplementedError
+
+    def save_file(self, path=None):
+        """Saves the current scene to its own path, or to the given path."""
+        raise NotImplementedError
+
+    # Callbacks.
+
+    def add_set_members_modified_callback(self, node, func):
+        raise NotImplementedError
+
+    def add_material_changed_callback(self, node, func):
+        """Registers a callback that passes a shading group to func whenever its material network may have changed.
+        Changes to set members are not reported here."""
+        raise NotImplementedError
+
+    def add_node_added_callback(self, func, node_type):
+        raise NotImplementedError
+
+    def add_selection_changed_callback(self, func):
+        """Registers a callback that is called without arguments whenever the active selection changes."""
+        raise NotImplementedError
+
+    def add_node_removed_callback(self, func, node_type):
+        raise NotImplementedError
+
+    def remove_callback(self, callback_id):
+        raise NotImplementedError
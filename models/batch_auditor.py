@@ -0,0 +1,268 @@
+"""Audits, and optionally cleans, the shading group assignments of many scene files without a user interface.
+Files are fanned out across a pool of worker processes, each of which opens one file at a time through its own scene
+backend. The result of each file is appended to a JSON lines report as soon as it arrives, and files that already
+have a successful result in the report are skipped, so an interrupted run can be resumed by running it again."""
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from collections import OrderedDict
+
+from models import component_resolver
+from models import scene
+from models.components import get_member_records
+from models.scene import DEFAULT_SHADING_GROUP_NAMES
+
+
+REPORT_VERSION = 1
+DEFAULT_MAX_TASKS_PER_CHILD = 50
+DEFAULT_TASK_TIMEOUT = 3600
+POLL_INTERVAL = 0.05
+
+
+def create_maya_backend():
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+    from models.maya_backend import MayaBackend
+    return MayaBackend()
+
+
+def create_memory_backend():
+    from models.memory_backend import MemoryBackend
+    return MemoryBackend()
+
+
+BACKEND_FACTORIES = {
+    'maya': create_maya_backend,
+    'memory': create_memory_backend,
+}
+
+
+class AuditOptions(object):
+    """The optional steps run on each file after it has been scanned.
+    Components are stripped before empty shading groups are removed, so that groups emptied by stripping are removed too.
+    Files are only saved when one of the steps changed them, either in place or next to the original with a suffix."""
+
+    def __init__(self, remove_empty=False, strip_components=False, save=False, save_suffix=''):
+        self.remove_empty = remove_empty
+        self.strip_components = strip_components
+        self.save = save
+        self.save_suffix = save_suffix
+
+    def get_save_path(self, path):
+        root, extension = os.path.splitext(path)
+        return root + self.save_suffix + extension
+
+    def is_saved_path(self, path):
+        """Returns whether a path is one that a previous run saved next to its original."""
+        return bool(self.save_suffix) and os.path.splitext(path)[0].endswith(self.save_suffix)
+
+
+# Steps.
+
+def scan_scene():
+    """Returns the shading group and member counts of the open scene, the names of its empty shading groups
+    and the paths of the objects that have component assignments."""
+    member_count = 0
+    empty_shading_group_names = []
+    component_object_paths = OrderedDict()
+    shading_groups = scene.get_shading_groups()
+    for shading_group in shading_groups:
+        records = get_member_records(scene.get_shading_group_members(shading_group))
+        member_count += len(records)
+        if not records:
+            empty_shading_group_names.append(scene.get_node_name(shading_group))
+        for record in records:
+            if record.has_components():
+                component_object_paths[record.object_path] = None
+    return OrderedDict([
+        ('shading_groups', len(shading_groups)),
+        ('members', member_count),
+        ('empty_shading_groups', empty_shading_group_names),
+        ('component_objects', list(component_object_paths)),
+    ])
+
+
+def strip_components(object_paths):
+    """Replaces the component assignments of the given objects with object assignments and returns the objects reassigned."""
+    if not object_paths:
+        return 0
+    plan = component_resolver.remove_components(object_paths)
+    return sum(len(member_strings) for member_strings in plan.member_strings.values())
+
+
+def remove_empty_shading_groups():
+    """Deletes every empty shading group other than the default ones and returns their names."""
+    empty_shading_groups = [shading_group for shading_group in scene.get_shading_groups()
+                            if scene.get_node_name(shading_group) not in DEFAULT_SHADING_GROUP_NAMES
+                            and not scene.get_shading_group_members(shading_group)]
+    names = [scene.get_node_name(shading_group) for shading_group in empty_shading_groups]
+    scene.delete_nodes(empty_shading_groups)
+    return names
+
+
+def audit_file(path, options):
+    """Runs the scan and the requested steps on a single file and returns its result.
+    Errors are caught and reported so that one broken file does not stop the run."""
+    start = time.time()
+    result = OrderedDict([('path', path), ('status', 'ok')])
+    try:
+        scene.open_file(path)
+        result['scan'] = scan_scene()
+        is_modified = False
+        if options.strip_components:
+            result['stripped_objects'] = strip_components(result['scan']['component_objects'])
+            is_modified = is_modified or result['stripped_objects'] > 0
+        if options.remove_empty:
+            result['removed_shading_groups'] = remove_empty_shading_groups()
+            is_modified = is_modified or len(result['removed_shading_groups']) > 0
+        if options.save and is_modified:
+            result['saved_path'] = options.get_save_path(path)
+            scene.save_file(result['saved_path'])
+    except Exception as error:
+        result['status'] = 'error'
+        result['error'] = '{0}: {1}'.format(type(error).__name__, error)
+        result['traceback'] = traceback.format_exc()
+    result['seconds'] = time.time() - start
+    return result
+
+
+# Scheduling.
+
+def init_worker(backend_name):
+    scene.set_backend(BACKEND_FACTORIES[backend_name]())
+
+
+def run_task(task):
+    path, options = task
+    return audit_file(path, options)
+
+
+def get_timeout_result(path, task_timeout):
+    return OrderedDict([
+        ('path', path),
+        ('status', 'error'),
+        ('error', 'No result after {0} seconds, the worker may have crashed or hung'.format(task_timeout)),
+        ('seconds', task_timeout),
+    ])
+
+
+def iterate_results(paths, options, backend_name, process_count, max_tasks_per_child,
+                    task_timeout=DEFAULT_TASK_TIMEOUT):
+    """Yields the result of each file in the order they complete.
+    A process count of zero audits the files one after another in the current process, restoring its backend afterwards.
+    Workers are replaced after max_tasks_per_child files so that memory held by opened scenes is returned.
+    Only as many files as there are workers are handed to the pool at a time, so each one is timed from when it starts.
+    A file without a result after task_timeout seconds, because its worker hung or died with the interpreter, is
+    reported as an error. Its worker would keep its place in the pool, so the pool is terminated and replaced, and the
+    other files it was running are started again. A timeout of None waits indefinitely."""
+    tasks = [(path, options) for path in paths]
+    if process_count == 0:
+        previous_backend = scene.current_backend
+        init_worker(backend_name)
+        try:
+            for task in tasks:
+                yield run_task(task)
+        finally:
+            scene.set_backend(previous_backend)
+        return
+
+    if process_count is None:
+        process_count = multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(process_count, init_worker, (backend_name,), max_tasks_per_child)
+    pending_tasks = list(reversed(tasks))
+    running_tasks = OrderedDict()
+    try:
+        while pending_tasks or running_tasks:
+            while pending_tasks and len(running_tasks) < process_count:
+                task = pending_tasks.pop()
+                running_tasks[task[0]] = task, pool.apply_async(run_task, (task,)), time.time()
+            has_finished = has_timed_out = False
+            for path, (task, async_result, start) in list(running_tasks.items()):
+                if async_result.ready():
+                    del running_tasks[path]
+                    has_finished = True
+                    yield async_result.get()
+                elif task_timeout is not None and time.time() - start > task_timeout:
+                    del running_tasks[path]
+                    has_finished = has_timed_out = True
+                    yield get_timeout_result(path, task_timeout)
+            if has_timed_out:
+                pool.terminate()
+                pool.join()
+                pending_tasks.extend(task for task, async_result, start in reversed(list(running_tasks.values())))
+                running_tasks.clear()
+                pool = multiprocessing.Pool(process_count, init_worker, (backend_name,), max_tasks_per_child)
+            if not has_finished:
+                time.sleep(POLL_INTERVAL)
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+# Reporting.
+
+def read_completed_paths(report_path):
+    """Returns the paths that have a successful result in an existing report.
+    A line left incomplete by an interrupted run is ignored, so that file is audited again."""
+    completed_paths = set()
+    if not os.path.exists(report_path):
+        return completed_paths
+    with open(report_path) as report_file:
+        for line in report_file:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if result.get('status') == 'ok':
+                completed_paths.add(result['path'])
+    return completed_paths
+
+
+def open_report(report_path):
+    """Opens a report for appending, starting a new line if the last one was left incomplete."""
+    needs_new_line = False
+    if os.path.exists(report_path) and os.path.getsize(report_path) > 0:
+        with open(report_path, 'rb') as report_file:
+            report_file.seek(-1, os.SEEK_END)
+            needs_new_line = report_file.read(1) != b'\n'
+    report_file = open(report_path, 'a')
+    if needs_new_line:
+        report_file.write('\n')
+    return report_file
+
+
+def run_audit(paths, report_path, options, backend_name='maya', process_count=None,
+              max_tasks_per_child=DEFAULT_MAX_TASKS_PER_CHILD, progress_func=None, task_timeout=DEFAULT_TASK_TIMEOUT):
+    """Audits every file that does not already have a successful result in the report, appending a line per file.
+    Files that an earlier run saved with the save suffix are left out.
+    The progress function, if given, is called with each result, the number of files done and the number to do.
+    Returns a summary of the run."""
+    completed_paths = read_completed_paths(report_path)
+    paths = [path for path in OrderedDict.fromkeys(paths) if not options.is_saved_path(path)]
+    pending_paths = [path for path in paths if path not in completed_paths]
+    summary = OrderedDict([
+        ('version', REPORT_VERSION),
+        ('skipped', len(paths) - len(pending_paths)),
+        ('ok', 0),
+        ('error', 0),
+    ])
+
+    report_file = open_report(report_path)
+    try:
+        results = iterate_results(pending_paths, options, backend_name, process_count, max_tasks_per_child,
+                                  task_timeout)
+        for done_count, result in enumerate(results, 1):
+            # Each result is flushed as it arrives so that an interrupted run keeps everything completed before it.
+            report_file.write(json.dumps(result) + '\n')
+            report_file.flush()
+            summary[result['status']] += 1
+            if progress_func is not None:
+                progress_func(result, done_count, len(pending_paths))
+    finally:
+        report_file.close()
+    return summary
@@ -0,0 +1,81 @@
+from models import scene
+
+
+class CallbackRegistry(object):
+    """Owns the scene callbacks registered by the tool for the whole session.
+    Callbacks on a node are kept under the hash of that node and are removed as soon as the node is deleted,
+    through a node removed callback the registry installs once per node type. Other callbacks are session callbacks.
+    Only one owner holds the registry at a time, and claiming it removes every callback left by the previous owner."""
+
+    def __init__(self):
+        self.owner = None
+        self.node_callback_ids = {}
+        self.session_callback_ids = []
+        self.removal_callback_ids = {}
+        self.removed_with_node_count = 0
+
+    def claim(self, owner):
+        self.clear()
+        self.owner = owner
+
+    def release(self, owner):
+        """Removes every callback, unless another owner has claimed the registry since."""
+        if owner is not self.owner:
+            return
+        self.clear()
+        self.owner = None
+
+    def add_node_callback(self, node, callback_id, node_type):
+        if node_type not in self.removal_callback_ids:
+            self.removal_callback_ids[node_type] = scene.get_backend().add_node_removed_callback(
+                self.on_node_removed, node_type)
+        self.node_callback_ids.setdefault(scene.get_node_hash(node), []).append(callback_id)
+
+    def add_session_callback(self, callback_id):
+        self.session_callback_ids.append(callback_id)
+
+    def remove_node_callbacks(self, node_hash):
+        backend = scene.get_backend()
+        for callback_id in self.node_callback_ids.pop(node_hash, []):
+            backend.remove_callback(callback_id)
+
+    def clear(self):
+        backend = scene.get_backend()
+        for callback_ids in self.node_callback_ids.values():
+            for callback_id in callback_ids:
+                backend.remove_callback(callback_id)
+        for callback_id in self.session_callback_ids + list(self.removal_callback_ids.values()):
+            backend.remove_callback(callback_id)
+        self.node_callback_ids = {}
+        self.session_callback_ids = []
+        self.removal_callback_ids = {}
+
+    def on_node_removed(self, node):
+        node_hash = scene.get_node_hash(node)
+        if node_hash in self.node_callback_ids:
+            self.removed_with_node_count += len(self.node_callback_ids[node_hash])
+            self.remove_node_callbacks(node_hash)
+
+    def get_callback_count(self):
+        return (sum(len(callback_ids) for callback_ids in self.node_callback_ids.values()) +
+                len(self.session_callback_ids) + len(self.removal_callback_ids))
+
+    def get_statistics(self):
+        return {
+            'callbacks': self.get_callback_count(),
+            'nodes': len(self.node_callback_ids),
+            'node_callbacks': sum(len(callback_ids) for callback_ids in self.node_callback_ids.values()),
+            'session_callbacks': len(self.session_callback_ids) + len(self.removal_callback_ids),
+            'removed_with_nodes': self.removed_with_node_count,
+        }
+
+
+session_registry = None
+
+
+def get_registry():
+    """Returns the callback registry of the session, creating it the first time it is requested."""
+    global session_registry
+    if session_registry is None:
+        session_registry = CallbackRegistry()
+    return session_registry
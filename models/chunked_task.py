@@ -0,0 +1,71 @@
+import timeit
+
+from PySide2 import QtCore
+
+from models.profiler import profiler
+
+
+class ChunkedTask(QtCore.QObject):
+    """Processes a list of items in chunks spread across iterations of the Qt event loop.
+    Work that calls the Maya API must stay on the main thread, so instead of running it on another thread it is
+    split up, and each iteration processes chunks until its time budget is spent before returning to the event loop.
+    The process function is passed each chunk as a list. The task can be cancelled, or finished synchronously."""
+
+    progressed = QtCore.Signal(int, int)
+    finished = QtCore.Signal()
+    cancelled = QtCore.Signal()
+
+    CHUNK_SIZE = 64
+    TIME_BUDGET = 0.015
+
+    def __init__(self, name, items, process_func, parent=None):
+        super(ChunkedTask, self).__init__(parent)
+
+        self.name = name
+        self.items = items
+        self.process_func = process_func
+        self.position = 0
+        self.is_running = False
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.run_iteration)
+
+    def get_total(self):
+        return len(self.items)
+
+    def start(self):
+        self.is_running = True
+        self.timer.start()
+
+    def cancel(self):
+        if not self.is_running:
+            return
+        self.timer.stop()
+        self.is_running = False
+        self.cancelled.emit()
+
+    def finish(self):
+        """Processes every remaining item before returning."""
+        if not self.is_running:
+            return
+        self.process_chunks(None)
+
+    def run_iteration(self):
+        self.process_chunks(timeit.default_timer() + self.TIME_BUDGET)
+
+    def process_chunks(self, deadline):
+        with profiler.measure(self.name) as measurement:
+            start_position = self.position
+            while self.position < len(self.items):
+                chunk = self.items[self.position:self.position + self.CHUNK_SIZE]
+                self.process_func(chunk)
+                self.position += len(chunk)
+                if deadline is not None and timeit.default_timer() >= deadline:
+                    break
+            measurement.item_count = self.position - start_position
+        self.progressed.emit(self.position, len(self.items))
+        if self.position >= len(self.items):
+            self.timer.stop()
+            self.is_running = False
+            self.finished.emit()
@@ -0,0 +1,108 @@
+from collections import Counter, OrderedDict
+
+from models import assignment
+from models import scene
+from models.profiler import profiler
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def get_selected_object_names():
+    """Returns the unique object names of the active selection, including the objects of selected components."""
+    return list(OrderedDict.fromkeys(selection_string.partition('.')[0] for selection_string in scene.get_selection_strings()))
+
+
+def get_face_assignments(object_names):
+    """Returns the names of all shading groups found on the given meshes, along with a list of
+    (object name, global shading group ids) pairs holding the global id of each face, or -1 for unassigned faces.
+    Objects that are not meshes are skipped."""
+    shading_group_ids = OrderedDict()
+    face_assignments = []
+    for object_name in object_names:
+        face_shading_groups = scene.get_face_shading_groups(object_name)
+        if face_shading_groups is None:
+            continue
+        shading_group_names, face_indices = face_shading_groups
+        # Local indices are shifted by one so that unassigned faces map to -1 through the same lookup.
+        local_to_global = [-1] + [shading_group_ids.setdefault(name, len(shading_group_ids)) for name in shading_group_names]
+        face_assignments.append((object_name, local_to_global, face_indices))
+    return list(shading_group_ids.keys()), face_assignments
+
+
+def count_majority_vectorized(shading_group_count, face_assignments):
+    """Returns the global id of the most common shading group of each object, or -1 when no face is assigned.
+    All faces of all objects are counted at once by sorting (object, shading group) keys."""
+    if not face_assignments:
+        return []
+    object_keys = []
+    for object_index, (object_name, local_to_global, face_indices) in enumerate(face_assignments):
+        lookup = numpy.array(local_to_global, dtype=numpy.int64)
+        global_ids = lookup[numpy.frombuffer(face_indices, dtype=numpy.int32).astype(numpy.int64) + 1]
+        global_ids = global_ids[global_ids >= 0]
+        object_keys.append(object_index * shading_group_count + global_ids)
+    keys, counts = numpy.unique(numpy.concatenate(object_keys), return_counts=True)
+    object_indices = keys // shading_group_count
+    # Sort by object, then by descending count, so that the first key of each object is its majority.
+    order = numpy.lexsort((-counts, object_indices))
+    object_indices = object_indices[order]
+    first = numpy.ones(len(order), dtype=bool)
+    first[1:] = object_indices[1:] != object_indices[:-1]
+    majority = numpy.full(len(face_assignments), -1, dtype=numpy.int64)
+    majority[object_indices[first]] = (keys[order] % shading_group_count)[first]
+    return majority.tolist()
+
+
+def count_majority(shading_group_count, face_assignments):
+    """Returns the global id of the most common shading group of each object, or -1 when no face is assigned."""
+    majority = []
+    for object_name, local_to_global, face_indices in face_assignments:
+        counts = Counter(face_indices)
+        counts.pop(-1, None)
+        if not counts:
+            majority.append(-1)
+            continue
+        # Ties go to the lowest global id, as they do when counting vectorized.
+        local_index = max(counts, key=lambda index: (counts[index], -local_to_global[index + 1]))
+        majority.append(local_to_global[local_index + 1])
+    return majority
+
+
+def resolve_majority(shading_group_count, face_assignments):
+    if numpy is not None:
+        return count_majority_vectorized(max(1, shading_group_count), face_assignments)
+    return count_majority(shading_group_count, face_assignments)
+
+
+def get_majority_shading_groups(object_names):
+    """Returns a dictionary mapping each given mesh to the name of the shading group assigned to most of its faces."""
+    shading_group_names, face_assignments = get_face_assignments(object_names)
+    majority = resolve_majority(len(shading_group_names), face_assignments)
+    return OrderedDict((object_name, shading_group_names[shading_group_id])
+                       for (object_name, local_to_global, face_indices), shading_group_id in zip(face_assignments, majority)
+                       if shading_group_id >= 0)
+
+
+@profiler.profiled('resolver.remove_components', lambda plan, object_names, *args, **kwargs: len(object_names))
+def remove_components(object_names, dry_run=False, dispatcher=None):
+    """Replaces all component assignments of the given meshes with an object assignment to whichever shading group
+    covers the most faces of each mesh. Every mesh is reassigned in a single transaction, with one command per shading group.
+    The shading groups that lose faces are known from the face assignments, so the scene is not queried again to plan.
+    Returns the AssignmentPlan, which is not applied when dry_run is set."""
+    shading_group_names, face_assignments = get_face_assignments(object_names)
+    majority = resolve_majority(len(shading_group_names), face_assignments)
+
+    plan = assignment.AssignmentPlan()
+    for (object_name, local_to_global, face_indices), shading_group_id in zip(face_assignments, majority):
+        if shading_group_id < 0:
+            continue
+        shading_group_name = shading_group_names[shading_group_id]
+        plan.add(shading_group_name, [object_name])
+        plan.source_shading_group_names[shading_group_name].update(
+            shading_group_names[global_id] for global_id in local_to_global[1:] if global_id != shading_group_id)
+
+    if not dry_run:
+        assignment.apply_assignments(plan, dispatcher, 'Remove Components')
+    return plan
@@ -0,0 +1,147 @@
+import re
+from array import array
+from collections import OrderedDict
+
+
+COMPONENT_PATTERN = re.compile(r'^(\w+)\[(\d+)(?::(\d+))?\]$')
+
+
+def parse_component_range(member_string):
+    """Returns the component range of a member string as a (component type, start, end) tuple.
+    Returns None for object assignments. Components that are not a single index range, such as
+    the cv[0][1] of a surface, are returned as (component string, None, None)."""
+    object_name, separator, component = member_string.partition('.')
+    if not separator:
+        return None
+    match = COMPONENT_PATTERN.match(component)
+    if match is None:
+        return component, None, None
+    start = int(match.group(2))
+    end = int(match.group(3)) if match.group(3) is not None else start
+    return match.group(1), start, end
+
+
+def get_index_ranges(indices):
+    """Returns a list of (start, end) pairs covering each run of consecutive integers in the given indices."""
+    ranges = []
+    for index in sorted(indices):
+        if ranges and index == ranges[-1][1] + 1:
+            ranges[-1][1] = index
+        elif not ranges or index > ranges[-1][1]:
+            ranges.append([index, index])
+    return [(start, end) for start, end in ranges]
+
+
+def merge_packed_ranges(packed_ranges):
+    """Returns packed ranges with overlapping and adjacent ranges merged, sorted by their start index.
+    Packed ranges are a flat array of start and end index pairs."""
+    pairs = sorted(zip(packed_ranges[0::2], packed_ranges[1::2]))
+    merged_ranges = array('i')
+    for start, end in pairs:
+        if merged_ranges and start <= merged_ranges[-1] + 1:
+            merged_ranges[-1] = max(merged_ranges[-1], end)
+        else:
+            merged_ranges.append(start)
+            merged_ranges.append(end)
+    return merged_ranges
+
+
+class MemberRecord(object):
+    """A compact record of the members of a shading group on a single object.
+    It holds the path of the object, the name that Maya uses for the object in member strings, and either no
+    component type for an object assignment, or a component type and its packed index ranges. Components that
+    are not a single index range keep their component string as the component type and have no ranges.
+    Member strings and selection lists are only produced from records when they are needed."""
+
+    __slots__ = ('object_path', 'name', 'component_type', 'ranges')
+
+    def __init__(self, object_path, name, component_type=None, ranges=None):
+        self.object_path = object_path
+        self.name = name
+        self.component_type = component_type
+        self.ranges = array('i') if ranges is None else ranges
+
+    def get_key(self):
+        return self.object_path, self.component_type
+
+    def has_components(self):
+        return self.component_type is not None
+
+    def get_ranges(self):
+        return list(zip(self.ranges[0::2], self.ranges[1::2]))
+
+    def get_component_count(self):
+        return sum(end - start + 1 for start, end in self.get_ranges())
+
+    def get_range_records(self):
+        """Returns a record for each index range of this record, or this record itself if it has at most one range."""
+        if len(self.ranges) <= 2:
+            return [self]
+        return [MemberRecord(self.object_path, self.name, self.component_type, array('i', (start, end)))
+                for start, end in self.get_ranges()]
+
+    def get_range_key(self):
+        return self.object_path, self.component_type, tuple(self.ranges)
+
+    def is_equal(self, other):
+        return self.get_key() == other.get_key() and self.name == other.name and self.ranges == other.ranges
+
+    def get_component_strings(self):
+        if self.component_type is None:
+            return []
+        if not self.ranges:
+            return [self.component_type]
+        return ['{0}[{1}]'.format(self.component_type, start) if start == end
+                else '{0}[{1}:{2}]'.format(self.component_type, start, end)
+                for start, end in self.get_ranges()]
+
+    def get_member_strings(self):
+        if self.component_type is None:
+            return [self.name]
+        return ['{0}.{1}'.format(self.name, component_string) for component_string in self.get_component_strings()]
+
+    def get_display_name(self):
+        if self.component_type is None:
+            return self.name
+        return '{0}.{1}'.format(self.name, ' '.join(self.get_component_strings()))
+
+
+def get_member_records(members):
+    """Groups a list of (member string, object path) pairs into member records, one per object and component type."""
+    records = OrderedDict()
+    for member_string, object_path in members:
+        name = member_string.partition('.')[0]
+        component_range = parse_component_range(member_string)
+        if component_range is None:
+            key = object_path, None
+            if key not in records:
+                records[key] = MemberRecord(object_path, name)
+            continue
+        component_type, start, end = component_range
+        key = object_path, component_type
+        record = records.get(key)
+        if record is None:
+            record = records[key] = MemberRecord(object_path, name, component_type)
+        if start is not None:
+            record.ranges.append(start)
+            record.ranges.append(end)
+    for record in records.values():
+        if len(record.ranges) > 2:
+            record.ranges = merge_packed_ranges(record.ranges)
+    return list(records.values())
+
+
+def merge_member_records(records):
+    """Merges member records of the same object and component type, merging their component ranges."""
+    merged_records = OrderedDict()
+    for record in records:
+        key = record.get_key()
+        merged_record = merged_records.get(key)
+        if merged_record is None:
+            merged_records[key] = MemberRecord(record.object_path, record.name, record.component_type, array('i', record.ranges))
+        else:
+            merged_record.ranges.extend(record.ranges)
+    for record in merged_records.values():
+        if len(record.ranges) > 2:
+            record.ranges = merge_packed_ranges(record.ranges)
+    return list(merged_records.values())
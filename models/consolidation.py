@@ -0,0 +1,104 @@
+import hashlib
+from collections import OrderedDict, deque
+
+from models import assignment
+from models import scene
+from models.profiler import profiler
+from models.scene import DEFAULT_SHADING_GROUP_NAMES
+
+
+def get_network_fingerprint(network):
+    """Returns a hash of a material network that is the same for every network of identical nodes, whatever the
+    nodes are named. The attribute values of the shading group come first. Nodes are numbered in the breadth first
+    order they are reached from the connections of the shading group, following the connections of each node sorted
+    by attribute, and described by their number, type, attribute values and the numbers of the nodes connected to
+    them. Each node and connection is visited once.
+    Returns None for a network with nothing connected to its shading group."""
+    if not network['roots']:
+        return None
+    nodes = network['nodes']
+    node_numbers = {}
+    pending_nodes = deque()
+
+    def get_node_number(name):
+        if name not in node_numbers:
+            node_numbers[name] = len(node_numbers)
+            pending_nodes.append(name)
+        return node_numbers[name]
+
+    parts = ['S {0}={1!r}'.format(attribute, value) for attribute, value in network['attributes']]
+    parts.extend('R {0} {1}.{2}'.format(attribute, get_node_number(name), source_attribute)
+                 for attribute, name, source_attribute in sorted(network['roots']))
+    while pending_nodes:
+        name = pending_nodes.popleft()
+        node_type, attribute_values, connections = nodes[name]
+        parts.append('N {0} {1}'.format(node_numbers[name], node_type))
+        parts.extend('A {0}={1!r}'.format(attribute, value) for attribute, value in attribute_values)
+        parts.extend('C {0} {1}.{2}'.format(attribute, get_node_number(source_name), source_attribute)
+                     for attribute, source_name, source_attribute in sorted(connections))
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def get_keeper_sort_key(shading_group_name):
+    """Sorts default shading groups first, then the shortest and alphabetically first names."""
+    return shading_group_name not in DEFAULT_SHADING_GROUP_NAMES, len(shading_group_name), shading_group_name
+
+
+@profiler.profiled('consolidation.find_duplicate_shading_groups', lambda result, *args, **kwargs: len(result))
+def find_duplicate_shading_groups(shading_groups=None):
+    """Returns a list of clusters of shading groups with identical material networks, each a list of names
+    starting with the shading group that the others will be merged into. Groups without shaders are left out.
+    Groups that cannot be deleted, because they are defaults or referenced, are only kept, never merged away."""
+    if shading_groups is None:
+        shading_groups = scene.get_shading_groups()
+    clusters = OrderedDict()
+    for shading_group in shading_groups:
+        fingerprint = get_network_fingerprint(scene.get_material_network(shading_group))
+        if fingerprint is not None:
+            clusters.setdefault(fingerprint, []).append(shading_group)
+
+    duplicates = []
+    for cluster in clusters.values():
+        if len(cluster) < 2:
+            continue
+        names = [scene.get_node_name(shading_group) for shading_group in cluster]
+        locked_names = set(name for name, shading_group in zip(names, cluster)
+                           if name in DEFAULT_SHADING_GROUP_NAMES or scene.get_reference_name(shading_group) is not None)
+        names.sort(key=get_keeper_sort_key)
+        # A locked group is kept in preference to any other, and any other locked groups stay as they are.
+        locked_keepers = [name for name in names if name in locked_names]
+        keeper = locked_keepers[0] if locked_keepers else names[0]
+        merged_names = [name for name in names if name != keeper and name not in locked_names]
+        if merged_names:
+            duplicates.append([keeper] + merged_names)
+    return duplicates
+
+
+def get_cluster_member_count(result, clusters, *args, **kwargs):
+    return sum(len(cluster) - 1 for cluster in clusters)
+
+
+@profiler.profiled('consolidation.merge_duplicate_shading_groups', get_cluster_member_count)
+def merge_duplicate_shading_groups(clusters, dry_run=False, dispatcher=None):
+    """Merges each cluster returned by find_duplicate_shading_groups into its first shading group.
+    The members of all the other groups of every cluster are assigned with one command per kept group,
+    then the merged groups are deleted, all within a single undo chunk.
+    Returns the AssignmentPlan of the member moves, which is not applied when dry_run is set."""
+    plan = assignment.AssignmentPlan()
+    merged_shading_groups = []
+    for cluster in clusters:
+        keeper = cluster[0]
+        plan.add(keeper, [])
+        for name in cluster[1:]:
+            shading_group = scene.get_node_from_name(name)
+            if shading_group is None:
+                continue
+            merged_shading_groups.append(shading_group)
+            plan.add(keeper, scene.get_shading_group_member_strings(shading_group))
+            plan.source_shading_group_names[keeper].add(name)
+
+    if not dry_run and merged_shading_groups:
+        with scene.undo_chunk('Merge Duplicate Shading Groups'):
+            assignment.apply_assignments(plan, dispatcher, 'Merge Duplicate Shading Groups')
+            scene.delete_nodes(merged_shading_groups)
+    return plan
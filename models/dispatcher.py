@@ -0,0 +1,141 @@
+from PySide2 import QtCore
+
+from models import scene
+from models.callback_registry import get_registry
+from models.profiler import profiler
+
+
+class SceneEventDispatcher(QtCore.QObject):
+    """Collects Maya message callbacks into sets of dirty shading groups and emits them in batches.
+    A single scene operation can trigger thousands of callbacks, so listeners are only notified
+    once per event loop idle tick, or once per flush interval when one is given in milliseconds."""
+
+    shading_groups_added = QtCore.Signal(list)
+    shading_groups_modified = QtCore.Signal(list)
+    shading_groups_removed = QtCore.Signal(list)
+    selection_changed = QtCore.Signal()
+    materials_modified = QtCore.Signal(list)
+
+    def __init__(self, parent=None, flush_interval=0):
+        super(SceneEventDispatcher, self).__init__(parent)
+
+        self.flush_timer = QtCore.QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(flush_interval)
+        self.flush_timer.timeout.connect(self.flush)
+
+        self.callback_registry = get_registry()
+
+        # Pending nodes are stored as handles keyed by node hash so they can be validated when flushed.
+        self.pending_added = {}
+        self.pending_modified = {}
+        self.pending_removed = set()
+        self.pending_materials = {}
+
+        # Set member events are dropped while suspended. Whoever suspends the dispatcher reports what changed on resume.
+        self.is_suspended = False
+
+        self.raw_event_count = 0
+        self.coalesced_event_count = 0
+        self.suppressed_event_count = 0
+        self.flush_count = 0
+
+    def register(self):
+        """Registers the scene callbacks of the dispatcher, removing any left behind by a previous dispatcher."""
+        self.callback_registry.claim(self)
+        scene.register_callbacks(self.callback_registry,
+                                 self.on_set_members_modified,
+                                 self.on_node_added,
+                                 self.on_node_removed,
+                                 self.selection_changed.emit,
+                                 self.on_material_changed)
+
+    def deregister(self):
+        self.flush_timer.stop()
+        self.callback_registry.release(self)
+
+    def set_flush_interval(self, flush_interval):
+        self.flush_timer.setInterval(flush_interval)
+
+    def suspend(self):
+        self.is_suspended = True
+
+    def resume(self, shading_groups=()):
+        """Resumes handling set member events and marks the given shading groups as modified."""
+        self.is_suspended = False
+        for shading_group in shading_groups:
+            self.on_set_members_modified(shading_group)
+
+    def schedule_flush(self):
+        self.raw_event_count += 1
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def on_set_members_modified(self, node):
+        if self.is_suspended:
+            self.suppressed_event_count += 1
+            return
+        node_hash = scene.get_node_hash(node)
+        if node_hash not in self.pending_added:
+            self.pending_modified[node_hash] = scene.get_node_handle(node)
+        self.schedule_flush()
+
+    def on_material_changed(self, node):
+        # Material edits are reported even while suspended, as whoever suspends the dispatcher only edits members.
+        self.pending_materials[scene.get_node_hash(node)] = scene.get_node_handle(node)
+        self.schedule_flush()
+
+    def on_node_added(self, node):
+        node_hash = scene.get_node_hash(node)
+        self.pending_removed.discard(node_hash)
+        self.pending_added[node_hash] = scene.get_node_handle(node)
+        self.schedule_flush()
+
+    def on_node_removed(self, node):
+        node_hash = scene.get_node_hash(node)
+        self.pending_modified.pop(node_hash, None)
+        self.pending_materials.pop(node_hash, None)
+        # A node that is created and deleted within the same batch never needs to be reported.
+        if self.pending_added.pop(node_hash, None) is None:
+            self.pending_removed.add(node_hash)
+        self.schedule_flush()
+
+    def flush(self):
+        with profiler.measure('dispatcher.flush') as measurement:
+            added = self.take_valid_nodes(self.pending_added)
+            modified = self.take_valid_nodes(self.pending_modified)
+            materials = self.take_valid_nodes(self.pending_materials)
+            removed = list(self.pending_removed)
+            self.pending_removed = set()
+
+            self.flush_count += 1
+            measurement.item_count = len(added) + len(modified) + len(removed) + len(materials)
+            self.coalesced_event_count += measurement.item_count
+
+            if removed:
+                self.shading_groups_removed.emit(removed)
+            if added:
+                self.shading_groups_added.emit(added)
+            if modified:
+                self.shading_groups_modified.emit(modified)
+            if materials:
+                self.materials_modified.emit(materials)
+
+    @staticmethod
+    def take_valid_nodes(pending):
+        nodes = []
+        for handle in pending.values():
+            node = scene.get_node_from_handle(handle)
+            if node is not None:
+                nodes.append(node)
+        pending.clear()
+        return nodes
+
+    def get_statistics(self):
+        return {
+            'raw_events': self.raw_event_count,
+            'coalesced_events': self.coalesced_event_count,
+            'suppressed_events': self.suppressed_event_count,
+            'flushes': self.flush_count,
+            'callbacks': self.callback_registry.get_statistics(),
+        }
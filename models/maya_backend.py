@@ -0,0 +1,581 @@
+import contextlib
+import hashlib
+import os
+from array import array
+
+import maya.OpenMaya as om
+import maya.api.OpenMaya as om2
+import maya.api.OpenMayaRender as omr2
+import maya.cmds as cmds
+
+from models.backend import SceneBackend, is_member_attribute
+
+
+class MayaBackend(SceneBackend):
+    """The scene backend of a live Maya session, built on the Maya Python API and commands."""
+
+    def get_shading_groups(self):
+        """Traverses the scene for shading group dependency nodes."""
+        shading_groups = []
+        dg_node_fn = om.MFnDependencyNode()
+        dg_node_iter = om.MItDependencyNodes(om.MFn.kShadingEngine)
+        while not dg_node_iter.isDone():
+            shading_groups.append(dg_node_iter.thisNode())
+            dg_node_iter.next()
+        return shading_groups
+
+    def get_node_name(self, node):
+        if type(node) != om.MObject:
+            raise TypeError
+        dg_node_fn = om.MFnDependencyNode(node)
+        return dg_node_fn.name()
+
+    def get_node_from_name(self, name):
+        """Returns the dependency node of the given name, or None if it does not exist."""
+        selection_list = om.MSelectionList()
+        try:
+            selection_list.add(name)
+        except RuntimeError:
+            return None
+        node = om.MObject()
+        selection_list.getDependNode(0, node)
+        return node
+
+    def get_node_hash(self, node):
+        """Returns a hash that uniquely identifies the given node for as long as it exists in the scene.
+        MObjects themselves are not hashable, so this is used to key lookups by node."""
+        if type(node) != om.MObject:
+            raise TypeError
+        return om.MObjectHandle(node).hashCode()
+
+    def get_node_handle(self, node):
+        """Returns a handle that can be used to safely test whether the given node still exists at a later time."""
+        if type(node) != om.MObject:
+            raise TypeError
+        return om.MObjectHandle(node)
+
+    def get_node_from_handle(self, handle):
+        """Returns the node referenced by the given handle, or None if it has since been deleted."""
+        if not handle.isValid() or not handle.isAlive():
+            return None
+        return handle.object()
+
+    def is_shading_group(self, node):
+        return type(node) == om.MObject and not node.isNull() and node.hasFn(om.MFn.kShadingEngine)
+
+    def get_reference_name(self, node):
+        dg_node_fn = om.MFnDependencyNode(node)
+        if not dg_node_fn.isFromReferencedFile():
+            return None
+        return cmds.referenceQuery(dg_node_fn.name(), referenceNode=True)
+
+    def get_shading_group_members(self, shading_group):
+        """Returns a list of (member string, object path) pairs for the objects and components assigned to the given shading group.
+        The object path is the full path of the assigned shape for DAG members, or the node name otherwise."""
+        members = []
+        if not self.is_shading_group(shading_group):
+            raise TypeError
+        set_fn = om.MFnSet(shading_group)
+        selection_list = om.MSelectionList()
+        set_fn.getMembers(selection_list, False)
+        selection_list_iter = om.MItSelectionList(selection_list)
+        while not selection_list_iter.isDone():
+            selection_strings = []
+            selection_list_iter.getStrings(selection_strings)
+            object_path = self.get_selection_item_object_path(selection_list_iter)
+            members.extend((selection_string, object_path) for selection_string in selection_strings)
+            selection_list_iter.next()
+        return members
+
+    def get_shading_group_signature(self, shading_group):
+        """Describes a shading group by its name, the number of member connections of its DAG and DG member arrays, and
+        a hash of the component lists of the component groups connected to it.
+        Objects and component groups being added or removed change the connections, and components moving between
+        groups change the component lists, without listing any members."""
+        dg_node_fn = om.MFnDependencyNode(shading_group)
+        dag_set_members_plug = dg_node_fn.findPlug('dagSetMembers')
+        component_list_hash = hashlib.sha1()
+        array_indices = om.MIntArray()
+        dag_set_members_plug.getExistingArrayAttributeIndices(array_indices)
+        for element_index in array_indices:
+            source_plugs = om.MPlugArray()
+            dag_set_members_plug.elementByLogicalIndex(element_index).connectedTo(source_plugs, True, False)
+            for plug_index in range(source_plugs.length()):
+                source_plug = source_plugs[plug_index]
+                source_node_fn = om.MFnDependencyNode(source_plug.node())
+                if source_plug.attribute() != source_node_fn.attribute('objectGroups'):
+                    continue
+                component_list_plug = source_plug.child(source_node_fn.attribute('objectGrpCompList'))
+                component_strings = cmds.getAttr(component_list_plug.name()) or []
+                component_list_hash.update('{0}={1}\n'.format(source_plug.name(), ' '.join(component_strings)).encode('utf-8'))
+        return '{0}:{1}:{2}:{3}'.format(dg_node_fn.name(), dag_set_members_plug.numConnectedElements(),
+                                        dg_node_fn.findPlug('dnSetMembers').numConnectedElements(),
+                                        component_list_hash.hexdigest())
+
+    def get_selection_item_object_path(self, selection_list_iter):
+        if selection_list_iter.itemType() == om.MItSelectionList.kDagSelectionItem:
+            dag_path = om.MDagPath()
+            component = om.MObject()
+            selection_list_iter.getDagPath(dag_path, component)
+            try:
+                dag_path.extendToShape()
+            except RuntimeError:
+                pass
+            return dag_path.fullPathName()
+        node = om.MObject()
+        selection_list_iter.getDependNode(node)
+        return self.get_node_name(node)
+
+    def get_object_path(self, name):
+        """Returns the path used to identify the object of the given name or member string, or None if it does not exist."""
+        selection_list = om.MSelectionList()
+        try:
+            selection_list.add(name)
+        except RuntimeError:
+            return None
+        return self.get_selection_item_object_path(om.MItSelectionList(selection_list))
+
+    def get_face_shading_groups(self, name):
+        selection_list = om.MSelectionList()
+        try:
+            selection_list.add(name)
+        except RuntimeError:
+            return None
+        dag_path = om.MDagPath()
+        try:
+            selection_list.getDagPath(0, dag_path)
+            dag_path.extendToShape()
+        except RuntimeError:
+            return None
+        if not dag_path.hasFn(om.MFn.kMesh):
+            return None
+        return self.get_mesh_face_shading_groups(dag_path)
+
+    def get_mesh_face_shading_groups(self, dag_path):
+        shaders = om.MObjectArray()
+        face_indices = om.MIntArray()
+        om.MFnMesh(dag_path).getConnectedShaders(dag_path.instanceNumber(), shaders, face_indices)
+        shading_group_names = [self.get_node_name(shaders[index]) for index in range(shaders.length())]
+        return shading_group_names, array('i', face_indices)
+
+    def get_component_face_indices(self, component_list_plug):
+        """Returns the indices of the faces in the component list of an objectGroups plug."""
+        face_indices = []
+        component_list_data = component_list_plug.asMObject()
+        if component_list_data.isNull():
+            return face_indices
+        component_list_fn = om.MFnComponentListData(component_list_data)
+        for component_index in range(component_list_fn.length()):
+            component = component_list_fn[component_index]
+            if component.hasFn(om.MFn.kMeshPolygonComponent):
+                elements = om.MIntArray()
+                om.MFnSingleIndexedComponent(component).getElements(elements)
+                face_indices.extend(elements)
+        return face_indices
+
+    def get_connection_face_shading_groups(self, dag_path, connections):
+        """Returns the face shading groups of a mesh instance from its live (source plug, shading group name) connections.
+        Faces of component groups take their shading group, and an object assignment covers every other face."""
+        dag_node_fn = om.MFnDagNode(dag_path)
+        object_groups_attribute = dag_node_fn.attribute('objectGroups')
+        component_list_attribute = dag_node_fn.attribute('objectGrpCompList')
+        shading_group_names = []
+        face_indices = array('i', [-1]) * om.MFnMesh(dag_path).numPolygons()
+        object_index = None
+        for source_plug, shading_group_name in connections:
+            if shading_group_name not in shading_group_names:
+                shading_group_names.append(shading_group_name)
+            index = shading_group_names.index(shading_group_name)
+            if source_plug.attribute() != object_groups_attribute:
+                object_index = index
+                continue
+            for face_index in self.get_component_face_indices(source_plug.child(component_list_attribute)):
+                if face_index < len(face_indices):
+                    face_indices[face_index] = index
+        if object_index is not None:
+            for face_index, index in enumerate(face_indices):
+                if index < 0:
+                    face_indices[face_index] = object_index
+        return shading_group_names, face_indices
+
+    def get_assignment_connections(self):
+        """Walks every shape instance of the DAG once, following the connections of its instObjGroups plug and of
+        each of its objectGroups plugs to shading groups, and the dagSetMembers connections of every shading group.
+        Face assignments and residual connections are read from those plugs alone. Intermediate objects are skipped."""
+        shapes = []
+        dag_iter = om.MItDag(om.MItDag.kDepthFirst, om.MFn.kShape)
+        while not dag_iter.isDone():
+            dag_path = om.MDagPath()
+            dag_iter.getPath(dag_path)
+            dag_node_fn = om.MFnDagNode(dag_path)
+            if not dag_node_fn.isIntermediateObject():
+                object_groups_attribute = dag_node_fn.attribute('objectGroups')
+                connections = []
+                live_connections = []
+                # Connections left behind by instances that no longer exist are only listed with the first instance.
+                for source_plug, destination_plug in self.get_shading_group_connections(dag_path, None,
+                                                                                        dag_path.instanceNumber() == 0):
+                    shading_group_name = self.get_node_name(destination_plug.node())
+                    is_residual = self.is_residual_connection(dag_path, source_plug)
+                    connections.append((shading_group_name, source_plug.attribute() == object_groups_attribute, is_residual))
+                    if not is_residual:
+                        live_connections.append((source_plug, shading_group_name))
+                face_shading_groups = None
+                if dag_path.hasFn(om.MFn.kMesh):
+                    face_shading_groups = self.get_connection_face_shading_groups(dag_path, live_connections)
+                shapes.append((dag_path.fullPathName(), self.get_node_hash(dag_path.node()), dag_path.instanceNumber(),
+                               dag_node_fn.instanceCount(True), face_shading_groups, connections))
+            dag_iter.next()
+
+        shading_groups = {}
+        for shading_group in self.get_shading_groups():
+            dg_node_fn = om.MFnDependencyNode(shading_group)
+            member_count = dg_node_fn.findPlug('dnSetMembers').numConnectedElements()
+            dag_set_members_plug = dg_node_fn.findPlug('dagSetMembers')
+            array_indices = om.MIntArray()
+            dag_set_members_plug.getExistingArrayAttributeIndices(array_indices)
+            for element_index in array_indices:
+                source_plugs = om.MPlugArray()
+                dag_set_members_plug.elementByLogicalIndex(element_index).connectedTo(source_plugs, True, False)
+                for plug_index in range(source_plugs.length()):
+                    source_node = source_plugs[plug_index].node()
+                    if not source_node.hasFn(om.MFn.kShape) or om.MFnDagNode(source_node).isIntermediateObject():
+                        member_count += 1
+            shading_groups[dg_node_fn.name()] = member_count
+        return {'shapes': shapes, 'shading_groups': shading_groups}
+
+    def get_selection_list_from_names(self, names):
+        """Returns an MSelectionList produced from the given list of strings.
+        This can be used to easily select groups of contiguous components."""
+        selection_list = om.MSelectionList()
+        for name in names:
+            selection_list.add(name)
+        return selection_list
+
+    def has_components(self, selection_list):
+        if not type(selection_list) == om.MSelectionList:
+            raise TypeError
+        it = om.MItSelectionList(selection_list)
+        while not it.isDone():
+            if it.hasComponents():
+                return True
+            it.next()
+        return False
+
+    def select_names(self, names):
+        if names:
+            cmds.select(names, replace=True, noExpand=True)
+        else:
+            cmds.select(clear=True)
+
+    def get_selection_strings(self):
+        """Returns the current active selection as a list of strings, with contiguous components merged into ranges."""
+        current_selection = om.MSelectionList()
+        om.MGlobal.getActiveSelectionList(current_selection)
+        selection_strings = []
+        current_selection.getSelectionStrings(selection_strings)
+        return selection_strings
+
+    def get_assigned_shading_group_names(self, name):
+        """Returns the names of the shading groups that the given object, or the object of the given component, is assigned to."""
+        object_name = name.partition('.')[0]
+        return cmds.listSets(object=object_name, type=1, extendToShape=True) or []
+
+    def get_assigned_shading_group_names_by_object(self, names):
+        """Follows the instObjGroups and objectGroups connections of every object, or of each shape below it, through
+        the API rather than running a command per object. Residual connections are left out."""
+        shading_group_names = {}
+        for name in names:
+            object_name = name.partition('.')[0]
+            if object_name in shading_group_names:
+                continue
+            object_shading_group_names = shading_group_names[object_name] = []
+            selection_list = om.MSelectionList()
+            dag_path = om.MDagPath()
+            try:
+                selection_list.add(object_name)
+                selection_list.getDagPath(0, dag_path)
+            except RuntimeError:
+                continue
+            dag_paths = [dag_path]
+            if not dag_path.hasFn(om.MFn.kShape):
+                for child_index in range(dag_path.childCount()):
+                    child = dag_path.child(child_index)
+                    if child.hasFn(om.MFn.kShape) and not om.MFnDagNode(child).isIntermediateObject():
+                        shape_path = om.MDagPath(dag_path)
+                        shape_path.push(child)
+                        dag_paths.append(shape_path)
+            for path in dag_paths:
+                for source_plug, destination_plug in self.get_shading_group_connections(path, None):
+                    shading_group_name = self.get_node_name(destination_plug.node())
+                    if (shading_group_name not in object_shading_group_names
+                            and not self.is_residual_connection(path, source_plug)):
+                        object_shading_group_names.append(shading_group_name)
+        return shading_group_names
+
+    def assign_to_shading_group(self, element_names, shading_group_name):
+        """Assigns an element name or a list of element names to a shading group in a single command."""
+        if not element_names:
+            return
+        cmds.sets(element_names, forceElement=shading_group_name, noWarnings=True)
+
+    def delete_nodes(self, nodes):
+        cmds.delete([self.get_node_name(node) for node in nodes])
+
+    @contextlib.contextmanager
+    def undo_chunk(self, name):
+        """Groups all commands executed within the context into a single undo step."""
+        cmds.undoInfo(openChunk=True, chunkName=name)
+        try:
+            yield
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+    def remove_from_shading_group(self, selection_list, shading_group):
+        """Removes the members in the given selection list from the shading group.
+        Only the selected items that are members of the set are removed, so the cost is proportional to the
+        size of the selection rather than the size of the shading group."""
+        set_fn = om.MFnSet(shading_group)
+
+        # Get the members of the selection that belong to the set.
+        removal = om.MSelectionList()
+        dag_paths = []
+        selection_list_iter = om.MItSelectionList(selection_list)
+        while not selection_list_iter.isDone():
+            if selection_list_iter.itemType() == om.MItSelectionList.kDagSelectionItem:
+                dag_path = om.MDagPath()
+                component = om.MObject()
+                selection_list_iter.getDagPath(dag_path, component)
+                if set_fn.isMember(dag_path, component):
+                    removal.add(dag_path, component, True)
+                    dag_paths.append(dag_path)
+            else:
+                node = om.MObject()
+                selection_list_iter.getDependNode(node)
+                if set_fn.isMember(node):
+                    removal.add(node, True)
+            selection_list_iter.next()
+
+        if removal.isEmpty():
+            return
+
+        set_fn.removeMembers(removal)
+        self.break_residual_connections(shading_group, dag_paths)
+
+    def break_residual_connections(self, shading_group, dag_paths):
+        """Disconnects instObjGroups and objectGroups plugs of the given objects that remain connected to the shading group
+        even though they no longer contribute members to it. All disconnections are made through a single modifier."""
+        dg_modifier = om.MDGModifier()
+        has_disconnections = False
+        visited_paths = set()
+        for dag_path in dag_paths:
+            dag_path = om.MDagPath(dag_path)
+            try:
+                dag_path.extendToShape()
+            except RuntimeError:
+                pass
+            full_path_name = dag_path.fullPathName()
+            if full_path_name in visited_paths:
+                continue
+            visited_paths.add(full_path_name)
+
+            for source_plug, destination_plug in self.get_shading_group_connections(dag_path, shading_group, True):
+                if self.is_residual_connection(dag_path, source_plug):
+                    dg_modifier.disconnect(source_plug, destination_plug)
+                    has_disconnections = True
+
+        if has_disconnections:
+            dg_modifier.doIt()
+
+    def remove_residual_connections(self, shading_group, object_paths):
+        dag_paths = []
+        for object_path in object_paths:
+            selection_list = om.MSelectionList()
+            dag_path = om.MDagPath()
+            try:
+                selection_list.add(object_path)
+                selection_list.getDagPath(0, dag_path)
+            except RuntimeError:
+                continue
+            dag_paths.append(dag_path)
+        self.break_residual_connections(shading_group, dag_paths)
+
+    def get_shading_group_connections(self, dag_path, shading_group, include_removed_instances=False):
+        """Returns (source plug, destination plug) pairs for each instObjGroups or objectGroups plug of the given
+        object instance that is connected to the shading group, or to any shading group if it is None.
+        The plugs of instances of the shape that no longer exist can be included as well."""
+        connections = []
+        dag_node_fn = om.MFnDagNode(dag_path)
+        inst_obj_groups_array_plug = dag_node_fn.findPlug('instObjGroups', True)
+        instance_plugs = [inst_obj_groups_array_plug.elementByLogicalIndex(dag_path.instanceNumber())]
+        if include_removed_instances:
+            instance_count = dag_node_fn.instanceCount(True)
+            array_indices = om.MIntArray()
+            inst_obj_groups_array_plug.getExistingArrayAttributeIndices(array_indices)
+            instance_plugs.extend(inst_obj_groups_array_plug.elementByLogicalIndex(element_index)
+                                  for element_index in array_indices if element_index >= instance_count)
+        source_plugs = []
+        for inst_obj_groups_plug in instance_plugs:
+            source_plugs.append(inst_obj_groups_plug)
+            object_groups_plug = inst_obj_groups_plug.child(dag_node_fn.attribute('objectGroups'))
+            array_indices = om.MIntArray()
+            object_groups_plug.getExistingArrayAttributeIndices(array_indices)
+            for element_index in array_indices:
+                source_plugs.append(object_groups_plug.elementByLogicalIndex(element_index))
+
+        for source_plug in source_plugs:
+            destination_plugs = om.MPlugArray()
+            source_plug.connectedTo(destination_plugs, False, True)
+            for plug_index in range(destination_plugs.length()):
+                destination_plug = destination_plugs[plug_index]
+                destination_node = destination_plug.node()
+                if destination_node == shading_group or (shading_group is None and destination_node.hasFn(om.MFn.kShadingEngine)):
+                    connections.append((source_plug, destination_plug))
+        return connections
+
+    def is_residual_connection(self, dag_path, source_plug):
+        """Returns whether a connection from an instObjGroups or objectGroups plug no longer assigns anything to its set,
+        reading only the plug itself: either it belongs to an instance that no longer exists, or it is a component
+        group whose component list is empty."""
+        dag_node_fn = om.MFnDagNode(dag_path)
+        if source_plug.attribute() != dag_node_fn.attribute('objectGroups'):
+            return source_plug.logicalIndex() >= dag_node_fn.instanceCount(True)
+        if source_plug.array().parent().logicalIndex() >= dag_node_fn.instanceCount(True):
+            return True
+        component_list_plug = source_plug.child(dag_node_fn.attribute('objectGrpCompList'))
+        component_list_data = component_list_plug.asMObject()
+        if component_list_data.isNull():
+            return True
+        return om.MFnComponentListData(component_list_data).length() == 0
+
+    def merge_selection_lists(self, selection_lists):
+        merged_selection_list = om.MSelectionList()
+        for selection_list in selection_lists:
+            if type(selection_list) != om.MSelectionList:
+                continue
+            merged_selection_list.merge(selection_list)
+        return merged_selection_list
+
+    def get_material_shaders(self, shading_group_name):
+        return cmds.listConnections(shading_group_name + '.surfaceShader', shading_group_name + '.volumeShader',
+                                    shading_group_name + '.displacementShader', source=True, destination=False) or []
+
+    def get_attribute_values(self, node):
+        """Returns (attribute, value) pairs for the keyable and file name attributes of a node.
+        Texture files also contribute their modification time."""
+        values = []
+        file_attributes = set(cmds.listAttr(node, usedAsFilename=True) or [])
+        for attribute in sorted(set(cmds.listAttr(node, keyable=True, scalar=True) or []) | file_attributes):
+            try:
+                value = cmds.getAttr('{0}.{1}'.format(node, attribute))
+            except (RuntimeError, ValueError):
+                continue
+            values.append((attribute, value))
+            if attribute in file_attributes and value and os.path.isfile(value):
+                values.append((attribute + '.mtime', os.path.getmtime(value)))
+        return values
+
+    def get_material_network_signature(self, shading_group):
+        """Describes every node upstream of the shaders of a shading group by its type, attribute values and
+        incoming connections."""
+        shaders = self.get_material_shaders(self.get_node_name(shading_group))
+        if not shaders:
+            return ''
+        parts = []
+        for node in sorted(set(cmds.listHistory(shaders, pruneDagObjects=True) or [])):
+            parts.append(cmds.nodeType(node))
+            parts.extend('{0}={1}'.format(attribute, value) for attribute, value in self.get_attribute_values(node))
+            parts.extend(cmds.listConnections(node, source=True, destination=False, connections=True, plugs=True) or [])
+        return '\n'.join(parts)
+
+    def get_material_network(self, shading_group):
+        """Walks the nodes upstream of every incoming connection of a shading group other than its members, reading
+        each node and connection once. The keyable attribute values of the shading group itself are read as well."""
+        shading_group_name = self.get_node_name(shading_group)
+        network = {'roots': [], 'attributes': self.get_attribute_values(shading_group_name), 'nodes': {}}
+        pending_nodes = []
+        plugs = cmds.listConnections(shading_group_name, source=True, destination=False, connections=True, plugs=True) or []
+        for destination_plug, source_plug in zip(plugs[0::2], plugs[1::2]):
+            attribute = destination_plug.partition('.')[2]
+            if is_member_attribute(attribute):
+                continue
+            source_node, separator, source_attribute = source_plug.partition('.')
+            network['roots'].append((attribute, source_node, source_attribute))
+            pending_nodes.append(source_node)
+        while pending_nodes:
+            node = pending_nodes.pop()
+            if node in network['nodes']:
+                continue
+            connections = []
+            plugs = cmds.listConnections(node, source=True, destination=False, connections=True, plugs=True) or []
+            for destination_plug, source_plug in zip(plugs[0::2], plugs[1::2]):
+                source_node, separator, source_attribute = source_plug.partition('.')
+                connections.append((destination_plug.partition('.')[2], source_node, source_attribute))
+                pending_nodes.append(source_node)
+            network['nodes'][node] = (cmds.nodeType(node), self.get_attribute_values(node), connections)
+        return network
+
+    def render_swatch(self, shading_group, path, size):
+        """Renders the surface shader of a shading group on a sphere with the material viewer renderer of Viewport 2.0.
+        The renderer is only available through the Python API 2.0, so the shader is looked up again by name there.
+        Renders fail with a RuntimeError when Viewport 2.0 is unavailable, such as in batch sessions."""
+        shaders = cmds.listConnections(self.get_node_name(shading_group) + '.surfaceShader',
+                                       source=True, destination=False) or []
+        if not shaders:
+            return False
+        selection_list = om2.MSelectionList()
+        selection_list.add(shaders[0])
+        image = om2.MImage()
+        try:
+            omr2.MRenderUtilities.renderMaterialViewerGeometry('meshSphere', selection_list.getDependNode(0), image)
+        except RuntimeError:
+            return False
+        image.resize(size, size)
+        image.writeToFile(path, 'png')
+        return True
+
+    def get_scene_path(self):
+        return cmds.file(query=True, sceneName=True) or None
+
+    def is_scene_modified(self):
+        return cmds.file(query=True, modified=True)
+
+    def open_file(self, path):
+        cmds.file(path, open=True, force=True, prompt=False)
+
+    def save_file(self, path=None):
+        """Saves the scene, as a Maya binary file if its path ends in .mb and as a Maya ASCII file otherwise."""
+        if path is not None:
+            cmds.file(rename=path)
+        scene_path = cmds.file(query=True, sceneName=True)
+        file_type = 'mayaBinary' if scene_path.lower().endswith('.mb') else 'mayaAscii'
+        cmds.file(save=True, force=True, type=file_type)
+
+    def add_set_members_modified_callback(self, node, func):
+        set_message = om.MObjectSetMessage()
+        return set_message.addSetMembersModifiedCallback(node, lambda set_node, client_data: func(set_node))
+
+    def add_material_changed_callback(self, node, func):
+        """Edits anywhere upstream of the shading group dirty the plugs its shaders are connected to."""
+        def on_plug_dirty(dirty_node, plug, client_data):
+            if not is_member_attribute(plug.partialName(False, False, False, False, False, True)):
+                func(dirty_node)
+
+        node_message = om.MNodeMessage()
+        return node_message.addNodeDirtyPlugCallback(node, on_plug_dirty)
+
+    def add_node_added_callback(self, func, node_type):
+        dg_message = om.MDGMessage()
+        return dg_message.addNodeAddedCallback(lambda node, client_data: func(node), node_type)
+
+    def add_selection_changed_callback(self, func):
+        event_message = om.MEventMessage()
+        return event_message.addEventCallback('SelectionChanged', lambda client_data: func())
+
+    def add_node_removed_callback(self, func, node_type):
+        dg_message = om.MDGMessage()
+        return dg_message.addNodeRemovedCallback(lambda node, client_data: func(node), node_type)
+
+    def remove_callback(self, callback_id):
+        message = om.MMessage()
+        message.removeCallback(callback_id)
@@ -0,0 +1,517 @@
+import contextlib
+import hashlib
+import itertools
+import json
+import struct
+import zlib
+from array import array
+
+from models.backend import SceneBackend, is_member_attribute
+from models.components import COMPONENT_PATTERN, get_index_ranges
+
+
+class MemoryNode(object):
+    """A dependency node of the in-memory scene.
+    Shading groups store their members in a dictionary mapping object paths to None for object assignments,
+    or to a dictionary mapping component types to sets of component indices, and hold the description of
+    their material network in the form returned by get_material_network."""
+
+    def __init__(self, name, node_type, node_hash):
+        self.name = name
+        self.node_type = node_type
+        self.hash = node_hash
+        self.is_alive = True
+        self.members = {} if node_type == 'shadingEngine' else None
+        self.material_network = {'roots': [], 'attributes': [], 'nodes': {}} if node_type == 'shadingEngine' else None
+
+
+class MemoryMesh(MemoryNode):
+    """A mesh shape and its transform. Every component type of the mesh has face_count components."""
+
+    def __init__(self, name, node_hash, face_count):
+        super(MemoryMesh, self).__init__(name + 'Shape', 'mesh', node_hash)
+        self.transform_name = name
+        self.path = '|{0}|{1}'.format(name, self.name)
+        self.face_count = face_count
+        self.shading_groups = set()
+
+
+class MemorySelectionList(object):
+    """A selection list of the in-memory scene, stored in the same form as shading group members."""
+
+    def __init__(self):
+        self.members = {}
+        self.nodes = []
+
+    def add(self, object_path, components):
+        merge_members(self.members, object_path, components)
+
+    def merge(self, selection_list):
+        for object_path, components in selection_list.members.items():
+            self.add(object_path, components)
+        for node in selection_list.nodes:
+            if node not in self.nodes:
+                self.nodes.append(node)
+
+    def is_empty(self):
+        return not self.members and not self.nodes
+
+
+def merge_members(members, object_path, components):
+    """Adds an object assignment, or a dictionary of component indices, to a members dictionary."""
+    if object_path in members and members[object_path] is None:
+        return
+    if components is None or object_path not in members:
+        members[object_path] = None if components is None else dict(
+            (component_type, set(indices)) for component_type, indices in components.items())
+        return
+    existing_components = members[object_path]
+    for component_type, indices in components.items():
+        existing_components.setdefault(component_type, set()).update(indices)
+
+
+def subtract_members(members, object_path, components, component_count):
+    """Removes an object, or a dictionary of component indices, from a members dictionary.
+    Removing components from an object assignment leaves the remaining components assigned, as Maya does.
+    Returns whether anything was removed."""
+    if object_path not in members:
+        return False
+    if components is None:
+        del members[object_path]
+        return True
+    existing_components = members[object_path]
+    if existing_components is None:
+        existing_components = dict((component_type, set(range(component_count))) for component_type in components)
+        members[object_path] = existing_components
+    is_modified = False
+    for component_type, indices in components.items():
+        existing_indices = existing_components.get(component_type)
+        if not existing_indices:
+            continue
+        count = len(existing_indices)
+        existing_indices.difference_update(indices)
+        is_modified = is_modified or len(existing_indices) != count
+        if not existing_indices:
+            del existing_components[component_type]
+    if not existing_components:
+        del members[object_path]
+    return is_modified
+
+
+def write_solid_png(path, size, color):
+    """Writes a square PNG file filled with a single RGB color."""
+    def get_chunk(chunk_type, data):
+        return (struct.pack('>I', len(data)) + chunk_type + data +
+                struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+
+    row = b'\x00' + struct.pack('BBB', *color) * size
+    with open(path, 'wb') as png_file:
+        png_file.write(b'\x89PNG\r\n\x1a\n')
+        png_file.write(get_chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0)))
+        png_file.write(get_chunk(b'IDAT', zlib.compress(row * size)))
+        png_file.write(get_chunk(b'IEND', b''))
+
+
+class MemoryBackend(SceneBackend):
+    """A pure Python stand-in for a Maya scene, used to measure and exercise the tool outside of Maya.
+    It simulates shading groups, mesh objects, exclusive set membership with component ranges, the active selection
+    and the set members modified, node added and node removed messages. Undo chunks are recorded but not undoable.
+    Scene files are JSON descriptions listing meshes with their face counts and shading groups with their member
+    strings and material networks."""
+
+    def __init__(self):
+        self.nodes = {}
+        self.meshes = {}
+        self.object_paths = {}
+        self.file_path = None
+        self.is_modified = False
+        self.hash_counter = itertools.count(1)
+        self.callback_counter = itertools.count(1)
+        self.set_members_modified_callbacks = {}
+        self.material_changed_callbacks = {}
+        self.callback_node_hashes = {}
+        self.node_added_callbacks = {}
+        self.node_removed_callbacks = {}
+        self.selection_changed_callbacks = {}
+        self.active_selection = MemorySelectionList()
+        self.undo_chunks = []
+        self.select_count = 0
+
+    # Scene construction.
+
+    def create_shading_group(self, name):
+        node = MemoryNode(name, 'shadingEngine', next(self.hash_counter))
+        self.nodes[name] = node
+        self.notify_node_callbacks(self.node_added_callbacks, node)
+        return node
+
+    def create_mesh(self, name, face_count):
+        mesh = MemoryMesh(name, next(self.hash_counter), face_count)
+        self.nodes[mesh.name] = mesh
+        self.meshes[mesh.path] = mesh
+        for object_name in (mesh.transform_name, mesh.name, mesh.path):
+            self.object_paths[object_name] = mesh.path
+        self.notify_node_callbacks(self.node_added_callbacks, mesh)
+        return mesh
+
+    def delete_node(self, node):
+        self.notify_node_callbacks(self.node_removed_callbacks, node)
+        if isinstance(node, MemoryMesh):
+            for shading_group in list(node.shading_groups):
+                del shading_group.members[node.path]
+                self.notify_set_members_modified(shading_group)
+            del self.meshes[node.path]
+            for object_name in (node.transform_name, node.name, node.path):
+                del self.object_paths[object_name]
+        elif node.members is not None:
+            for object_path in node.members:
+                self.meshes[object_path].shading_groups.discard(node)
+            self.set_members_modified_callbacks.pop(node.hash, None)
+            self.material_changed_callbacks.pop(node.hash, None)
+        del self.nodes[node.name]
+        node.is_alive = False
+
+    def clear(self):
+        """Empties the scene without sending messages, as opening a new scene does."""
+        self.nodes = {}
+        self.meshes = {}
+        self.object_paths = {}
+        self.set_members_modified_callbacks = {}
+        self.material_changed_callbacks = {}
+        self.callback_node_hashes = {}
+        self.active_selection = MemorySelectionList()
+
+    def load_description(self, description):
+        self.clear()
+        for name, face_count in description['meshes']:
+            self.create_mesh(name, face_count)
+        for shading_group_description in description['shading_groups']:
+            name, member_strings = shading_group_description[:2]
+            shading_group = self.create_shading_group(name)
+            if len(shading_group_description) > 2:
+                shading_group.material_network = shading_group_description[2]
+            if member_strings:
+                self.assign_to_shading_group(member_strings, name)
+
+    def get_description(self):
+        return {
+            'meshes': [[mesh.transform_name, mesh.face_count] for mesh in self.meshes.values()],
+            'shading_groups': [[shading_group.name, [member_string for member_string, object_path
+                                                     in self.get_shading_group_members(shading_group)],
+                                shading_group.material_network]
+                               for shading_group in self.get_shading_groups()],
+        }
+
+    def set_selection_from_names(self, names):
+        """Replaces the active selection, as a user selecting objects and components in the viewport would."""
+        self.active_selection = self.get_selection_list_from_names(names)
+        self.notify_selection_changed()
+
+    # Names.
+
+    def parse_name(self, name):
+        """Returns the object path and the component indices, or None for objects, of a name or member string."""
+        object_name, separator, component = name.partition('.')
+        object_path = self.object_paths.get(object_name)
+        if object_path is None:
+            raise RuntimeError('No object matches name: {0}'.format(name))
+        if not separator:
+            return object_path, None
+        match = COMPONENT_PATTERN.match(component)
+        if match is None:
+            raise RuntimeError('Unsupported component: {0}'.format(name))
+        start = int(match.group(2))
+        end = int(match.group(3)) if match.group(3) is not None else start
+        return object_path, {match.group(1): set(range(start, end + 1))}
+
+    def get_member_strings(self, object_path, components):
+        mesh = self.meshes[object_path]
+        if components is None:
+            return [mesh.name]
+        member_strings = []
+        for component_type in sorted(components):
+            for start, end in get_index_ranges(components[component_type]):
+                if start == end:
+                    member_strings.append('{0}.{1}[{2}]'.format(mesh.transform_name, component_type, start))
+                else:
+                    member_strings.append('{0}.{1}[{2}:{3}]'.format(mesh.transform_name, component_type, start, end))
+        return member_strings
+
+    # Nodes.
+
+    def get_shading_groups(self):
+        return [node for node in self.nodes.values() if node.node_type == 'shadingEngine']
+
+    def get_node_name(self, node):
+        if not isinstance(node, MemoryNode):
+            raise TypeError
+        return node.name
+
+    def get_node_from_name(self, name):
+        node = self.nodes.get(name)
+        if node is None and name in self.object_paths:
+            node = self.meshes[self.object_paths[name]]
+        return node
+
+    def get_node_hash(self, node):
+        if not isinstance(node, MemoryNode):
+            raise TypeError
+        return node.hash
+
+    def get_node_handle(self, node):
+        if not isinstance(node, MemoryNode):
+            raise TypeError
+        return node
+
+    def get_node_from_handle(self, handle):
+        return handle if handle.is_alive else None
+
+    def is_shading_group(self, node):
+        return isinstance(node, MemoryNode) and node.is_alive and node.node_type == 'shadingEngine'
+
+    def get_reference_name(self, node):
+        return None
+
+    # Members.
+
+    def get_shading_group_members(self, shading_group):
+        if not self.is_shading_group(shading_group):
+            raise TypeError
+        members = []
+        for object_path, components in shading_group.members.items():
+            members.extend((member_string, object_path) for member_string in self.get_member_strings(object_path, components))
+        return members
+
+    def get_shading_group_signature(self, shading_group):
+        member_hash = hashlib.sha1()
+        for object_path, components in sorted(shading_group.members.items()):
+            member_hash.update(object_path.encode('utf-8'))
+            for component_type, indices in sorted((components or {}).items()):
+                member_hash.update('.{0}{1}'.format(component_type, get_index_ranges(indices)).encode('utf-8'))
+            member_hash.update(b'\n')
+        return '{0}:{1}:{2}'.format(shading_group.name, len(shading_group.members), member_hash.hexdigest())
+
+    def get_object_path(self, name):
+        return self.object_paths.get(name.partition('.')[0])
+
+    def get_assigned_shading_group_names(self, name):
+        object_path = self.get_object_path(name)
+        if object_path is None:
+            return []
+        return [shading_group.name for shading_group in self.meshes[object_path].shading_groups]
+
+    def get_assigned_shading_group_names_by_object(self, names):
+        return dict((name.partition('.')[0], self.get_assigned_shading_group_names(name)) for name in names)
+
+    def get_face_shading_groups(self, name):
+        object_path = self.get_object_path(name)
+        if object_path is None:
+            return None
+        mesh = self.meshes[object_path]
+        shading_group_names = []
+        face_indices = array('i', [-1]) * mesh.face_count
+        for shading_group in mesh.shading_groups:
+            shading_group_index = len(shading_group_names)
+            shading_group_names.append(shading_group.name)
+            components = shading_group.members[object_path]
+            if components is None:
+                face_indices = array('i', [shading_group_index]) * mesh.face_count
+                continue
+            for face_index in components.get('f', ()):
+                face_indices[face_index] = shading_group_index
+        return shading_group_names, face_indices
+
+    def get_assignment_connections(self):
+        shapes = []
+        for mesh in self.meshes.values():
+            connections = [(shading_group.name, shading_group.members[mesh.path] is not None, False)
+                           for shading_group in sorted(mesh.shading_groups, key=lambda shading_group: shading_group.name)]
+            shapes.append((mesh.path, mesh.hash, 0, 1, self.get_face_shading_groups(mesh.path), connections))
+        return {'shapes': shapes,
+                'shading_groups': dict((shading_group.name, 0) for shading_group in self.get_shading_groups())}
+
+    # Selection lists.
+
+    def get_selection_list_from_names(self, names):
+        selection_list = MemorySelectionList()
+        for name in names:
+            object_path, components = self.parse_name(name)
+            selection_list.add(object_path, components)
+        return selection_list
+
+    def has_components(self, selection_list):
+        if not isinstance(selection_list, MemorySelectionList):
+            raise TypeError
+        return any(components is not None for components in selection_list.members.values())
+
+    def merge_selection_lists(self, selection_lists):
+        merged_selection_list = MemorySelectionList()
+        for selection_list in selection_lists:
+            if isinstance(selection_list, MemorySelectionList):
+                merged_selection_list.merge(selection_list)
+        return merged_selection_list
+
+    def select_names(self, names):
+        selection_list = MemorySelectionList()
+        for name in names:
+            node = self.nodes.get(name)
+            if node is not None and node.node_type == 'shadingEngine':
+                selection_list.nodes.append(node)
+            else:
+                object_path, components = self.parse_name(name)
+                selection_list.add(object_path, components)
+        self.active_selection = selection_list
+        self.select_count += 1
+        self.notify_selection_changed()
+
+    def get_selection_strings(self):
+        selection_strings = [node.name for node in self.active_selection.nodes]
+        for object_path, components in self.active_selection.members.items():
+            selection_strings.extend(self.get_member_strings(object_path, components))
+        return selection_strings
+
+    # Edits.
+
+    def assign_to_shading_group(self, element_names, shading_group_name):
+        target = self.nodes[shading_group_name]
+        selection_list = self.get_selection_list_from_names(element_names)
+        modified_shading_groups = set()
+        for object_path, components in selection_list.members.items():
+            mesh = self.meshes[object_path]
+            for shading_group in list(mesh.shading_groups):
+                if shading_group is target:
+                    continue
+                if subtract_members(shading_group.members, object_path, components, mesh.face_count):
+                    modified_shading_groups.add(shading_group)
+                if object_path not in shading_group.members:
+                    mesh.shading_groups.discard(shading_group)
+            merge_members(target.members, object_path, components)
+            mesh.shading_groups.add(target)
+            modified_shading_groups.add(target)
+        for shading_group in modified_shading_groups:
+            self.notify_set_members_modified(shading_group)
+
+    def remove_from_shading_group(self, selection_list, shading_group):
+        is_modified = False
+        for object_path, components in selection_list.members.items():
+            mesh = self.meshes[object_path]
+            if subtract_members(shading_group.members, object_path, components, mesh.face_count):
+                is_modified = True
+            if object_path not in shading_group.members:
+                mesh.shading_groups.discard(shading_group)
+        if is_modified:
+            self.notify_set_members_modified(shading_group)
+
+    def remove_residual_connections(self, shading_group, object_paths):
+        """Removed members leave no connections behind in the in-memory scene."""
+
+    def delete_nodes(self, nodes):
+        for node in nodes:
+            self.delete_node(node)
+
+    @contextlib.contextmanager
+    def undo_chunk(self, name):
+        self.undo_chunks.append(name)
+        yield
+
+    # Materials.
+
+    def set_material_network(self, shading_group, network):
+        shading_group.material_network = network
+        self.notify_material_changed(shading_group)
+
+    def get_material_network_signature(self, shading_group):
+        return 'shadingEngine:{0}\n{1}'.format(shading_group.name,
+                                               json.dumps(shading_group.material_network, sort_keys=True))
+
+    def get_material_network(self, shading_group):
+        """The roots of a stored network may include member connections, as those of a scene read from Maya do, and
+        are left out here in the same way."""
+        network = shading_group.material_network
+        return dict(network, roots=[root for root in network['roots'] if not is_member_attribute(root[0])])
+
+    def render_swatch(self, shading_group, path, size):
+        """Writes a swatch of a single color derived from the name of the shading group, since there are no materials."""
+        color = bytearray(hashlib.md5(shading_group.name.encode('utf-8')).digest()[:3])
+        write_solid_png(path, size, tuple(color))
+        return True
+
+    # Files.
+
+    def get_scene_path(self):
+        return self.file_path
+
+    def is_scene_modified(self):
+        return self.is_modified
+
+    def open_file(self, path):
+        with open(path) as scene_file:
+            self.load_description(json.load(scene_file))
+        self.file_path = path
+        self.is_modified = False
+
+    def save_file(self, path=None):
+        if path is not None:
+            self.file_path = path
+        with open(self.file_path, 'w') as scene_file:
+            json.dump(self.get_description(), scene_file)
+        self.is_modified = False
+
+    # Callbacks.
+
+    def notify_set_members_modified(self, shading_group):
+        self.is_modified = True
+        for func in list(self.set_members_modified_callbacks.get(shading_group.hash, {}).values()):
+            func(shading_group)
+
+    def notify_material_changed(self, shading_group):
+        self.is_modified = True
+        for func in list(self.material_changed_callbacks.get(shading_group.hash, {}).values()):
+            func(shading_group)
+
+    def notify_node_callbacks(self, callbacks, node):
+        self.is_modified = True
+        for func, node_type in list(callbacks.values()):
+            if node_type is None or node_type == node.node_type:
+                func(node)
+
+    def notify_selection_changed(self):
+        for func in list(self.selection_changed_callbacks.values()):
+            func()
+
+    def add_set_members_modified_callback(self, node, func):
+        callback_id = next(self.callback_counter)
+        self.set_members_modified_callbacks.setdefault(node.hash, {})[callback_id] = func
+        self.callback_node_hashes[callback_id] = node.hash
+        return callback_id
+
+    def add_material_changed_callback(self, node, func):
+        callback_id = next(self.callback_counter)
+        self.material_changed_callbacks.setdefault(node.hash, {})[callback_id] = func
+        self.callback_node_hashes[callback_id] = node.hash
+        return callback_id
+
+    def add_node_added_callback(self, func, node_type):
+        callback_id = next(self.callback_counter)
+        self.node_added_callbacks[callback_id] = (func, node_type)
+        return callback_id
+
+    def add_node_removed_callback(self, func, node_type):
+        callback_id = next(self.callback_counter)
+        self.node_removed_callbacks[callback_id] = (func, node_type)
+        return callback_id
+
+    def add_selection_changed_callback(self, func):
+        callback_id = next(self.callback_counter)
+        self.selection_changed_callbacks[callback_id] = func
+        return callback_id
+
+    def remove_callback(self, callback_id):
+        self.node_added_callbacks.pop(callback_id, None)
+        self.node_removed_callbacks.pop(callback_id, None)
+        self.selection_changed_callbacks.pop(callback_id, None)
+        node_hash = self.callback_node_hashes.pop(callback_id, None)
+        if node_hash in self.set_members_modified_callbacks:
+            self.set_members_modified_callbacks[node_hash].pop(callback_id, None)
+        if node_hash in self.material_changed_callbacks:
+            self.material_changed_callbacks[node_hash].pop(callback_id, None)
@@ -0,0 +1,89 @@
+import re
+
+
+MATCH_MODES = ('substring', 'glob', 'regex')
+
+
+def glob_to_regex(pattern):
+    """Returns a regular expression that matches a whole line against a glob pattern with * and ? wildcards."""
+    parts = []
+    for character in pattern:
+        if character == '*':
+            parts.append('[^\\n]*')
+        elif character == '?':
+            parts.append('[^\\n]')
+        else:
+            parts.append(re.escape(character))
+    return '^' + ''.join(parts) + '$'
+
+
+class NameMatcher(object):
+    """Matches names against a case insensitive substring, glob or regular expression pattern.
+    Matching is also possible against a block of names separated by new lines, which tests all of them at once."""
+
+    def __init__(self, pattern, mode='substring'):
+        if mode not in MATCH_MODES:
+            raise ValueError('Unknown match mode: {0}'.format(mode))
+        self.pattern = pattern
+        self.mode = mode
+        self.lower_pattern = pattern.lower()
+        self.regex = None
+        self.is_valid = True
+        if mode == 'glob':
+            self.regex = re.compile(glob_to_regex(pattern), re.IGNORECASE | re.MULTILINE)
+        elif mode == 'regex':
+            try:
+                self.regex = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+            except re.error:
+                self.is_valid = False
+
+    def matches(self, name):
+        if not self.is_valid:
+            return False
+        if self.regex is None:
+            return self.lower_pattern in name.lower()
+        return self.regex.search(name) is not None
+
+    def matches_lowered_block(self, block):
+        """Returns whether any line of a block of names that has already been lowered matches."""
+        if not self.is_valid:
+            return False
+        if self.regex is None:
+            return self.lower_pattern in block
+        return self.regex.search(block) is not None
+
+
+class NameIndex(object):
+    """An index of shading group names and the display names of their members.
+    The names of each shading group are stored as a single lowered block of text, so that a search only
+    makes one pass over each shading group rather than one per member. Groups are added, replaced and removed
+    individually as the scene changes."""
+
+    def __init__(self):
+        self.is_built = False
+        self.shading_group_names = {}
+        self.member_blocks = {}
+
+    def clear(self):
+        self.shading_group_names = {}
+        self.member_blocks = {}
+
+    def set_shading_group(self, shading_group_hash, name, member_names=()):
+        self.shading_group_names[shading_group_hash] = name.lower()
+        self.member_blocks[shading_group_hash] = '\n'.join(member_names).lower()
+
+    def remove_shading_group(self, shading_group_hash):
+        self.shading_group_names.pop(shading_group_hash, None)
+        self.member_blocks.pop(shading_group_hash, None)
+
+    def matches(self, shading_group_hash, matcher):
+        """Returns whether the name of a shading group, or the name of one of its members, matches."""
+        name = self.shading_group_names.get(shading_group_hash)
+        if name is None:
+            return False
+        return matcher.matches_lowered_block(name) or matcher.matches_lowered_block(self.member_blocks[shading_group_hash])
+
+    def search(self, matcher):
+        """Returns the set of hashes of every shading group that matches."""
+        return set(shading_group_hash for shading_group_hash in self.shading_group_names
+                   if self.matches(shading_group_hash, matcher))
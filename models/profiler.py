@@ -0,0 +1,122 @@
+import contextlib
+import functools
+import json
+import platform
+import time
+import timeit
+from collections import OrderedDict
+
+
+class OperationStatistics(object):
+    """Call count, wall time histogram and processed item count of a single profiled operation."""
+
+    # Upper bounds of the histogram buckets in seconds. The last bucket holds everything slower.
+    BUCKET_BOUNDS = (0.001, 0.005, 0.016, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self, name):
+        self.name = name
+        self.call_count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.item_count = 0
+        self.histogram = [0] * (len(self.BUCKET_BOUNDS) + 1)
+
+    def record(self, seconds, item_count):
+        self.call_count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.item_count += item_count
+        bucket = 0
+        while bucket < len(self.BUCKET_BOUNDS) and seconds > self.BUCKET_BOUNDS[bucket]:
+            bucket += 1
+        self.histogram[bucket] += 1
+
+    def get_mean_seconds(self):
+        return self.total_seconds / self.call_count if self.call_count else 0.0
+
+    def to_dict(self):
+        bucket_labels = ['<={0}s'.format(bound) for bound in self.BUCKET_BOUNDS] + ['>{0}s'.format(self.BUCKET_BOUNDS[-1])]
+        return OrderedDict([
+            ('name', self.name),
+            ('calls', self.call_count),
+            ('total_seconds', self.total_seconds),
+            ('mean_seconds', self.get_mean_seconds()),
+            ('max_seconds', self.max_seconds),
+            ('items', self.item_count),
+            ('histogram', OrderedDict(zip(bucket_labels, self.histogram))),
+        ])
+
+
+class Measurement(object):
+    """Passed to the body of Profiler.measure so that it can report how many items it processed."""
+
+    def __init__(self, item_count=0):
+        self.item_count = item_count
+
+
+class Profiler(object):
+    """Opt-in instrumentation of the hot paths of the tool.
+    Nothing is recorded until the profiler is enabled, and disabled instrumentation only costs an attribute lookup."""
+
+    def __init__(self):
+        self.is_enabled = False
+        self.operations = OrderedDict()
+
+    def set_enabled(self, is_enabled):
+        self.is_enabled = is_enabled
+
+    def reset(self):
+        self.operations = OrderedDict()
+
+    def record(self, name, seconds, item_count=0):
+        if name not in self.operations:
+            self.operations[name] = OperationStatistics(name)
+        self.operations[name].record(seconds, item_count)
+
+    @contextlib.contextmanager
+    def measure(self, name, item_count=0):
+        """Times the body of the context. The body can set item_count on the yielded measurement."""
+        measurement = Measurement(item_count)
+        if not self.is_enabled:
+            yield measurement
+            return
+        start = timeit.default_timer()
+        try:
+            yield measurement
+        finally:
+            self.record(name, timeit.default_timer() - start, measurement.item_count)
+
+    def profiled(self, name, get_item_count=None):
+        """Returns a decorator that times each call of a function.
+        The optional get_item_count function is passed the result, followed by the arguments of the call."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.is_enabled:
+                    return func(*args, **kwargs)
+                start = timeit.default_timer()
+                result = func(*args, **kwargs)
+                seconds = timeit.default_timer() - start
+                item_count = get_item_count(result, *args, **kwargs) if get_item_count is not None else 0
+                self.record(name, seconds, item_count)
+                return result
+            return wrapper
+        return decorator
+
+    def get_statistics(self):
+        return [operation.to_dict() for operation in self.operations.values()]
+
+    def export(self, path, extra=None):
+        """Writes the recorded statistics, along with any extra diagnostics, to a JSON file."""
+        report = OrderedDict([
+            ('timestamp', time.strftime('%Y-%m-%dT%H:%M:%S')),
+            ('python', platform.python_version()),
+            ('operations', self.get_statistics()),
+        ])
+        if extra:
+            report.update(extra)
+        with open(path, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+
+
+profiler = Profiler()
@@ -1,169 +1,292 @@
-import maya.OpenMaya as om
-import maya.cmds as cmds
+from models.components import MemberRecord, merge_member_records
+from models.profiler import profiler
+
+
+# The shading groups that every scene has, which can never be deleted.
+DEFAULT_SHADING_GROUP_NAMES = ('initialShadingGroup', 'initialParticleSE')
+
+current_backend = None
+
+
+def get_backend():
+    """Returns the scene backend that the functions in this module are built on.
+    The Maya backend is used unless another backend has been set."""
+    global current_backend
+    if current_backend is None:
+        from models.maya_backend import MayaBackend
+        current_backend = MayaBackend()
+    return current_backend
+
+
+def set_backend(backend):
+    """Sets the scene backend, such as the in-memory backend used to measure the tool outside of Maya."""
+    global current_backend
+    current_backend = backend
 
 
 def get_shading_groups():
     """Traverses the scene for shading group dependency nodes."""
-    shading_groups = []
-    dg_node_fn = om.MFnDependencyNode()
-    dg_node_iter = om.MItDependencyNodes(om.MFn.kShadingEngine)
-    while not dg_node_iter.isDone():
-        shading_groups.append(dg_node_iter.thisNode())
-        dg_node_iter.next()
-    return shading_groups
+    return get_backend().get_shading_groups()
 
 
 def get_node_name(node):
-    if type(node) != om.MObject:
-        raise TypeError
-    dg_node_fn = om.MFnDependencyNode(node)
-    return dg_node_fn.name()
+    return get_backend().get_node_name(node)
+
+
+def get_node_from_name(name):
+    """Returns the dependency node of the given name, or None if it does not exist."""
+    return get_backend().get_node_from_name(name)
+
+
+def get_node_hash(node):
+    """Returns a hash that uniquely identifies the given node for as long as it exists in the scene.
+    MObjects themselves are not hashable, so this is used to key lookups by node."""
+    return get_backend().get_node_hash(node)
+
+
+def get_node_handle(node):
+    """Returns a handle that can be used to safely test whether the given node still exists at a later time."""
+    return get_backend().get_node_handle(node)
+
+
+def get_node_from_handle(handle):
+    """Returns the node referenced by the given handle, or None if it has since been deleted."""
+    return get_backend().get_node_from_handle(handle)
+
+
+def is_shading_group(node):
+    return get_backend().is_shading_group(node)
+
+
+def get_reference_name(node):
+    """Returns the name of the reference node that the given node was loaded from, or None if it is not referenced."""
+    return get_backend().get_reference_name(node)
+
+
+def get_namespace(name):
+    """Returns the namespace of a node name, or ':' for the root namespace."""
+    namespace = name.rpartition(':')[0].lstrip(':')
+    return namespace or ':'
 
 
 def get_shading_group_member_strings(shading_group):
     """Returns a list of strings representing the objects and components assigned to the given shading group."""
-    member_strings = []
-    if type(shading_group) != om.MObject or not shading_group.hasFn(om.MFn.kShadingEngine):
-        raise TypeError
-    set_fn = om.MFnSet(shading_group)
-    selection_list = om.MSelectionList()
-    set_fn.getMembers(selection_list, False)
-    selection_list_iter = om.MItSelectionList(selection_list)
-    while not selection_list_iter.isDone():
-        selection_strings = []
-        selection_list_iter.getStrings(selection_strings)
-        member_strings.extend(selection_strings)
-        selection_list_iter.next()
-    return member_strings
+    return [member_string for member_string, object_path in get_shading_group_members(shading_group)]
+
+
+def get_shading_group_members(shading_group):
+    """Returns a list of (member string, object path) pairs for the objects and components assigned to the given shading group.
+    The object path is the full path of the assigned shape for DAG members, or the node name otherwise."""
+    return get_backend().get_shading_group_members(shading_group)
+
+
+def get_shading_group_signature(shading_group):
+    """Returns a string that changes whenever the members of the given shading group change, without listing them."""
+    return get_backend().get_shading_group_signature(shading_group)
+
+
+def get_assignment_connections():
+    """Returns the shading group connections of every shape instance in the scene, read in a single pass.
+    See SceneBackend.get_assignment_connections for the form of the result."""
+    return get_backend().get_assignment_connections()
+
+
+def get_object_path(name):
+    """Returns the path used to identify the object of the given name or member string, or None if it does not exist."""
+    return get_backend().get_object_path(name)
+
+
+def get_face_shading_groups(name):
+    """Returns the shading group names of the given mesh and an array of indices into them, one per face,
+    with -1 for unassigned faces. Returns None if the name does not refer to a mesh."""
+    return get_backend().get_face_shading_groups(name)
 
 
 def get_selection_list_from_names(names):
-    """Returns an MSelectionList produced from the given list of strings.
+    """Returns a selection list produced from the given list of strings.
     This can be used to easily select groups of contiguous components."""
-    selection_list = om.MSelectionList()
-    for name in names:
-        selection_list.add(name)
-    return selection_list
+    return get_backend().get_selection_list_from_names(names)
+
+
+def get_selection_list_from_records(records):
+    """Returns a selection list produced from the given member records, with the ranges of each object merged first."""
+    member_strings = []
+    for record in merge_member_records(records):
+        member_strings.extend(record.get_member_strings())
+    return get_selection_list_from_names(member_strings)
 
 
 def has_components(selection_list):
-    if not type(selection_list) == om.MSelectionList:
-        raise TypeError
-    it = om.MItSelectionList(selection_list)
-    while not it.isDone():
-        if it.hasComponents():
-            return True
-        it.next()
-    return False
-
-
-def select(item_list):
-    """Sets the current active selection to the supplied list of arguments.
-    Accepts a list containing MSelectionLists and MObjects. Other types are discarded."""
-    if not type(item_list) == list:
-        raise TypeError
-    selection_list = om.MSelectionList()
-    for item in item_list:
-        if type(item) == om.MSelectionList:
-            selection_list.merge(item)
-        elif type(item) == om.MObject:
-            selection_list.add(item, True)
-    om.MGlobal_setActiveSelectionList(selection_list)
+    """Returns whether a selection list or a member record contains components.
+    Member records are answered from their own ranges without building a selection list."""
+    if isinstance(selection_list, MemberRecord):
+        return selection_list.has_components()
+    return get_backend().has_components(selection_list)
 
 
-def update_selection():
-    """Allows the current active selection list to be seen in the outliner and viewport."""
-    cmds.select(cmds.ls(sl=True), replace=True, noExpand=True)
+def select_names(names):
+    """Replaces the active selection with the given node names and member strings, and makes it visible in the outliner
+    and viewport, without reading the selection back."""
+    get_backend().select_names(list(names))
 
 
-def assign_to_shading_group(element_name, shading_group_name):
-    cmds.sets(element_name, forceElement=shading_group_name, noWarnings=True)
+def get_selection_strings():
+    """Returns the current active selection as a list of strings, with contiguous components merged into ranges."""
+    return get_backend().get_selection_strings()
+
+
+def get_assigned_shading_group_names(name):
+    """Returns the names of the shading groups that the given object, or the object of the given component, is assigned to."""
+    return get_backend().get_assigned_shading_group_names(name)
+
+
+def get_assigned_shading_group_names_by_object(names):
+    """Returns a dictionary mapping the object name of each of the given names or member strings to the names of the
+    shading groups that it is assigned to, looked up for all of the objects together."""
+    return get_backend().get_assigned_shading_group_names_by_object(names)
+
+
+def assign_to_shading_group(element_names, shading_group_name):
+    """Assigns an element name or a list of element names to a shading group in a single command."""
+    if not element_names:
+        return
+    if not isinstance(element_names, list):
+        element_names = [element_names]
+    get_backend().assign_to_shading_group(element_names, shading_group_name)
 
 
 def assign_selection_to_shading_group(shading_group):
-    shading_group_name = get_node_name(shading_group)
-    current_selection = om.MSelectionList()
-    om.MGlobal.getActiveSelectionList(current_selection)
-    selection_strings = []
-    current_selection.getSelectionStrings(selection_strings)
-    for selection_string in selection_strings:
-        assign_to_shading_group(selection_string, shading_group_name)
+    assign_to_shading_group(get_selection_strings(), get_node_name(shading_group))
+
+
+def remove_residual_connections(shading_group, object_paths):
+    """Disconnects the connections of the given objects to the shading group that no longer contribute members."""
+    get_backend().remove_residual_connections(shading_group, object_paths)
 
 
+def delete_nodes(nodes):
+    if not nodes:
+        return
+    get_backend().delete_nodes(nodes)
+
+
+def undo_chunk(name):
+    """Returns a context manager that groups all edits made within it into a single undo step."""
+    return get_backend().undo_chunk(name)
+
+
+@profiler.profiled('scene.remove_from_shading_group')
 def remove_from_shading_group(selection_list, shading_group):
-    # Get subtracted selection list.
-    members = om.MSelectionList()
-    set_fn = om.MFnSet(shading_group)
-    set_fn.getMembers(members, True)
+    """Removes the members in the given selection list from the shading group.
+    Only the selected items that are members of the set are removed, so the cost is proportional to the
+    size of the selection rather than the size of the shading group."""
+    get_backend().remove_from_shading_group(selection_list, shading_group)
 
-    subtraction_strings = []
 
-    selection_list_strings = []
-    selection_list.getSelectionStrings(selection_list_strings)
+def get_material_network_signature(shading_group):
+    """Returns a string that changes whenever the look of the material network of the given shading group changes."""
+    return get_backend().get_material_network_signature(shading_group)
 
-    members_strings = []
-    members.getSelectionStrings(members_strings)
 
-    for members_string in members_strings:
-        if members_string not in selection_list_strings:
-            subtraction_strings.append(members_string)
+def get_material_network(shading_group):
+    """Returns the nodes upstream of the given shading group, their attribute values and connections, and the attribute
+    values of the shading group itself."""
+    return get_backend().get_material_network(shading_group)
 
-    # Clear set members.
-    set_fn.clear()
 
-    # Break residual connections.
-    #dg_modifier = om.MDGModifier()
-    dag_set_members_plug = set_fn.findPlug("dagSetMembers", True)
-    array_indices = om.MIntArray()
-    dag_set_members_plug.getExistingArrayAttributeIndices(array_indices)
-    for element_index in array_indices:
-        child_plug = dag_set_members_plug.elementByLogicalIndex(element_index)
-        if not child_plug.isConnected():
-            continue
-        source = child_plug.source()
-        cmds.disconnectAttr(source.info(), child_plug.info())
-        #dg_modifier.disconnect(source, child_plug)
+def render_swatch(shading_group, path, size):
+    """Renders a square swatch of the material of the given shading group to a PNG file and returns whether it succeeded."""
+    return get_backend().render_swatch(shading_group, path, size)
 
-    # Reconstruct set with new members.
-    subtraction = get_selection_list_from_names(subtraction_strings)
-    set_fn.addMembers(subtraction)
 
+def get_scene_path():
+    """Returns the path of the current scene file, or None if the scene has never been saved."""
+    return get_backend().get_scene_path()
 
-def merge_selection_lists(selection_list_set):
-    if type(selection_list_set) != set:
-        raise TypeError
-    merged_selection_list = om.MSelectionList()
-    for selection_list in selection_list_set:
-        if type(selection_list) != om.MSelectionList:
-            continue
-        merged_selection_list.merge(selection_list)
-    return merged_selection_list
+
+def is_scene_modified():
+    """Returns whether the scene has changed since it was last opened or saved."""
+    return get_backend().is_scene_modified()
 
 
-def register_set_members_modified_callback(callback_ids, func, node):
-    if type(node) == om.MObject and node.hasFn(om.MFn.kShadingEngine):
-        set_message = om.MObjectSetMessage()
-        callback_id = set_message.addSetMembersModifiedCallback(node, lambda *args: func())
-        callback_ids.append(callback_id)
+def open_file(path):
+    """Opens a scene file in place of the current scene, discarding any unsaved changes."""
+    get_backend().open_file(path)
 
 
-def register_callbacks(callback_ids, func):
+def save_file(path=None):
+    """Saves the current scene to its own path, or to the given path."""
+    get_backend().save_file(path)
+
+
+def merge_selection_lists(selection_list_set):
+    """Merges a set of selection lists and member records into a single selection list.
+    Member records are merged by range first, so only one selection list is built for all of them."""
+    if type(selection_list_set) != set:
+        raise TypeError
+    records = [item for item in selection_list_set if isinstance(item, MemberRecord)]
+    selection_lists = [item for item in selection_list_set if not isinstance(item, MemberRecord)]
+    if records:
+        selection_lists.append(get_selection_list_from_records(records))
+    return get_backend().merge_selection_lists(selection_lists)
+
+
+def register_set_members_modified_callback(registry, func, node):
+    """Registers a callback that passes the shading group whose members were modified to func.
+    The callback is kept under the node in the registry, so it is removed when the shading group is deleted."""
+    if is_shading_group(node):
+        func = profiler.profiled('callback.set_members_modified')(func)
+        registry.add_node_callback(node, get_backend().add_set_members_modified_callback(node, func), 'shadingEngine')
+
+
+def register_material_changed_callback(registry, func, node):
+    """Registers a callback that passes the shading group whose material network may have changed to func."""
+    if is_shading_group(node):
+        func = profiler.profiled('callback.material_changed')(func)
+        registry.add_node_callback(node, get_backend().add_material_changed_callback(node, func), 'shadingEngine')
+
+
+def on_node_added(registry, set_members_modified_func, node_added_func, node, material_changed_func=None):
+    if not is_shading_group(node):
+        return
+    register_set_members_modified_callback(registry, set_members_modified_func, node)
+    if material_changed_func is not None:
+        register_material_changed_callback(registry, material_changed_func, node)
+    node_added_func(node)
+
+
+def register_callbacks(registry, set_members_modified_func, node_added_func, node_removed_func,
+                       selection_changed_func=None, material_changed_func=None):
+    """Registers scene callbacks that each pass the node that triggered them to the matching function.
+    This allows listeners to update only what has changed instead of rebuilding from scratch.
+    Node added and removed callbacks are filtered by the backend so that they only fire for shading groups.
+    The selection changed function, if given, is called without arguments whenever the active selection changes.
+    The material changed function, if given, is passed shading groups whose material networks may have changed."""
+    backend = get_backend()
+
     # Register callbacks for all shading groups.
     for shading_group in get_shading_groups():
-        register_set_members_modified_callback(callback_ids, func, shading_group)
+        register_set_members_modified_callback(registry, set_members_modified_func, shading_group)
+        if material_changed_func is not None:
+            register_material_changed_callback(registry, material_changed_func, shading_group)
 
     # Register a callback that will watch for dependency graph changes in order to add callbacks to new shading groups.
-    dg_message = om.MDGMessage()
-    add_node_callback_id = dg_message.addNodeAddedCallback(
-        lambda node, client_data: register_set_members_modified_callback(callback_ids, func, node))
-    callback_ids.append(add_node_callback_id)
+    add_node_callback_id = backend.add_node_added_callback(
+        profiler.profiled('callback.node_added')(
+            lambda node: on_node_added(registry, set_members_modified_func, node_added_func, node,
+                                       material_changed_func)),
+        'shadingEngine')
+    registry.add_session_callback(add_node_callback_id)
 
     # Register a callback to watch for deleted nodes.
-    remove_node_callback_id = dg_message.addNodeRemovedCallback(lambda *args: func())
-    callback_ids.append(remove_node_callback_id)
+    remove_node_callback_id = backend.add_node_removed_callback(
+        profiler.profiled('callback.node_removed')(node_removed_func), 'shadingEngine')
+    registry.add_session_callback(remove_node_callback_id)
+
+    # Register a callback to watch for selection changes made outside of the tool.
+    if selection_changed_func is not None:
+        registry.add_session_callback(backend.add_selection_changed_callback(selection_changed_func))
 
 
-def deregister_callbacks(callback_ids):
-    message = om.MMessage()
-    for callback_id in callback_ids:
-        message.removeCallback(callback_id)
+def deregister_callbacks(registry):
+    registry.clear()
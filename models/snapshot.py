@@ -0,0 +1,167 @@
+"""Persistent snapshots of the assignment index, used to show the assignments of a scene as soon as the tool opens.
+A snapshot is written for a saved scene that has no unsaved changes, and is keyed by the path of the scene file.
+It records the size and modification time of the file, so it is only loaded for the same version of that file,
+and the signature of each shading group, so that groups changed since then, for instance by a reference that was
+updated on disk, are found without listing their members.
+Snapshots are compact binary files: a string table shared by all the names and object paths, followed by the
+member records of each shading group with their index ranges stored as raw integer arrays, compressed as a whole."""
+import hashlib
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections import OrderedDict
+
+from models import scene
+from models.components import MemberRecord
+
+
+SNAPSHOT_MAGIC = b'SGMS'
+SNAPSHOT_VERSION = 1
+CACHE_DIRECTORY_VARIABLE = 'SHADING_GROUP_MANAGER_SNAPSHOT_CACHE'
+
+HEADER = struct.Struct('<4sI')
+COUNT = struct.Struct('<I')
+GROUP = struct.Struct('<III')
+RECORD = struct.Struct('<IIiI')
+
+
+def get_default_cache_directory():
+    """Returns the snapshot cache directory, which can be overridden with an environment variable."""
+    cache_directory = os.environ.get(CACHE_DIRECTORY_VARIABLE)
+    if cache_directory:
+        return cache_directory
+    return os.path.join(os.path.expanduser('~'), '.shading_group_manager', 'snapshots')
+
+
+def normalize_scene_path(scene_path):
+    return os.path.normcase(os.path.abspath(scene_path))
+
+
+def get_snapshot_path(cache_directory, scene_path):
+    path_hash = hashlib.sha1(normalize_scene_path(scene_path).encode('utf-8')).hexdigest()
+    return os.path.join(cache_directory, path_hash + '.snapshot')
+
+
+def get_scene_signature():
+    """Returns a string identifying the current scene file by its path, size and modification time.
+    Returns None for scenes that have never been saved or have unsaved changes, since their assignments differ from
+    those of the file."""
+    scene_path = scene.get_scene_path()
+    if not scene_path or scene.is_scene_modified():
+        return None
+    try:
+        stat = os.stat(scene_path)
+    except OSError:
+        return None
+    return '{0}\n{1!r}\n{2}'.format(normalize_scene_path(scene_path), stat.st_mtime, stat.st_size)
+
+
+def get_array_bytes(values):
+    """Returns the bytes of an integer array in little endian order."""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes() if hasattr(values, 'tobytes') else values.tostring()
+
+
+def get_array_from_bytes(data):
+    values = array('i')
+    if hasattr(values, 'frombytes'):
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def write_snapshot(path, scene_signature, shading_groups):
+    """Writes a snapshot from an iterable of (shading group name, shading group signature, member records) tuples.
+    The file is written next to its destination and then moved over it, so a snapshot is never left half written."""
+    strings = OrderedDict()
+
+    def get_string_index(string):
+        if string not in strings:
+            strings[string] = len(strings)
+        return strings[string]
+
+    parts = [COUNT.pack(get_string_index(scene_signature))]
+    group_count = 0
+    group_parts = []
+    for name, signature, records in shading_groups:
+        group_count += 1
+        group_parts.append(GROUP.pack(get_string_index(name), get_string_index(signature), len(records)))
+        for record in records:
+            component_type_index = -1 if record.component_type is None else get_string_index(record.component_type)
+            group_parts.append(RECORD.pack(get_string_index(record.object_path), get_string_index(record.name),
+                                           component_type_index, len(record.ranges)))
+            group_parts.append(get_array_bytes(record.ranges))
+    parts.append(COUNT.pack(group_count))
+    parts.extend(group_parts)
+
+    string_parts = [COUNT.pack(len(strings))]
+    for string in strings:
+        encoded_string = string.encode('utf-8')
+        string_parts.append(COUNT.pack(len(encoded_string)))
+        string_parts.append(encoded_string)
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as snapshot_file:
+        snapshot_file.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+        snapshot_file.write(zlib.compress(b''.join(string_parts + parts)))
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(temporary_path, path)
+
+
+def read_snapshot(path, scene_signature):
+    """Returns an ordered dictionary mapping shading group names to (signature, member records) pairs.
+    Returns None if there is no snapshot at the path, or if it is unreadable, from another version of the format
+    or was written for a different scene signature."""
+    try:
+        with open(path, 'rb') as snapshot_file:
+            header = snapshot_file.read(HEADER.size)
+            if len(header) != HEADER.size or HEADER.unpack(header) != (SNAPSHOT_MAGIC, SNAPSHOT_VERSION):
+                return None
+            data = zlib.decompress(snapshot_file.read())
+    except (IOError, OSError, zlib.error):
+        return None
+
+    try:
+        offset = 0
+        string_count, = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        strings = []
+        for index in range(string_count):
+            length, = COUNT.unpack_from(data, offset)
+            offset += COUNT.size
+            strings.append(data[offset:offset + length].decode('utf-8'))
+            offset += length
+
+        signature_index, group_count = struct.unpack_from('<II', data, offset)
+        offset += 2 * COUNT.size
+        if strings[signature_index] != scene_signature:
+            return None
+
+        shading_groups = OrderedDict()
+        for group_index in range(group_count):
+            name_index, group_signature_index, record_count = GROUP.unpack_from(data, offset)
+            offset += GROUP.size
+            records = []
+            for record_index in range(record_count):
+                object_path_index, record_name_index, component_type_index, range_count = RECORD.unpack_from(data, offset)
+                offset += RECORD.size
+                ranges_size = range_count * 4
+                ranges = get_array_from_bytes(data[offset:offset + ranges_size])
+                offset += ranges_size
+                component_type = None if component_type_index < 0 else strings[component_type_index]
+                records.append(MemberRecord(strings[object_path_index], strings[record_name_index], component_type, ranges))
+            shading_groups[strings[name_index]] = strings[group_signature_index], records
+    except (struct.error, IndexError, UnicodeDecodeError, ValueError):
+        return None
+    return shading_groups
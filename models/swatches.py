@@ -0,0 +1,78 @@
+"""Swatch caching helpers shared by the views that show shading group swatches.
+Swatches are stored on disk as PNG files named after a hash of the material network they were rendered from,
+so a swatch is only rendered again once its network has changed, and held in memory in a bounded LRU cache."""
+import hashlib
+import os
+from collections import OrderedDict
+
+from models import scene
+
+
+SWATCH_VERSION = 1
+CACHE_DIRECTORY_VARIABLE = 'SHADING_GROUP_MANAGER_SWATCH_CACHE'
+
+
+class LRUCache(object):
+    """A dictionary holding at most capacity items, which drops the least recently used item when full."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.items = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, default=None):
+        if key not in self.items:
+            return default
+        value = self.items.pop(key)
+        self.items[key] = value
+        return value
+
+    def put(self, key, value):
+        self.items.pop(key, None)
+        self.items[key] = value
+        while len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+
+
+def get_default_cache_directory():
+    """Returns the swatch cache directory, which can be overridden with an environment variable."""
+    cache_directory = os.environ.get(CACHE_DIRECTORY_VARIABLE)
+    if cache_directory:
+        return cache_directory
+    return os.path.join(os.path.expanduser('~'), '.shading_group_manager', 'swatches')
+
+
+def get_network_hash(shading_group, size):
+    signature = '{0}\n{1}\n{2}'.format(SWATCH_VERSION, size, scene.get_material_network_signature(shading_group))
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+
+def get_swatch_path(cache_directory, network_hash):
+    return os.path.join(cache_directory, network_hash[:2], network_hash + '.png')
+
+
+def ensure_swatch(shading_group, cache_directory, network_hash, size):
+    """Returns the path of the cached swatch of a material network, rendering it first if it is not on disk.
+    Returns None if no swatch could be rendered."""
+    path = get_swatch_path(cache_directory, network_hash)
+    if os.path.exists(path):
+        return path
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    # Swatches are rendered to a temporary file first, so an interrupted render never leaves a partial swatch behind.
+    temporary_path = path + '.tmp.png'
+    if not scene.render_swatch(shading_group, temporary_path, size):
+        return None
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(temporary_path, path)
+    return path
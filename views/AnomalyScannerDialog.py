@@ -0,0 +1,138 @@
+from PySide2 import QtCore, QtWidgets, QtGui
+
+from models import anomaly_scanner
+from models import scene
+
+
+class AnomalyScannerDialog(QtWidgets.QDialog):
+    """Lists the assignment anomalies of the scene under one item per category.
+    Selecting anomalies, or whole categories, selects what they concern in the scene, and the selected anomalies, or
+    all of them, can be fixed in one batch. Anomaly items are only created when their category is expanded."""
+
+    def __init__(self, parent, dispatcher=None):
+        super(AnomalyScannerDialog, self).__init__(parent)
+
+        self.setWindowTitle('Scan Assignment Anomalies')
+
+        # Create properties.
+        self.dispatcher = dispatcher
+        self.anomalies = {}
+        self.is_populated = False
+
+        self.bold_font = QtGui.QFont()
+        self.bold_font.setBold(True)
+
+        # Create widgets.
+        self.tree_widget = QtWidgets.QTreeWidget(self)
+        self.lbl_summary = QtWidgets.QLabel()
+        self.btn_fix_selected = QtWidgets.QPushButton('Fix Selected')
+        self.btn_fix_all = QtWidgets.QPushButton('Fix All')
+        self.btn_rescan = QtWidgets.QPushButton('Rescan')
+        self.btn_close = QtWidgets.QPushButton('Close')
+
+        # Set styles.
+        self.tree_widget.setMinimumWidth(450)
+        self.tree_widget.setMinimumHeight(350)
+        self.tree_widget.setHeaderHidden(True)
+
+        # Set behaviours.
+        self.tree_widget.setSelectionMode(self.tree_widget.ExtendedSelection)
+        self.tree_widget.setUniformRowHeights(True)
+
+        # Create layouts.
+        self.main_layout = QtWidgets.QVBoxLayout()
+        self.bottom_layout = QtWidgets.QHBoxLayout()
+
+        self.main_layout.addWidget(self.tree_widget)
+        self.main_layout.addWidget(self.lbl_summary)
+        self.main_layout.addLayout(self.bottom_layout)
+
+        self.bottom_layout.addWidget(self.btn_fix_selected)
+        self.bottom_layout.addWidget(self.btn_fix_all)
+        self.bottom_layout.addWidget(self.btn_rescan)
+        self.bottom_layout.addWidget(self.btn_close)
+
+        self.setLayout(self.main_layout)
+
+        # Create connections.
+        self.btn_fix_selected.clicked.connect(self.on_fix_selected_clicked)
+        self.btn_fix_all.clicked.connect(self.on_fix_all_clicked)
+        self.btn_rescan.clicked.connect(self.on_rescan_clicked)
+        self.btn_close.clicked.connect(self.on_close_clicked)
+        self.tree_widget.itemExpanded.connect(self.on_item_expanded)
+        self.tree_widget.itemSelectionChanged.connect(self.on_item_selection_changed)
+
+        self.scan()
+
+    def scan(self):
+        self.is_populated = False
+        self.anomalies = anomaly_scanner.scan_scene()
+        self.tree_widget.clear()
+        for category, label in anomaly_scanner.CATEGORY_LABELS.items():
+            category_item = QtWidgets.QTreeWidgetItem(['{0}  ({1})'.format(label, len(self.anomalies[category]))])
+            category_item.setData(0, QtCore.Qt.UserRole, category)
+            category_item.setFont(0, self.bold_font)
+            if self.anomalies[category]:
+                category_item.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ShowIndicator)
+            self.tree_widget.addTopLevelItem(category_item)
+        anomaly_count = sum(len(anomalies) for anomalies in self.anomalies.values())
+        self.lbl_summary.setText('{0} anomalies found.'.format(anomaly_count))
+        self.btn_fix_all.setEnabled(anomaly_count > 0)
+        self.is_populated = True
+
+    def populate_category_item(self, category_item):
+        category = category_item.data(0, QtCore.Qt.UserRole)
+        for index, anomaly in enumerate(self.anomalies[category]):
+            anomaly_item = QtWidgets.QTreeWidgetItem([anomaly.label])
+            anomaly_item.setData(0, QtCore.Qt.UserRole, index)
+            category_item.addChild(anomaly_item)
+
+    def get_selected_anomalies(self):
+        """Returns the selected anomalies, including every anomaly of a selected category, without duplicates."""
+        selected_anomalies = []
+        selected_categories = set()
+        for item in self.tree_widget.selectedItems():
+            if item.parent() is None:
+                category = item.data(0, QtCore.Qt.UserRole)
+                selected_categories.add(category)
+                selected_anomalies.extend(self.anomalies[category])
+        for item in self.tree_widget.selectedItems():
+            if item.parent() is None:
+                continue
+            category = item.parent().data(0, QtCore.Qt.UserRole)
+            if category not in selected_categories:
+                selected_anomalies.append(self.anomalies[category][item.data(0, QtCore.Qt.UserRole)])
+        return selected_anomalies
+
+    def fix(self, anomalies):
+        if not anomalies:
+            return
+        answer = QtWidgets.QMessageBox.question(self, 'Fix Anomalies', 'Fix {0} anomalies?'.format(len(anomalies)))
+        if answer != QtWidgets.QMessageBox.Yes:
+            return
+        anomaly_scanner.fix_anomalies(anomalies, dispatcher=self.dispatcher)
+        self.scan()
+
+    def on_fix_selected_clicked(self):
+        self.fix(self.get_selected_anomalies())
+
+    def on_fix_all_clicked(self):
+        self.fix([anomaly for anomalies in self.anomalies.values() for anomaly in anomalies])
+
+    def on_rescan_clicked(self):
+        self.scan()
+
+    def on_close_clicked(self):
+        self.close()
+
+    def on_item_expanded(self, item):
+        if item.parent() is None and item.childCount() == 0:
+            self.populate_category_item(item)
+
+    def on_item_selection_changed(self):
+        if not self.is_populated:
+            return
+        names = []
+        for anomaly in self.get_selected_anomalies():
+            names.extend(anomaly.names)
+        scene.select_names(names)
@@ -0,0 +1,47 @@
+from PySide2 import QtCore, QtWidgets
+
+from models.name_index import NameMatcher, MATCH_MODES
+
+
+class NameFilterWidget(QtWidgets.QWidget):
+    """A filter field with a choice of match mode.
+    Emits filter_changed with a name matcher as the filter is edited, or None when the field is cleared.
+    Regular expressions that do not compile are marked and leave the current filter in place."""
+
+    filter_changed = QtCore.Signal(object)
+
+    def __init__(self, parent=None):
+        super(NameFilterWidget, self).__init__(parent)
+
+        # Create widgets.
+        self.line_edit = QtWidgets.QLineEdit()
+        self.line_edit.setPlaceholderText('Filter')
+        self.line_edit.setClearButtonEnabled(True)
+        self.mode_combo_box = QtWidgets.QComboBox()
+        for mode in MATCH_MODES:
+            self.mode_combo_box.addItem(mode.capitalize(), mode)
+
+        # Create layouts.
+        self.main_layout = QtWidgets.QHBoxLayout()
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+        self.main_layout.addWidget(self.line_edit)
+        self.main_layout.addWidget(self.mode_combo_box)
+        self.setLayout(self.main_layout)
+
+        # Create connections.
+        self.line_edit.textChanged.connect(self.on_filter_edited)
+        self.mode_combo_box.currentIndexChanged.connect(self.on_filter_edited)
+
+    def get_matcher(self):
+        pattern = self.line_edit.text()
+        if not pattern:
+            return None
+        return NameMatcher(pattern, self.mode_combo_box.itemData(self.mode_combo_box.currentIndex()))
+
+    def on_filter_edited(self, *args):
+        matcher = self.get_matcher()
+        if matcher is not None and not matcher.is_valid:
+            self.line_edit.setStyleSheet('QLineEdit { color: rgb(230, 90, 90) }')
+            return
+        self.line_edit.setStyleSheet('')
+        self.filter_changed.emit(matcher)
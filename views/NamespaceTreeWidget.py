@@ -0,0 +1,190 @@
+from PySide2 import QtCore, QtWidgets, QtGui
+
+from models import scene
+
+
+class NamespaceTreeWidget(QtWidgets.QTreeWidget):
+    """An outline grouping shading groups under the reference node or namespace they belong to.
+    Each group shows how many shading groups, members and components it holds. The counts are computed once from an
+    assignment index when the outline is populated, then patched one shading group at a time as the index changes.
+    Shading group items are only created when their group is expanded, so the top level stays small."""
+
+    COLUMNS = ['Name', 'Members', 'Components']
+
+    def __init__(self, assignment_index, parent=None):
+        super(NamespaceTreeWidget, self).__init__(parent)
+
+        # Set styles.
+        self.setHeaderLabels(self.COLUMNS)
+
+        # Set behaviours.
+        self.setSelectionMode(self.ExtendedSelection)
+        self.setUniformRowHeights(True)
+        self.header().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
+
+        # Create properties.
+        self.assignment_index = assignment_index
+        self.is_populated = False
+        self.shading_group_counts = {}
+        self.group_counts = {}
+        self.group_shading_groups = {}
+        self.group_items = {}
+        self.shading_group_items = {}
+
+        self.bold_font = QtGui.QFont()
+        self.bold_font.setBold(True)
+
+        # Create connections.
+        self.itemExpanded.connect(self.on_item_expanded)
+        self.itemSelectionChanged.connect(self.on_item_selection_changed)
+        self.assignment_index.shading_group_changed.connect(self.on_shading_group_changed)
+
+    def populate(self):
+        self.is_populated = False
+        if not self.assignment_index.is_built:
+            self.assignment_index.build()
+        self.clear()
+        self.shading_group_counts = {}
+        self.group_counts = {}
+        self.group_shading_groups = {}
+        self.group_items = {}
+        self.shading_group_items = {}
+        for shading_group_hash in self.assignment_index.member_records:
+            self.add_counts(shading_group_hash)
+        for group_key in sorted(self.group_counts):
+            self.add_group_item(group_key)
+        self.is_populated = True
+
+    # Counts.
+
+    @staticmethod
+    def get_group_key(shading_group):
+        """Returns the reference node name of a referenced shading group, or its namespace otherwise."""
+        reference_name = scene.get_reference_name(shading_group)
+        if reference_name is not None:
+            return reference_name
+        return scene.get_namespace(scene.get_node_name(shading_group))
+
+    def add_counts(self, shading_group_hash):
+        shading_group = self.assignment_index.get_shading_group(shading_group_hash)
+        records = self.assignment_index.member_records[shading_group_hash]
+        group_key = self.get_group_key(shading_group)
+        counts = (group_key, len(records), sum(record.get_component_count() for record in records))
+        self.shading_group_counts[shading_group_hash] = counts
+        self.group_shading_groups.setdefault(group_key, set()).add(shading_group_hash)
+        group_counts = self.group_counts.setdefault(group_key, [0, 0])
+        group_counts[0] += counts[1]
+        group_counts[1] += counts[2]
+        return group_key
+
+    def remove_counts(self, shading_group_hash):
+        group_key, member_count, component_count = self.shading_group_counts.pop(shading_group_hash)
+        self.group_shading_groups[group_key].discard(shading_group_hash)
+        self.group_counts[group_key][0] -= member_count
+        self.group_counts[group_key][1] -= component_count
+        return group_key
+
+    # Items.
+
+    def add_group_item(self, group_key):
+        group_item = QtWidgets.QTreeWidgetItem()
+        group_item.setData(0, QtCore.Qt.UserRole, group_key)
+        group_item.setFont(0, self.bold_font)
+        group_item.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ShowIndicator)
+        self.addTopLevelItem(group_item)
+        self.group_items[group_key] = group_item
+        self.update_group_item(group_key)
+        return group_item
+
+    def update_group_item(self, group_key):
+        group_item = self.group_items[group_key]
+        member_count, component_count = self.group_counts[group_key]
+        group_item.setText(0, '{0}  ({1})'.format(group_key, len(self.group_shading_groups[group_key])))
+        group_item.setText(1, str(member_count))
+        group_item.setText(2, str(component_count))
+
+    def is_group_item_populated(self, group_item):
+        return group_item.childCount() > 0
+
+    def populate_group_item(self, group_item):
+        group_key = group_item.data(0, QtCore.Qt.UserRole)
+        shading_group_hashes = sorted(self.group_shading_groups[group_key], key=lambda shading_group_hash: scene.get_node_name(
+            self.assignment_index.get_shading_group(shading_group_hash)))
+        for shading_group_hash in shading_group_hashes:
+            self.add_shading_group_item(group_item, shading_group_hash)
+
+    def add_shading_group_item(self, group_item, shading_group_hash):
+        shading_group_item = QtWidgets.QTreeWidgetItem()
+        shading_group_item.setData(0, QtCore.Qt.UserRole, shading_group_hash)
+        group_item.addChild(shading_group_item)
+        self.shading_group_items[shading_group_hash] = shading_group_item
+        self.update_shading_group_item(shading_group_hash)
+
+    def update_shading_group_item(self, shading_group_hash):
+        shading_group_item = self.shading_group_items[shading_group_hash]
+        group_key, member_count, component_count = self.shading_group_counts[shading_group_hash]
+        shading_group_item.setText(0, scene.get_node_name(self.assignment_index.get_shading_group(shading_group_hash)))
+        shading_group_item.setText(1, str(member_count))
+        shading_group_item.setText(2, str(component_count))
+
+    def remove_shading_group_item(self, shading_group_hash):
+        shading_group_item = self.shading_group_items.pop(shading_group_hash, None)
+        if shading_group_item is not None:
+            shading_group_item.parent().removeChild(shading_group_item)
+
+    # Selection.
+
+    def get_selection_names(self):
+        """Returns the names of the shading groups of selected group items, and the names and member strings of
+        selected shading group items."""
+        names = []
+        for item in self.selectedItems():
+            if item.parent() is None:
+                names.extend(scene.get_node_name(self.assignment_index.get_shading_group(shading_group_hash))
+                             for shading_group_hash in self.group_shading_groups[item.data(0, QtCore.Qt.UserRole)])
+                continue
+            shading_group = self.assignment_index.get_shading_group(item.data(0, QtCore.Qt.UserRole))
+            names.append(scene.get_node_name(shading_group))
+            names.extend(self.assignment_index.get_member_strings(shading_group))
+        return names
+
+    def on_item_expanded(self, item):
+        if item.parent() is None and not self.is_group_item_populated(item):
+            self.populate_group_item(item)
+
+    def on_item_selection_changed(self):
+        if not self.is_populated:
+            return
+        scene.select_names(self.get_selection_names())
+
+    def on_shading_group_changed(self, shading_group_hash):
+        if not self.is_populated:
+            return
+        previous_group_key = None
+        if shading_group_hash in self.shading_group_counts:
+            previous_group_key = self.remove_counts(shading_group_hash)
+        group_key = None
+        if self.assignment_index.get_shading_group(shading_group_hash) is not None:
+            group_key = self.add_counts(shading_group_hash)
+
+        if previous_group_key is not None and previous_group_key != group_key:
+            self.remove_shading_group_item(shading_group_hash)
+            if not self.group_shading_groups[previous_group_key]:
+                del self.group_counts[previous_group_key]
+                del self.group_shading_groups[previous_group_key]
+                group_item = self.group_items.pop(previous_group_key)
+                self.takeTopLevelItem(self.indexOfTopLevelItem(group_item))
+            else:
+                self.update_group_item(previous_group_key)
+        if group_key is None:
+            return
+
+        group_item = self.group_items.get(group_key)
+        if group_item is None:
+            self.add_group_item(group_key)
+            return
+        self.update_group_item(group_key)
+        if shading_group_hash in self.shading_group_items:
+            self.update_shading_group_item(shading_group_hash)
+        elif self.is_group_item_populated(group_item):
+            self.add_shading_group_item(group_item, shading_group_hash)
@@ -0,0 +1,106 @@
+from PySide2 import QtCore, QtWidgets, QtGui
+
+from models import scene
+
+
+class ObjectAssignmentTreeWidget(QtWidgets.QTreeWidget):
+    """An inverse outline listing each assigned object and the shading groups assigned to it.
+    It is backed by the reverse map of an assignment index, which is built the first time the outline is populated.
+    Shading group items are only created when their object is expanded."""
+
+    def __init__(self, assignment_index, parent=None):
+        super(ObjectAssignmentTreeWidget, self).__init__(parent)
+
+        # Set styles.
+        self.setHeaderHidden(True)
+
+        # Set behaviours.
+        self.setSelectionMode(self.ExtendedSelection)
+        self.setUniformRowHeights(True)
+        self.header().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
+        self.header().setStretchLastSection(False)
+
+        # Create properties.
+        self.assignment_index = assignment_index
+        self.object_items = {}
+        self.is_populated = False
+
+        # Create connections.
+        self.itemExpanded.connect(self.on_item_expanded)
+        self.itemSelectionChanged.connect(self.on_item_selection_changed)
+        self.assignment_index.objects_changed.connect(self.on_objects_changed)
+
+    def populate(self):
+        self.is_populated = False
+        if not self.assignment_index.is_built:
+            self.assignment_index.build()
+        self.clear()
+        self.object_items = {}
+        for object_path in sorted(self.assignment_index.get_object_paths()):
+            self.add_object_item(object_path)
+        self.is_populated = True
+
+    def add_object_item(self, object_path):
+        object_item = QtWidgets.QTreeWidgetItem([object_path.rsplit('|', 1)[-1]])
+        object_item.setToolTip(0, object_path)
+        object_item.setData(0, QtCore.Qt.UserRole, object_path)
+        object_item.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ShowIndicator)
+        font = QtGui.QFont()
+        font.setBold(True)
+        object_item.setFont(0, font)
+        self.addTopLevelItem(object_item)
+        self.object_items[object_path] = object_item
+        return object_item
+
+    def populate_object_item(self, object_item):
+        object_item.takeChildren()
+        object_path = object_item.data(0, QtCore.Qt.UserRole)
+        assignments = self.assignment_index.get_object_assignments(object_path)
+        for shading_group_hash, records in assignments.items():
+            shading_group = self.assignment_index.get_shading_group(shading_group_hash)
+            member_strings = []
+            components = []
+            for record in records:
+                member_strings.extend(record.get_member_strings())
+                components.extend(record.get_component_strings())
+            label = scene.get_node_name(shading_group)
+            if components:
+                label = '{0}  {1}'.format(label, ' '.join(components))
+            shading_group_item = QtWidgets.QTreeWidgetItem([label])
+            shading_group_item.setData(0, QtCore.Qt.UserRole, member_strings)
+            object_item.addChild(shading_group_item)
+
+    def get_selected_member_strings(self):
+        member_strings = []
+        for item in self.selectedItems():
+            if item.parent() is None:
+                member_strings.append(item.data(0, QtCore.Qt.UserRole))
+            else:
+                member_strings.extend(item.data(0, QtCore.Qt.UserRole))
+        return member_strings
+
+    def on_item_expanded(self, item):
+        if item.parent() is None and item.childCount() == 0:
+            self.populate_object_item(item)
+
+    def on_item_selection_changed(self):
+        if not self.is_populated:
+            return
+        scene.select_names(self.get_selected_member_strings())
+
+    def on_objects_changed(self, object_paths):
+        if not self.is_populated:
+            return
+        for object_path in object_paths:
+            object_item = self.object_items.get(object_path)
+            has_assignments = bool(self.assignment_index.get_object_assignments(object_path))
+            if object_item is None:
+                if has_assignments:
+                    self.add_object_item(object_path)
+            elif not has_assignments:
+                del self.object_items[object_path]
+                self.takeTopLevelItem(self.indexOfTopLevelItem(object_item))
+            elif object_item.isExpanded():
+                self.populate_object_item(object_item)
+            else:
+                object_item.takeChildren()
@@ -0,0 +1,129 @@
+from PySide2 import QtCore, QtWidgets
+
+from models.profiler import profiler
+
+
+class PerformanceStatsWidget(QtWidgets.QWidget):
+    """A collapsible panel showing the statistics recorded by the profiler.
+    Statistics are only recorded while profiling is enabled, and the table is refreshed periodically while expanded."""
+
+    COLUMNS = ['Operation', 'Calls', 'Total (ms)', 'Mean (ms)', 'Max (ms)', 'Items', 'Histogram']
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, dispatcher, parent=None):
+        super(PerformanceStatsWidget, self).__init__(parent)
+
+        self.dispatcher = dispatcher
+
+        self.create_widgets()
+        self.create_layouts()
+        self.create_connections()
+
+        self.content_widget.setVisible(False)
+
+    def create_widgets(self):
+        self.btn_toggle = QtWidgets.QToolButton()
+        self.btn_toggle.setText('Performance')
+        self.btn_toggle.setCheckable(True)
+        self.btn_toggle.setToolButtonStyle(QtCore.Qt.ToolButtonTextBesideIcon)
+        self.btn_toggle.setArrowType(QtCore.Qt.RightArrow)
+        self.btn_toggle.setAutoRaise(True)
+
+        self.content_widget = QtWidgets.QWidget()
+
+        self.chk_enabled = QtWidgets.QCheckBox('Enable Profiling')
+        self.chk_enabled.setChecked(profiler.is_enabled)
+
+        self.stats_tree = QtWidgets.QTreeWidget()
+        self.stats_tree.setHeaderLabels(self.COLUMNS)
+        self.stats_tree.setRootIsDecorated(False)
+        self.stats_tree.setMinimumHeight(150)
+        self.stats_tree.header().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
+
+        self.lbl_events = QtWidgets.QLabel()
+        self.lbl_callbacks = QtWidgets.QLabel()
+
+        self.btn_reset = QtWidgets.QPushButton('Reset')
+        self.btn_export = QtWidgets.QPushButton('Export JSON...')
+
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL)
+
+    def create_layouts(self):
+        self.main_layout = QtWidgets.QVBoxLayout()
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+        self.content_layout = QtWidgets.QVBoxLayout()
+        self.content_layout.setContentsMargins(0, 0, 0, 0)
+        self.buttons_layout = QtWidgets.QHBoxLayout()
+
+        self.main_layout.addWidget(self.btn_toggle)
+        self.main_layout.addWidget(self.content_widget)
+
+        self.content_layout.addWidget(self.chk_enabled)
+        self.content_layout.addWidget(self.stats_tree)
+        self.content_layout.addWidget(self.lbl_events)
+        self.content_layout.addWidget(self.lbl_callbacks)
+        self.content_layout.addLayout(self.buttons_layout)
+        self.content_widget.setLayout(self.content_layout)
+
+        self.buttons_layout.addStretch()
+        self.buttons_layout.addWidget(self.btn_reset)
+        self.buttons_layout.addWidget(self.btn_export)
+
+        self.setLayout(self.main_layout)
+
+    def create_connections(self):
+        self.btn_toggle.toggled.connect(self.on_toggled)
+        self.chk_enabled.toggled.connect(self.on_enabled_toggled)
+        self.btn_reset.clicked.connect(self.on_reset_clicked)
+        self.btn_export.clicked.connect(self.on_export_clicked)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def refresh(self):
+        self.stats_tree.clear()
+        for statistics in profiler.get_statistics():
+            histogram = ' '.join(str(count) for count in statistics['histogram'].values())
+            item = QtWidgets.QTreeWidgetItem([
+                statistics['name'],
+                str(statistics['calls']),
+                '{0:.2f}'.format(statistics['total_seconds'] * 1000.0),
+                '{0:.2f}'.format(statistics['mean_seconds'] * 1000.0),
+                '{0:.2f}'.format(statistics['max_seconds'] * 1000.0),
+                str(statistics['items']),
+                histogram,
+            ])
+            item.setToolTip(6, ', '.join('{0}: {1}'.format(label, count)
+                                         for label, count in statistics['histogram'].items()))
+            self.stats_tree.addTopLevelItem(item)
+
+        event_statistics = self.dispatcher.get_statistics()
+        self.lbl_events.setText('Scene events: {0} raw, {1} coalesced, {2} suppressed, {3} flushes'.format(
+            event_statistics['raw_events'], event_statistics['coalesced_events'],
+            event_statistics['suppressed_events'], event_statistics['flushes']))
+        callback_statistics = event_statistics['callbacks']
+        self.lbl_callbacks.setText('Callbacks: {0} live, {1} on {2} nodes, {3} session, {4} removed with their nodes'.format(
+            callback_statistics['callbacks'], callback_statistics['node_callbacks'], callback_statistics['nodes'],
+            callback_statistics['session_callbacks'], callback_statistics['removed_with_nodes']))
+
+    def on_toggled(self, checked):
+        self.btn_toggle.setArrowType(QtCore.Qt.DownArrow if checked else QtCore.Qt.RightArrow)
+        self.content_widget.setVisible(checked)
+        if checked:
+            self.refresh()
+            self.refresh_timer.start()
+        else:
+            self.refresh_timer.stop()
+
+    def on_enabled_toggled(self, checked):
+        profiler.set_enabled(checked)
+
+    def on_reset_clicked(self):
+        profiler.reset()
+        self.refresh()
+
+    def on_export_clicked(self):
+        path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
+            self, 'Export Performance Statistics', 'shading_group_manager_stats.json', 'JSON (*.json)')
+        if not path:
+            return
+        profiler.export(path, {'scene_events': self.dispatcher.get_statistics()})
@@ -0,0 +1,70 @@
+from PySide2 import QtCore
+
+from models import scene
+from models.profiler import profiler
+
+
+class SelectionSynchronizer(QtCore.QObject):
+    """Pushes the selection of a view to the scene.
+    Requests made within the throttle interval are coalesced into a single push, and a push is skipped when the
+    names it would select are the same as those of the previous push, unless the scene selection has been changed
+    elsewhere since, which is reported by calling invalidate. The get_selection_names function is called at push time
+    and returns the node names and member strings to select."""
+
+    THROTTLE_INTERVAL = 30
+
+    def __init__(self, get_selection_names, parent=None):
+        super(SelectionSynchronizer, self).__init__(parent)
+
+        self.get_selection_names = get_selection_names
+
+        self.push_timer = QtCore.QTimer(self)
+        self.push_timer.setSingleShot(True)
+        self.push_timer.setInterval(self.THROTTLE_INTERVAL)
+        self.push_timer.timeout.connect(self.push)
+
+        self.last_pushed_names = None
+        self.is_pushing = False
+        self.request_count = 0
+        self.push_count = 0
+        self.skipped_push_count = 0
+
+    def request_push(self):
+        self.request_count += 1
+        if not self.push_timer.isActive():
+            self.push_timer.start()
+
+    def push(self):
+        self.push_timer.stop()
+        with profiler.measure('selection.push') as measurement:
+            names = self.get_selection_names()
+            measurement.item_count = len(names)
+            pushed_names = frozenset(names)
+            if pushed_names == self.last_pushed_names:
+                self.skipped_push_count += 1
+                return
+            self.is_pushing = True
+            try:
+                scene.select_names(names)
+            finally:
+                self.is_pushing = False
+            self.last_pushed_names = pushed_names
+            self.push_count += 1
+
+    def flush(self):
+        """Pushes a pending request right away, leaving the scene selection untouched if there is none."""
+        if self.push_timer.isActive():
+            self.push()
+
+    def invalidate(self):
+        """Forgets the previous push so that the next one is not skipped, for when the scene selection changed elsewhere.
+        Selection changes made by the push itself are ignored."""
+        if not self.is_pushing:
+            self.last_pushed_names = None
+
+    def get_statistics(self):
+        return {
+            'requests': self.request_count,
+            'pushes': self.push_count,
+            'skipped_pushes': self.skipped_push_count,
+        }
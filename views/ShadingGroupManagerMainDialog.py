@@ -3,9 +3,18 @@ from PySide2 import QtWidgets
 from shiboken2 import wrapInstance
 import maya.OpenMayaUI as omui
 
-from views.ShadingGroupTreeWidget import ShadingGroupTreeWidget
+from views.ShadingGroupTreeView import ShadingGroupTreeView
+from views.ObjectAssignmentTreeWidget import ObjectAssignmentTreeWidget
+from views.NamespaceTreeWidget import NamespaceTreeWidget
 from views.ShadingGroupSelectionDialog import ShadingGroupSelectionDialog
-from models import scene
+from views.AnomalyScannerDialog import AnomalyScannerDialog
+from views.PerformanceStatsWidget import PerformanceStatsWidget
+from views.NameFilterWidget import NameFilterWidget
+from views.TaskProgressWidget import TaskProgressWidget
+from models import assignment
+from models import assignment_map
+from models import component_resolver
+from models import consolidation
 
 
 def get_maya_main_window():
@@ -15,6 +24,8 @@ def get_maya_main_window():
 
 class ShadingGroupManagerMainDialog(QtWidgets.QDialog):
 
+    MAX_REPORTED_NAMES = 10
+
     def __init__(self, parent=get_maya_main_window()):
         super(ShadingGroupManagerMainDialog, self).__init__(parent)
 
@@ -24,43 +35,79 @@ class ShadingGroupManagerMainDialog(QtWidgets.QDialog):
         self.create_layouts()
         self.create_connections()
 
+        # Shading groups fill in once the dialog is shown.
+        self.population_progress.watch(self.tree_view.populate())
+
+        # Assignments saved when the tool was last closed on this scene file are shown at once, then checked.
+        snapshot_validation = self.tree_view.load_snapshot()
+        if snapshot_validation is not None:
+            self.validation_progress.watch(snapshot_validation)
+
     def create_widgets(self):
-        self.tree_view = ShadingGroupTreeWidget(self)
+        self.name_filter = NameFilterWidget(self)
+
+        self.tree_view = ShadingGroupTreeView(self)
         self.tree_view.setMinimumWidth(300)
         self.tree_view.setMinimumHeight(350)
 
+        self.object_view = ObjectAssignmentTreeWidget(self.tree_view.assignment_index, self)
+        self.namespace_view = NamespaceTreeWidget(self.tree_view.assignment_index, self)
+
+        self.tab_widget = QtWidgets.QTabWidget()
+        self.tab_widget.addTab(self.tree_view, 'Shading Groups')
+        self.tab_widget.addTab(self.object_view, 'Objects')
+        self.tab_widget.addTab(self.namespace_view, 'Namespaces')
+
+        self.population_progress = TaskProgressWidget('Reading shading groups', self)
+        self.validation_progress = TaskProgressWidget('Checking saved assignments', self)
+
         self.btn_reassign = QtWidgets.QPushButton('Reassign Selection')
         self.btn_remove = QtWidgets.QPushButton('Remove Selection')
         self.btn_remove_components = QtWidgets.QPushButton('Remove Components')
+        self.btn_merge_duplicates = QtWidgets.QPushButton('Merge Duplicates')
+        self.btn_scan_anomalies = QtWidgets.QPushButton('Scan Anomalies')
         self.btn_select_all = QtWidgets.QPushButton('Select All')
         self.btn_select_none = QtWidgets.QPushButton('Select None')
         self.btn_select_empty = QtWidgets.QPushButton('Select All Empty')
         self.btn_select_components = QtWidgets.QPushButton('Select All Components')
         self.btn_expand_all = QtWidgets.QPushButton('Expand All')
         self.btn_collapse_all = QtWidgets.QPushButton('Collapse All')
+        self.btn_export = QtWidgets.QPushButton('Export Assignments')
+        self.btn_import = QtWidgets.QPushButton('Import Assignments')
 
         self.btn_reassign.setMinimumWidth(150)  # All buttons stretch to fit this width
 
+        self.performance_stats = PerformanceStatsWidget(self.tree_view.dispatcher, self)
+
         self.btn_refresh = QtWidgets.QPushButton('Refresh')
         self.btn_close = QtWidgets.QPushButton('Close')
 
     def create_layouts(self):
         self.main_layout = QtWidgets.QVBoxLayout()
         self.columns_layout = QtWidgets.QHBoxLayout()
+        self.left_layout = QtWidgets.QVBoxLayout()
         self.right_layout = QtWidgets.QVBoxLayout()
         self.bottom_layout = QtWidgets.QHBoxLayout()
 
         self.main_layout.addLayout(self.columns_layout)
+        self.main_layout.addWidget(self.performance_stats)
         self.main_layout.addLayout(self.bottom_layout)
 
-        self.columns_layout.addWidget(self.tree_view)
+        self.columns_layout.addLayout(self.left_layout)
         self.columns_layout.addLayout(self.right_layout)
 
+        self.left_layout.addWidget(self.name_filter)
+        self.left_layout.addWidget(self.tab_widget)
+        self.left_layout.addWidget(self.population_progress)
+        self.left_layout.addWidget(self.validation_progress)
+
         self.right_layout.setSpacing(0)
         self.right_layout.addWidget(self.btn_reassign)
         self.right_layout.addWidget(self.btn_remove)
         self.right_layout.addSpacing(20)
         self.right_layout.addWidget(self.btn_remove_components)
+        self.right_layout.addWidget(self.btn_merge_duplicates)
+        self.right_layout.addWidget(self.btn_scan_anomalies)
         self.right_layout.addSpacing(20)
         self.right_layout.addWidget(self.btn_select_all)
         self.right_layout.addWidget(self.btn_select_none)
@@ -69,6 +116,9 @@ class ShadingGroupManagerMainDialog(QtWidgets.QDialog):
         self.right_layout.addSpacing(20)
         self.right_layout.addWidget(self.btn_expand_all)
         self.right_layout.addWidget(self.btn_collapse_all)
+        self.right_layout.addSpacing(20)
+        self.right_layout.addWidget(self.btn_export)
+        self.right_layout.addWidget(self.btn_import)
         self.right_layout.addStretch()
 
         self.bottom_layout.addWidget(self.btn_refresh)
@@ -81,6 +131,9 @@ class ShadingGroupManagerMainDialog(QtWidgets.QDialog):
     def create_connections(self):
         self.btn_reassign.clicked.connect(self.on_reassign_clicked)
         self.btn_remove.clicked.connect(self.on_remove_clicked)
+        self.btn_remove_components.clicked.connect(self.on_remove_components_clicked)
+        self.btn_merge_duplicates.clicked.connect(self.on_merge_duplicates_clicked)
+        self.btn_scan_anomalies.clicked.connect(self.on_scan_anomalies_clicked)
         self.btn_select_all.clicked.connect(self.on_select_all_clicked)
         self.btn_select_none.clicked.connect(self.on_select_none_clicked)
         self.btn_select_empty.clicked.connect(self.on_select_empty_clicked)
@@ -89,6 +142,10 @@ class ShadingGroupManagerMainDialog(QtWidgets.QDialog):
         self.btn_close.clicked.connect(self.on_close_clicked)
         self.btn_expand_all.clicked.connect(self.on_expand_all_clicked)
         self.btn_collapse_all.clicked.connect(self.on_collapse_all_clicked)
+        self.btn_export.clicked.connect(self.on_export_clicked)
+        self.btn_import.clicked.connect(self.on_import_clicked)
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
+        self.name_filter.filter_changed.connect(self.on_name_filter_changed)
         self.finished.connect(self.on_finished)
 
     def on_reassign_clicked(self):
@@ -96,11 +153,36 @@ class ShadingGroupManagerMainDialog(QtWidgets.QDialog):
         selection_dialog.exec_()
 
     def on_reassign_selection_accepted(self, shading_group):
-        scene.assign_selection_to_shading_group(shading_group)
+        assignment.assign_selection_to_shading_group(shading_group,
+                                                     dispatcher=self.tree_view.dispatcher,
+                                                     assignment_index=self.tree_view.assignment_index)
 
     def on_remove_clicked(self):
         self.tree_view.remove_selection()
 
+    def on_remove_components_clicked(self):
+        # Make sure a pending outline selection has reached the scene before reading it.
+        self.tree_view.selection_synchronizer.flush()
+        component_resolver.remove_components(component_resolver.get_selected_object_names(),
+                                             dispatcher=self.tree_view.dispatcher)
+
+    def on_merge_duplicates_clicked(self):
+        clusters = consolidation.find_duplicate_shading_groups()
+        if not clusters:
+            QtWidgets.QMessageBox.information(self, 'Merge Duplicates', 'No duplicate shading groups were found.')
+            return
+        merged_count = sum(len(cluster) - 1 for cluster in clusters)
+        answer = QtWidgets.QMessageBox.question(
+            self, 'Merge Duplicates',
+            'Merge {0} duplicate shading groups into {1}?'.format(merged_count, len(clusters)))
+        if answer != QtWidgets.QMessageBox.Yes:
+            return
+        consolidation.merge_duplicate_shading_groups(clusters, dispatcher=self.tree_view.dispatcher)
+
+    def on_scan_anomalies_clicked(self):
+        anomaly_dialog = AnomalyScannerDialog(self, self.tree_view.dispatcher)
+        anomaly_dialog.exec_()
+
     def on_select_all_clicked(self):
         self.tree_view.selectAll()
 
@@ -119,11 +201,50 @@ class ShadingGroupManagerMainDialog(QtWidgets.QDialog):
     def on_collapse_all_clicked(self):
         self.tree_view.collapse_all()
 
+    def on_name_filter_changed(self, name_filter):
+        self.tree_view.set_name_filter(name_filter)
+
+    def on_export_clicked(self):
+        path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
+            self, 'Export Assignments', 'shading_assignments.jsonl', 'JSON Lines (*.jsonl);;CSV (*.csv)')
+        if not path:
+            return
+        assignment_map.export_assignments(path)
+
+    def on_import_clicked(self):
+        path, selected_filter = QtWidgets.QFileDialog.getOpenFileName(
+            self, 'Import Assignments', '', 'Assignment Maps (*.jsonl *.csv)')
+        if not path:
+            return
+        summary = assignment_map.import_assignments_from_file(path, dispatcher=self.tree_view.dispatcher)
+        lines = ['Assigned {0} members in {1} batches.'.format(summary['assigned'], summary['batches'])]
+        for key, label in (('missing_shading_groups', 'shading groups'), ('missing_objects', 'objects')):
+            names = summary[key]
+            if names:
+                lines.append('Skipped {0} missing {1}: {2}{3}'.format(
+                    len(names), label, ', '.join(names[:self.MAX_REPORTED_NAMES]),
+                    ', ...' if len(names) > self.MAX_REPORTED_NAMES else ''))
+        if summary['missing_shading_groups'] or summary['missing_objects']:
+            QtWidgets.QMessageBox.warning(self, 'Import Assignments', '\n\n'.join(lines))
+        else:
+            QtWidgets.QMessageBox.information(self, 'Import Assignments', lines[0])
+
+    def on_tab_changed(self, index):
+        widget = self.tab_widget.widget(index)
+        if widget in (self.object_view, self.namespace_view) and not widget.is_populated:
+            widget.populate()
+
     def on_refresh_clicked(self):
         self.tree_view.refresh()
+        for view in (self.object_view, self.namespace_view):
+            if view.is_populated:
+                view.populate()
 
     def on_close_clicked(self):
         self.close()
 
     def on_finished(self, result):
-        scene.deregister_callbacks(self.tree_view.callback_ids)
+        if self.tree_view.population is not None:
+            self.tree_view.population.cancel()
+        self.tree_view.save_snapshot()
+        self.tree_view.dispatcher.deregister()
@@ -1,6 +1,12 @@
 from PySide2 import QtCore, QtWidgets, QtGui
 
 import models.scene
+from models.name_index import NameIndex
+from models.chunked_task import ChunkedTask
+from views.NameFilterWidget import NameFilterWidget
+from views.TaskProgressWidget import TaskProgressWidget
+from views.SwatchTreeWidgetItem import SwatchTreeWidgetItem
+from views.SwatchProvider import get_swatch_provider
 
 
 class ShadingGroupSelectionDialog(QtWidgets.QDialog):
@@ -12,8 +18,18 @@ class ShadingGroupSelectionDialog(QtWidgets.QDialog):
 
         self.setWindowTitle('Select Shading Group')
 
+        # Create properties.
+        self.name_index = NameIndex()
+        self.name_filter_matcher = None
+        self.hidden_rows = set()
+        self.population = None
+        self.swatch_provider = get_swatch_provider()
+        self.swatch_items = {}
+
         # Create widgets.
+        self.name_filter = NameFilterWidget(self)
         self.tree_widget = QtWidgets.QTreeWidget(self)
+        self.population_progress = TaskProgressWidget('Reading shading groups', self)
         self.btn_select = QtWidgets.QPushButton('Select')
         self.btn_close = QtWidgets.QPushButton('Close')
 
@@ -24,6 +40,7 @@ class ShadingGroupSelectionDialog(QtWidgets.QDialog):
         self.tree_widget.invisibleRootItem()
         self.tree_widget.setRootIsDecorated(False)
         self.tree_widget.setStyleSheet("QTreeView::item { padding: 2px }")
+        self.tree_widget.setIconSize(QtCore.QSize(32, 32))
 
         # Set behaviours.
         self.tree_widget.setSelectionMode(self.tree_widget.SingleSelection)
@@ -34,7 +51,9 @@ class ShadingGroupSelectionDialog(QtWidgets.QDialog):
         self.main_layout = QtWidgets.QVBoxLayout()
         self.bottom_layout = QtWidgets.QHBoxLayout()
 
+        self.main_layout.addWidget(self.name_filter)
         self.main_layout.addWidget(self.tree_widget)
+        self.main_layout.addWidget(self.population_progress)
         self.main_layout.addLayout(self.bottom_layout)
 
         self.bottom_layout.addWidget(self.btn_select)
@@ -47,25 +66,74 @@ class ShadingGroupSelectionDialog(QtWidgets.QDialog):
         # Create connections.
         self.btn_select.clicked.connect(self.on_select_clicked)
         self.btn_close.clicked.connect(self.on_close_clicked)
+        self.name_filter.filter_changed.connect(self.on_name_filter_changed)
         self.selection_accepted.connect(receiver)
+        self.swatch_provider.swatch_ready.connect(self.on_swatch_ready)
+        self.finished.connect(self.on_finished)
 
         self.populate()
 
     def populate(self):
-        shading_groups = models.scene.get_shading_groups()
-
+        """Adds the shading groups of the scene in chunks across event loop iterations, so the dialog shows immediately."""
+        self.population = ChunkedTask('selection_dialog.populate_chunk', models.scene.get_shading_groups(),
+                                      self.add_shading_groups, self)
+        self.population.start()
+        self.population_progress.watch(self.population)
+
+    def add_shading_groups(self, shading_groups):
+        first_row = self.tree_widget.topLevelItemCount()
+        items = []
         for shading_group in shading_groups:
+            if not models.scene.is_shading_group(shading_group):
+                continue
             shading_group_name = models.scene.get_node_name(shading_group)
-            shading_group_item = QtWidgets.QTreeWidgetItem([shading_group_name])
+            shading_group_hash = models.scene.get_node_hash(shading_group)
+            shading_group_item = SwatchTreeWidgetItem(shading_group, shading_group_hash, shading_group_name,
+                                                      self.swatch_provider)
             shading_group_item.setData(0, QtCore.Qt.UserRole, shading_group)
-            self.tree_widget.addTopLevelItem(shading_group_item)
+            self.swatch_items[shading_group_hash] = shading_group_item
+            self.name_index.set_shading_group(first_row + len(items), shading_group_name)
+            items.append(shading_group_item)
+        self.tree_widget.addTopLevelItems(items)
+
+        # Groups added while a filter is set are hidden unless they match it.
+        if self.name_filter_matcher is not None:
+            for row, item in enumerate(items, first_row):
+                if not self.name_filter_matcher.matches(item.text(0)):
+                    item.setHidden(True)
+                    self.hidden_rows.add(row)
+
+    def set_name_filter(self, name_filter):
+        """Hides the shading groups whose names do not match, only touching items whose visibility changes."""
+        self.name_filter_matcher = name_filter
+        if name_filter is None:
+            hidden_rows = set()
+        else:
+            hidden_rows = set(range(self.tree_widget.topLevelItemCount())) - self.name_index.search(name_filter)
+        for row in hidden_rows ^ self.hidden_rows:
+            self.tree_widget.topLevelItem(row).setHidden(row in hidden_rows)
+        self.hidden_rows = hidden_rows
 
     def on_select_clicked(self):
         for item in self.tree_widget.selectedItems():
+            if item.isHidden():
+                continue
             data = item.data(0, QtCore.Qt.UserRole)
             self.selection_accepted.emit(data)
             break
         self.close()
 
+    def on_name_filter_changed(self, name_filter):
+        self.set_name_filter(name_filter)
+
+    def on_swatch_ready(self, shading_group_hash):
+        item = self.swatch_items.get(shading_group_hash)
+        if item is not None:
+            item.emitDataChanged()
+
+    def on_finished(self, result):
+        self.population.cancel()
+        self.swatch_provider.swatch_ready.disconnect(self.on_swatch_ready)
+
     def on_close_clicked(self):
         self.close()
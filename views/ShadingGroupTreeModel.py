@@ -0,0 +1,418 @@
+from collections import OrderedDict
+
+from PySide2 import QtCore, QtGui
+
+from models import scene
+from models.profiler import profiler
+
+
+def get_contiguous_ranges(rows):
+    """Yields (first, last) pairs for each run of consecutive integers in the given sorted rows."""
+    first = last = None
+    for row in rows:
+        if first is None:
+            first = last = row
+        elif row == last + 1:
+            last = row
+        else:
+            yield first, last
+            first = last = row
+    if first is not None:
+        yield first, last
+
+
+class ShadingGroupTreeNode(object):
+    """Holds the state of a single shading group row.
+    The name and member records are only read from the scene when they are first requested.
+    The assignment index stores a record per object and component type, and each member row is the record of a single
+    one of its ranges, so that rows can be selected and removed range by range as they were as member strings.
+    The member lookup maps the range keys of the rows to their records."""
+
+    __slots__ = ('shading_group', 'hash', 'name', 'member_records', 'member_lookup', 'fetched_count')
+
+    def __init__(self, shading_group, shading_group_hash):
+        self.shading_group = shading_group
+        self.hash = shading_group_hash
+        self.name = None
+        self.member_records = None
+        self.member_lookup = None
+        self.fetched_count = 0
+
+    def is_loaded(self):
+        return self.member_records is not None
+
+    def is_fully_fetched(self):
+        return self.member_records is not None and self.fetched_count == len(self.member_records)
+
+    def unload(self):
+        """Forgets the member rows, so that they are read again when the shading group is next expanded."""
+        self.member_records = None
+        self.member_lookup = None
+        self.fetched_count = 0
+
+
+class ShadingGroupTreeModel(QtCore.QAbstractItemModel):
+    """A two level model of shading groups and their members.
+    Top level rows are indexed without a pointer while member rows point at their shading group node.
+    Both levels are exposed to views in batches through canFetchMore and fetchMore, and members
+    are not read from the scene until their shading group is expanded.
+    When a name filter is set, only the shading groups that match it in the name index are given rows,
+    and member rows that match are highlighted. Shading group rows show swatches from the swatch provider, if given."""
+
+    FETCH_BATCH_SIZE = 256
+
+    def __init__(self, assignment_index, swatch_provider=None, parent=None):
+        super(ShadingGroupTreeModel, self).__init__(parent)
+
+        self.assignment_index = assignment_index
+        self.swatch_provider = swatch_provider
+        self.all_shading_group_nodes = OrderedDict()
+        self.shading_group_nodes = []
+        self.shading_group_rows = {}
+        self.fetched_group_count = 0
+        self.name_filter = None
+
+        self.bold_font = QtGui.QFont()
+        self.bold_font.setBold(True)
+        self.match_brush = QtGui.QBrush(QtGui.QColor(255, 200, 80))
+
+        if self.swatch_provider is not None:
+            self.swatch_provider.swatch_ready.connect(self.on_swatch_ready)
+
+    def clear(self):
+        self.beginResetModel()
+        self.all_shading_group_nodes = OrderedDict()
+        self.update_visible_shading_group_nodes()
+        self.endResetModel()
+
+    @profiler.profiled('tree.populate', lambda result, model: len(model.all_shading_group_nodes))
+    def populate(self):
+        """Resets the model to every shading group in the scene in one go.
+        Views that should stay responsive on heavy scenes clear the model and add shading groups in chunks instead."""
+        self.clear()
+        self.add_shading_groups(scene.get_shading_groups())
+
+    @profiler.profiled('tree.set_name_filter', lambda result, model, name_filter: len(model.shading_group_nodes))
+    def set_name_filter(self, name_filter):
+        """Sets the name matcher that shading groups must match to be shown, or None to show all of them.
+        The name index of the assignment index must have been built before a matcher is set."""
+        self.beginResetModel()
+        self.name_filter = name_filter
+        self.update_visible_shading_group_nodes()
+        self.endResetModel()
+
+    def update_visible_shading_group_nodes(self):
+        """Must only be called while the model is being reset, since the member rows of every node are dropped."""
+        for node in self.all_shading_group_nodes.values():
+            node.unload()
+        if self.name_filter is None:
+            self.shading_group_nodes = list(self.all_shading_group_nodes.values())
+        else:
+            matching_hashes = self.assignment_index.name_index.search(self.name_filter)
+            self.shading_group_nodes = [node for node in self.all_shading_group_nodes.values()
+                                        if node.hash in matching_hashes]
+        self.update_shading_group_rows()
+        self.fetched_group_count = 0
+
+    def is_name_filter_stale(self):
+        """Returns whether shading groups have started or stopped matching the name filter since it was applied."""
+        if self.name_filter is None:
+            return False
+        matching_hashes = self.assignment_index.name_index.search(self.name_filter)
+        return ([node.hash for node in self.all_shading_group_nodes.values() if node.hash in matching_hashes] !=
+                [node.hash for node in self.shading_group_nodes])
+
+    def is_visible(self, shading_group_hash):
+        if self.name_filter is None:
+            return True
+        return self.assignment_index.name_index.matches(shading_group_hash, self.name_filter)
+
+    def update_shading_group_rows(self):
+        self.shading_group_rows = dict((node.hash, row) for row, node in enumerate(self.shading_group_nodes))
+
+    # Index helpers.
+
+    def get_shading_group_node(self, index):
+        """Returns the shading group node of a top level row, or the parent shading group node of a member row."""
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if node is None:
+            return self.shading_group_nodes[index.row()]
+        return node
+
+    @staticmethod
+    def is_member_index(index):
+        return index.isValid() and index.internalPointer() is not None
+
+    def get_shading_group_index(self, shading_group_hash):
+        row = self.shading_group_rows.get(shading_group_hash)
+        if row is None or row >= self.fetched_group_count:
+            return QtCore.QModelIndex()
+        return self.index(row, 0)
+
+    def get_member_record(self, index):
+        return index.internalPointer().member_records[index.row()]
+
+    def get_node_name(self, node):
+        if node.name is None:
+            node.name = scene.get_node_name(node.shading_group)
+        return node.name
+
+    # Model interface.
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column)
+        return self.createIndex(row, column, self.get_shading_group_node(parent))
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        node = index.internalPointer()
+        if node is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(self.shading_group_rows[node.hash], 0)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return self.fetched_group_count
+        if self.is_member_index(parent):
+            return 0
+        return self.get_shading_group_node(parent).fetched_count
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self.shading_group_nodes) > 0
+        if self.is_member_index(parent):
+            return False
+        node = self.get_shading_group_node(parent)
+        # Groups that have not been read yet are assumed to have members so that they can be expanded.
+        return not node.is_loaded() or len(node.member_records) > 0
+
+    def canFetchMore(self, parent):
+        if not parent.isValid():
+            return self.fetched_group_count < len(self.shading_group_nodes)
+        if self.is_member_index(parent):
+            return False
+        return not self.get_shading_group_node(parent).is_fully_fetched()
+
+    def fetchMore(self, parent):
+        if not parent.isValid():
+            count = min(self.FETCH_BATCH_SIZE, len(self.shading_group_nodes) - self.fetched_group_count)
+            if count <= 0:
+                return
+            self.beginInsertRows(parent, self.fetched_group_count, self.fetched_group_count + count - 1)
+            self.fetched_group_count += count
+            self.endInsertRows()
+            return
+        if self.is_member_index(parent):
+            return
+        node = self.get_shading_group_node(parent)
+        self.load_members(node)
+        self.fetch_members(parent, node, self.FETCH_BATCH_SIZE)
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if self.is_member_index(index):
+            if role == QtCore.Qt.DisplayRole:
+                return self.get_member_record(index).get_display_name()
+            if role == QtCore.Qt.UserRole:
+                # Selection lists are only built from records when a selection or edit happens.
+                return self.get_member_record(index)
+            if role == QtCore.Qt.ForegroundRole and self.name_filter is not None:
+                if self.name_filter.matches(self.get_member_record(index).get_display_name()):
+                    return self.match_brush
+            return None
+        node = self.get_shading_group_node(index)
+        if role == QtCore.Qt.DisplayRole:
+            return self.get_node_name(node)
+        if role == QtCore.Qt.UserRole:
+            return node.shading_group
+        if role == QtCore.Qt.DecorationRole and self.swatch_provider is not None:
+            return self.swatch_provider.get_icon(node.shading_group, node.hash)
+        if role == QtCore.Qt.FontRole:
+            return self.bold_font
+        if role == QtCore.Qt.SizeHintRole:
+            return QtCore.QSize(18, 18)
+        return None
+
+    def on_swatch_ready(self, shading_group_hash):
+        index = self.get_shading_group_index(shading_group_hash)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [QtCore.Qt.DecorationRole])
+
+    # Fetching.
+
+    def get_member_rows(self, shading_group):
+        return [range_record for record in self.assignment_index.get_member_records(shading_group)
+                for range_record in record.get_range_records()]
+
+    def load_members(self, node):
+        if node.is_loaded():
+            return
+        node.member_records = self.get_member_rows(node.shading_group)
+        node.member_lookup = dict((record.get_range_key(), record) for record in node.member_records)
+
+    def fetch_members(self, parent, node, count=None):
+        remaining = len(node.member_records) - node.fetched_count
+        if count is not None:
+            remaining = min(count, remaining)
+        # Members of a shading group whose own row has not been fetched are fetched along with it later.
+        if remaining <= 0 or not parent.isValid():
+            return
+        self.beginInsertRows(parent, node.fetched_count, node.fetched_count + remaining - 1)
+        node.fetched_count += remaining
+        self.endInsertRows()
+
+    def fetch_shading_group(self, shading_group_hash):
+        """Fetches shading group rows in batches until the row of the given shading group has been fetched."""
+        row = self.shading_group_rows.get(shading_group_hash)
+        while row is not None and row >= self.fetched_group_count and self.canFetchMore(QtCore.QModelIndex()):
+            self.fetchMore(QtCore.QModelIndex())
+
+    def fetch_all_shading_groups(self):
+        while self.canFetchMore(QtCore.QModelIndex()):
+            self.fetchMore(QtCore.QModelIndex())
+
+    def fetch_all_members(self, node):
+        self.load_members(node)
+        self.fetch_members(self.get_shading_group_index(node.hash), node)
+
+    def get_component_member_rows(self):
+        """Returns (shading group row, member rows) pairs for every shown shading group that has component members.
+        Every shading group row is fetched and the members of every group are read, but member rows are not fetched."""
+        self.fetch_all_shading_groups()
+        component_member_rows = []
+        for row, node in enumerate(self.shading_group_nodes):
+            self.load_members(node)
+            member_rows = [member_row for member_row, record in enumerate(node.member_records)
+                           if scene.has_components(record)]
+            if member_rows:
+                component_member_rows.append((row, member_rows))
+        return component_member_rows
+
+    # Reconciliation.
+
+    def add_shading_group(self, shading_group):
+        self.add_shading_groups([shading_group])
+
+    def add_shading_groups(self, shading_groups):
+        """Appends rows for the given shading groups, skipping any that already have a node.
+        Views are only notified once, and only if all of the previous rows had been fetched."""
+        was_fully_fetched = self.fetched_group_count == len(self.shading_group_nodes)
+        for shading_group in shading_groups:
+            shading_group_hash = scene.get_node_hash(shading_group)
+            if shading_group_hash in self.all_shading_group_nodes:
+                continue
+            node = ShadingGroupTreeNode(shading_group, shading_group_hash)
+            self.all_shading_group_nodes[shading_group_hash] = node
+            if not self.is_visible(shading_group_hash):
+                continue
+            self.shading_group_rows[shading_group_hash] = len(self.shading_group_nodes)
+            self.shading_group_nodes.append(node)
+        if was_fully_fetched:
+            self.fetchMore(QtCore.QModelIndex())
+
+    def remove_shading_groups(self, shading_group_hashes):
+        for shading_group_hash in shading_group_hashes:
+            self.all_shading_group_nodes.pop(shading_group_hash, None)
+        removed_rows = sorted(self.shading_group_rows[shading_group_hash]
+                              for shading_group_hash in shading_group_hashes
+                              if shading_group_hash in self.shading_group_rows)
+        if not removed_rows:
+            return
+        self.remove_rows(QtCore.QModelIndex(), self.shading_group_nodes, removed_rows, self.fetched_group_count,
+                         self.on_shading_group_rows_removed)
+        self.update_shading_group_rows()
+
+    def on_shading_group_rows_removed(self, count):
+        self.fetched_group_count -= count
+        self.update_shading_group_rows()
+
+    def remove_rows(self, parent, rows, removed_rows, fetched_count, rows_removed):
+        """Removes the given sorted row numbers from a list of rows, notifying views only about fetched rows.
+        The rows_removed function is passed the number of rows after each removal, before views are notified."""
+        unfetched_rows = set(row for row in removed_rows if row >= fetched_count)
+        if unfetched_rows:
+            rows[fetched_count:] = [item for row, item in enumerate(rows[fetched_count:], fetched_count)
+                                    if row not in unfetched_rows]
+        fetched_rows = [row for row in removed_rows if row < fetched_count]
+        for first, last in reversed(list(get_contiguous_ranges(fetched_rows))):
+            self.beginRemoveRows(parent, first, last)
+            del rows[first:last + 1]
+            rows_removed(last - first + 1)
+            self.endRemoveRows()
+
+    def reconcile_shading_group(self, shading_group):
+        """Patches only the member rows of a single shading group that were added or removed.
+        The assignment index is expected to have been updated for the shading group beforehand."""
+        shading_group_hash = scene.get_node_hash(shading_group)
+        parent = self.get_shading_group_index(shading_group_hash)
+        node = self.all_shading_group_nodes.get(shading_group_hash)
+        if not parent.isValid():
+            # Filtered out groups and groups whose rows have not been fetched yet have no index to notify views
+            # about, so they are read again once they are shown.
+            if node is not None:
+                node.name = None
+                node.unload()
+            return
+
+        if node.name is not None:
+            node.name = scene.get_node_name(shading_group)
+            self.dataChanged.emit(parent, parent)
+
+        # Members that have never been read will be up to date when they are first fetched.
+        if not node.is_loaded():
+            return
+
+        member_records = self.get_member_rows(shading_group)
+        member_lookup = dict((record.get_range_key(), record) for record in member_records)
+
+        # Rows of a range that is still assigned are updated in place, in case their object was renamed.
+        removed_rows = []
+        for member_row, record in enumerate(node.member_records):
+            new_record = member_lookup.get(record.get_range_key())
+            if new_record is None:
+                removed_rows.append(member_row)
+            elif not record.is_equal(new_record):
+                node.member_records[member_row] = new_record
+                if member_row < node.fetched_count:
+                    member_index = self.index(member_row, 0, parent)
+                    self.dataChanged.emit(member_index, member_index)
+        if removed_rows:
+            def on_member_rows_removed(count):
+                node.fetched_count -= count
+            self.remove_rows(parent, node.member_records, removed_rows, node.fetched_count, on_member_rows_removed)
+
+        was_fully_fetched = node.is_fully_fetched()
+        node.member_records.extend(record for record in member_records if record.get_range_key() not in node.member_lookup)
+        node.member_lookup = member_lookup
+        if was_fully_fetched:
+            self.fetch_members(parent, node)
+
+    @profiler.profiled('tree.refresh', lambda result, model: len(model.all_shading_group_nodes))
+    def refresh(self):
+        """Reconciles the model against the scene without resetting it."""
+        shading_groups = scene.get_shading_groups()
+        shading_group_hashes = set()
+        for shading_group in shading_groups:
+            shading_group_hash = scene.get_node_hash(shading_group)
+            shading_group_hashes.add(shading_group_hash)
+            if shading_group_hash in self.all_shading_group_nodes:
+                self.reconcile_shading_group(shading_group)
+            else:
+                self.add_shading_group(shading_group)
+        self.remove_shading_groups([shading_group_hash for shading_group_hash in self.all_shading_group_nodes
+                                    if shading_group_hash not in shading_group_hashes])
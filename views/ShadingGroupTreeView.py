@@ -0,0 +1,305 @@
+from PySide2 import QtCore, QtWidgets, QtGui
+
+from views.ShadingGroupTreeModel import ShadingGroupTreeModel
+from views.SelectionSynchronizer import SelectionSynchronizer
+from views.SwatchProvider import get_swatch_provider
+from models import scene
+from models.profiler import profiler
+from models.assignment_index import AssignmentIndex
+from models.dispatcher import SceneEventDispatcher
+from models.chunked_task import ChunkedTask
+
+
+class ShadingGroupTreeView(QtWidgets.QTreeView):
+
+    def __init__(self, parent=None):
+        super(ShadingGroupTreeView, self).__init__(parent)
+
+        # Set styles.
+        self.setHeaderHidden(True)
+
+        # Set behaviours.
+        self.setSelectionMode(self.ExtendedSelection)
+        self.setUniformRowHeights(True)
+        self.setIconSize(QtCore.QSize(16, 16))
+        self.header().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
+        self.header().setStretchLastSection(False)
+
+        # Create properties.
+        self.selection_is_being_propagated = False
+        self.is_reconciling = False
+        self.assignment_index = AssignmentIndex(self)
+        self.tree_model = ShadingGroupTreeModel(self.assignment_index, get_swatch_provider(), self)
+        self.dispatcher = SceneEventDispatcher(self)
+        self.selection_synchronizer = SelectionSynchronizer(self.get_selection_names, self)
+        self.population = None
+        self.index_build = None
+        self.snapshot_validation = None
+
+        self.setModel(self.tree_model)
+
+        # Create connections.
+        self.selectionModel().selectionChanged.connect(self.on_selection_changed)
+        self.dispatcher.shading_groups_added.connect(self.on_shading_groups_added)
+        self.dispatcher.shading_groups_modified.connect(self.on_shading_groups_modified)
+        self.dispatcher.shading_groups_removed.connect(self.on_shading_groups_removed)
+        self.dispatcher.selection_changed.connect(self.selection_synchronizer.invalidate)
+        self.dispatcher.materials_modified.connect(self.on_materials_modified)
+
+        self.dispatcher.register()
+
+    def resize(self):
+        self.header().setMinimumSectionSize(self.maximumViewportSize().width())
+
+    def get_top_level_indexes(self):
+        return [self.tree_model.index(row, 0) for row in range(self.tree_model.rowCount())]
+
+    def populate(self):
+        """Clears the model and starts adding the shading groups of the scene in chunks across event loop iterations.
+        Returns the task, which is finished by a refresh and can be cancelled, leaving the groups added so far.
+        Once every group has been added, the assignment index is built in the background as well, so that a snapshot
+        can be saved when the view is closed."""
+        if self.population is not None:
+            self.population.cancel()
+        self.tree_model.clear()
+        # Handles are kept rather than nodes, since groups may be deleted before their chunk is reached.
+        handles = [scene.get_node_handle(shading_group) for shading_group in scene.get_shading_groups()]
+        self.population = ChunkedTask('tree.populate_chunk', handles, self.add_shading_group_handles, self)
+        self.population.finished.connect(self.build_index)
+        self.population.start()
+        return self.population
+
+    def build_index(self):
+        """Starts reading the shading groups that have not been read yet in chunks, then builds the assignment index
+        from them. Returns the task, or None if the index is already built."""
+        if self.index_build is not None:
+            self.index_build.cancel()
+        if self.assignment_index.is_built:
+            return None
+        handles = [scene.get_node_handle(shading_group) for shading_group in scene.get_shading_groups()]
+        self.index_build = ChunkedTask('tree.build_index_chunk', handles, self.read_shading_group_handles, self)
+        self.index_build.finished.connect(self.on_index_read)
+        self.index_build.start()
+        return self.index_build
+
+    def read_shading_group_handles(self, handles):
+        shading_groups = [scene.get_node_from_handle(handle) for handle in handles]
+        self.assignment_index.read_shading_groups([shading_group for shading_group in shading_groups
+                                                   if shading_group is not None])
+
+    def on_index_read(self):
+        if not self.assignment_index.is_built:
+            self.assignment_index.build()
+
+    def add_shading_group_handles(self, handles):
+        shading_groups = [scene.get_node_from_handle(handle) for handle in handles]
+        self.tree_model.add_shading_groups([shading_group for shading_group in shading_groups if shading_group is not None])
+
+    def load_snapshot(self):
+        """Builds the assignment index from the snapshot of the scene file, if there is one, and starts checking the
+        shading groups adopted from it in chunks, updating those that have changed since it was written.
+        Returns the checking task, or None if there is no snapshot."""
+        shading_groups = self.assignment_index.load_snapshot()
+        if shading_groups is None:
+            return None
+        handles = [scene.get_node_handle(shading_group) for shading_group in shading_groups]
+        self.snapshot_validation = ChunkedTask('tree.validate_snapshot_chunk', handles,
+                                               self.validate_shading_group_handles, self)
+        self.snapshot_validation.start()
+        return self.snapshot_validation
+
+    def validate_shading_group_handles(self, handles):
+        shading_groups = [scene.get_node_from_handle(handle) for handle in handles]
+        stale_shading_groups = [shading_group for shading_group in shading_groups
+                                if shading_group is not None and self.assignment_index.is_snapshot_stale(shading_group)]
+        if stale_shading_groups:
+            self.on_shading_groups_modified(stale_shading_groups)
+
+    def save_snapshot(self):
+        if self.index_build is not None:
+            self.index_build.cancel()
+        if self.snapshot_validation is not None:
+            self.snapshot_validation.cancel()
+        return self.assignment_index.save_snapshot()
+
+    def refresh(self):
+        """Reconciles the model against the scene.
+        Selection, scroll position and expanded items are left untouched."""
+        if self.population is not None:
+            self.population.finish()
+        if self.snapshot_validation is not None:
+            self.snapshot_validation.cancel()
+        self.tree_model.swatch_provider.invalidate()
+        self.is_reconciling = True
+        try:
+            self.assignment_index.refresh()
+            self.tree_model.refresh()
+            self.update_name_filter()
+        finally:
+            self.is_reconciling = False
+
+    def set_name_filter(self, name_filter):
+        """Shows only the shading groups whose names or member names match, keeping matching groups expanded."""
+        if name_filter is not None:
+            self.assignment_index.build_name_index()
+        expanded_hashes = set(self.tree_model.get_shading_group_node(index).hash
+                              for index in self.get_top_level_indexes() if self.isExpanded(index))
+        self.tree_model.set_name_filter(name_filter)
+        self.tree_model.fetchMore(QtCore.QModelIndex())
+        for shading_group_hash in expanded_hashes:
+            self.tree_model.fetch_shading_group(shading_group_hash)
+            index = self.tree_model.get_shading_group_index(shading_group_hash)
+            if index.isValid():
+                self.expand(index)
+
+    def update_name_filter(self):
+        """Applies the name filter again if shading groups have started or stopped matching it."""
+        if self.tree_model.is_name_filter_stale():
+            self.set_name_filter(self.tree_model.name_filter)
+
+    def remove_selection(self):
+        with profiler.measure('tree.remove_selection') as measurement:
+            # Get all shading groups and their members from selection.
+            assignments = {}
+            for index in self.selectionModel().selectedRows():
+                if not self.tree_model.is_member_index(index):
+                    continue
+                node = self.tree_model.get_shading_group_node(index)
+                if node.hash not in assignments:
+                    assignments[node.hash] = (node.shading_group, [])
+                assignments[node.hash][1].append(self.tree_model.get_member_record(index))
+
+            measurement.item_count = sum(len(records) for shading_group, records in assignments.values())
+
+            # Remove selected members from shading groups.
+            self.is_reconciling = True
+            try:
+                for shading_group, records in assignments.values():
+                    members = scene.get_selection_list_from_records(records)
+                    scene.remove_from_shading_group(members, shading_group)
+                    self.assignment_index.update_shading_group(shading_group)
+                    self.tree_model.reconcile_shading_group(shading_group)
+                self.update_name_filter()
+            finally:
+                self.is_reconciling = False
+
+    def select_empty(self):
+        self.tree_model.fetch_all_shading_groups()
+        selection = QtCore.QItemSelection()
+        for index in self.get_top_level_indexes():
+            node = self.tree_model.get_shading_group_node(index)
+            self.tree_model.load_members(node)
+            if not node.member_records:
+                selection.select(index, index)
+        self.selectionModel().select(selection, QtCore.QItemSelectionModel.ClearAndSelect)
+
+    def select_components(self):
+        selection = QtCore.QItemSelection()
+        for row, component_rows in self.tree_model.get_component_member_rows():
+            index = self.tree_model.index(row, 0)
+            self.tree_model.fetch_all_members(self.tree_model.get_shading_group_node(index))
+            for member_row in component_rows:
+                member_index = self.tree_model.index(member_row, 0, index)
+                selection.select(member_index, member_index)
+
+        self.selection_is_being_propagated = True
+        try:
+            self.selectionModel().select(selection, QtCore.QItemSelectionModel.ClearAndSelect)
+        finally:
+            self.selection_is_being_propagated = False
+        self.selection_synchronizer.push()
+
+    def expand_all(self):
+        self.tree_model.fetch_all_shading_groups()
+        self.expandToDepth(0)
+
+    def collapse_all(self):
+        self.collapseAll()
+
+    def propagate_selection_to_children(self, selected, deselected):
+        """Applies the selection state of shading group rows to all of their fetched member rows.
+        Each shading group contributes a single range, and the ranges are applied without notifying Maya per row."""
+        propagated_selection = QtCore.QItemSelection()
+        propagated_deselection = QtCore.QItemSelection()
+        for source, target in ((selected, propagated_selection), (deselected, propagated_deselection)):
+            for index in source.indexes():
+                if self.tree_model.is_member_index(index):
+                    continue
+                child_count = self.tree_model.rowCount(index)
+                if child_count > 0:
+                    target.select(self.tree_model.index(0, 0, index), self.tree_model.index(child_count - 1, 0, index))
+
+        self.selection_is_being_propagated = True
+        try:
+            if not propagated_deselection.isEmpty():
+                self.selectionModel().select(propagated_deselection, QtCore.QItemSelectionModel.Deselect)
+            if not propagated_selection.isEmpty():
+                self.selectionModel().select(propagated_selection, QtCore.QItemSelectionModel.Select)
+        finally:
+            self.selection_is_being_propagated = False
+
+    def get_selection_names(self):
+        """Returns the node names and member strings of the selected rows.
+        Selected shading groups contribute all of their members, including rows that have not been fetched yet."""
+        names = []
+        selected_rows = self.selectionModel().selectedRows()
+        selected_hashes = set()
+        for index in selected_rows:
+            if self.tree_model.is_member_index(index):
+                continue
+            node = self.tree_model.get_shading_group_node(index)
+            self.tree_model.load_members(node)
+            selected_hashes.add(node.hash)
+            names.append(self.tree_model.get_node_name(node))
+            for record in node.member_records:
+                names.extend(record.get_member_strings())
+        for index in selected_rows:
+            if not self.tree_model.is_member_index(index):
+                continue
+            if self.tree_model.get_shading_group_node(index).hash in selected_hashes:
+                continue
+            names.extend(self.tree_model.get_member_record(index).get_member_strings())
+        return names
+
+    def on_selection_changed(self, selected, deselected):
+        if self.selection_is_being_propagated or self.is_reconciling:
+            return
+        with profiler.measure('tree.on_selection_changed') as measurement:
+            # Propagate selection to children.
+            self.propagate_selection_to_children(selected, deselected)
+            measurement.item_count = len(selected.indexes()) + len(deselected.indexes())
+
+            # Select associated objects and components in Maya once the selection has settled.
+            self.selection_synchronizer.request_push()
+
+    def on_shading_groups_added(self, shading_groups):
+        self.is_reconciling = True
+        try:
+            for shading_group in shading_groups:
+                self.assignment_index.add_shading_group(shading_group)
+                self.tree_model.add_shading_group(shading_group)
+        finally:
+            self.is_reconciling = False
+
+    def on_shading_groups_modified(self, shading_groups):
+        self.is_reconciling = True
+        try:
+            for shading_group in shading_groups:
+                self.assignment_index.update_shading_group(shading_group)
+                self.tree_model.reconcile_shading_group(shading_group)
+            self.update_name_filter()
+        finally:
+            self.is_reconciling = False
+
+    def on_materials_modified(self, shading_groups):
+        self.tree_model.swatch_provider.invalidate_shading_groups(
+            [scene.get_node_hash(shading_group) for shading_group in shading_groups])
+
+    def on_shading_groups_removed(self, shading_group_hashes):
+        self.is_reconciling = True
+        try:
+            for shading_group_hash in shading_group_hashes:
+                self.assignment_index.remove_shading_group(shading_group_hash)
+            self.tree_model.remove_shading_groups(shading_group_hashes)
+        finally:
+            self.is_reconciling = False
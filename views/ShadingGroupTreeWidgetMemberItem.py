@@ -1,7 +0,0 @@
-from PySide2 import QtCore, QtWidgets
-
-
-class ShadingGroupTreeWidgetMemberItem(QtWidgets.QTreeWidgetItem):
-
-    def __init__(self, *args, **kwargs):
-        super(ShadingGroupTreeWidgetMemberItem, self).__init__(*args, **kwargs)
\ No newline at end of file
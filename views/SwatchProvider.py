@@ -0,0 +1,114 @@
+import os
+import timeit
+from collections import OrderedDict
+
+from PySide2 import QtCore, QtGui
+
+from models import scene
+from models import swatches
+from models.profiler import profiler
+
+
+class SwatchProvider(QtCore.QObject):
+    """Provides swatch icons for shading groups without blocking the interface.
+    Views only ask for the icons of the rows they paint, so swatches are only requested for visible rows. A request
+    that misses the memory cache returns a placeholder and is queued, and the queue is worked through across event loop
+    iterations, newest requests first, with rows that have scrolled out of view dropped once it grows too long.
+    Each swatch is loaded from the disk cache, or rendered into it when its material network has changed,
+    and swatch_ready is emitted with the hash of the shading group once its icon is available.
+    Loads from the disk cache share a time budget per iteration, but a render always ends the iteration, since a single
+    render can take longer than the whole budget."""
+
+    swatch_ready = QtCore.Signal(object)
+
+    SWATCH_SIZE = 64
+    MEMORY_CACHE_SIZE = 512
+    MAX_PENDING = 128
+    TIME_BUDGET = 0.01
+
+    def __init__(self, cache_directory=None, parent=None):
+        super(SwatchProvider, self).__init__(parent)
+
+        self.cache_directory = cache_directory or swatches.get_default_cache_directory()
+        self.memory_cache = swatches.LRUCache(self.MEMORY_CACHE_SIZE)
+        self.network_hashes = {}
+        self.pending = OrderedDict()
+
+        placeholder_pixmap = QtGui.QPixmap(self.SWATCH_SIZE, self.SWATCH_SIZE)
+        placeholder_pixmap.fill(QtGui.QColor(80, 80, 80))
+        self.placeholder_icon = QtGui.QIcon(placeholder_pixmap)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.process_pending)
+
+    def get_icon(self, shading_group, shading_group_hash):
+        network_hash = self.network_hashes.get(shading_group_hash)
+        if network_hash is not None:
+            icon = self.memory_cache.get(network_hash)
+            if icon is not None:
+                return icon
+        self.pending.pop(shading_group_hash, None)
+        self.pending[shading_group_hash] = scene.get_node_handle(shading_group)
+        while len(self.pending) > self.MAX_PENDING:
+            self.pending.popitem(last=False)
+        if not self.timer.isActive():
+            self.timer.start()
+        return self.placeholder_icon
+
+    def invalidate(self):
+        """Forgets the network hashes of shading groups, so edited materials are hashed again when next requested.
+        Icons stay cached under the hashes of the networks they were rendered from."""
+        self.network_hashes = {}
+
+    def invalidate_shading_groups(self, shading_group_hashes):
+        """Forgets the network hashes of the given shading groups after their materials were edited, and reports them
+        as ready so that views request their icons again."""
+        for shading_group_hash in shading_group_hashes:
+            if self.network_hashes.pop(shading_group_hash, None) is not None:
+                self.swatch_ready.emit(shading_group_hash)
+
+    def process_pending(self):
+        with profiler.measure('swatches.process_pending') as measurement:
+            deadline = timeit.default_timer() + self.TIME_BUDGET
+            while self.pending and timeit.default_timer() < deadline:
+                shading_group_hash, handle = self.pending.popitem(last=True)
+                shading_group = scene.get_node_from_handle(handle)
+                if shading_group is None:
+                    continue
+                is_rendered = self.load_swatch(shading_group, shading_group_hash)
+                measurement.item_count += 1
+                self.swatch_ready.emit(shading_group_hash)
+                if is_rendered:
+                    break
+        if not self.pending:
+            self.timer.stop()
+
+    def load_swatch(self, shading_group, shading_group_hash):
+        """Puts the icon of a shading group into the memory cache and returns whether a swatch had to be rendered."""
+        network_hash = self.network_hashes.get(shading_group_hash)
+        if network_hash is None:
+            network_hash = swatches.get_network_hash(shading_group, self.SWATCH_SIZE)
+            self.network_hashes[shading_group_hash] = network_hash
+        if network_hash in self.memory_cache:
+            return False
+        is_rendered = not os.path.exists(swatches.get_swatch_path(self.cache_directory, network_hash))
+        try:
+            path = swatches.ensure_swatch(shading_group, self.cache_directory, network_hash, self.SWATCH_SIZE)
+        except (IOError, OSError):
+            path = None
+        # Networks that cannot be rendered keep the placeholder so that they are not rendered again.
+        icon = self.placeholder_icon if path is None else QtGui.QIcon(QtGui.QPixmap(path))
+        self.memory_cache.put(network_hash, icon)
+        return is_rendered
+
+
+session_swatch_provider = None
+
+
+def get_swatch_provider():
+    """Returns the swatch provider of the session, so that swatches stay cached in memory between dialogs."""
+    global session_swatch_provider
+    if session_swatch_provider is None:
+        session_swatch_provider = SwatchProvider()
+    return session_swatch_provider
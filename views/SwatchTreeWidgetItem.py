@@ -0,0 +1,17 @@
+from PySide2 import QtCore, QtWidgets
+
+
+class SwatchTreeWidgetItem(QtWidgets.QTreeWidgetItem):
+    """A shading group item whose swatch icon is only requested from the swatch provider when the item is painted."""
+
+    def __init__(self, shading_group, shading_group_hash, name, swatch_provider):
+        super(SwatchTreeWidgetItem, self).__init__([name])
+
+        self.shading_group = shading_group
+        self.shading_group_hash = shading_group_hash
+        self.swatch_provider = swatch_provider
+
+    def data(self, column, role):
+        if column == 0 and role == QtCore.Qt.DecorationRole:
+            return self.swatch_provider.get_icon(self.shading_group, self.shading_group_hash)
+        return super(SwatchTreeWidgetItem, self).data(column, role)
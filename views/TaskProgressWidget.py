@@ -0,0 +1,52 @@
+from PySide2 import QtWidgets
+
+
+class TaskProgressWidget(QtWidgets.QWidget):
+    """Shows the progress of a chunked task with a button to cancel it, and hides itself once the task ends."""
+
+    def __init__(self, label_text, parent=None):
+        super(TaskProgressWidget, self).__init__(parent)
+
+        self.task = None
+
+        # Create widgets.
+        self.label = QtWidgets.QLabel(label_text)
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setFormat('%v / %m')
+        self.btn_cancel = QtWidgets.QPushButton('Cancel')
+
+        # Create layouts.
+        self.main_layout = QtWidgets.QHBoxLayout()
+        self.main_layout.setContentsMargins(0, 0, 0, 0)
+        self.main_layout.addWidget(self.label)
+        self.main_layout.addWidget(self.progress_bar)
+        self.main_layout.addWidget(self.btn_cancel)
+        self.setLayout(self.main_layout)
+
+        # Create connections.
+        self.btn_cancel.clicked.connect(self.on_cancel_clicked)
+
+        self.hide()
+
+    def watch(self, task):
+        if self.task is not None:
+            self.task.progressed.disconnect(self.on_progressed)
+            self.task.finished.disconnect(self.on_task_ended)
+            self.task.cancelled.disconnect(self.on_task_ended)
+        self.task = task
+        self.task.progressed.connect(self.on_progressed)
+        self.task.finished.connect(self.on_task_ended)
+        self.task.cancelled.connect(self.on_task_ended)
+        self.on_progressed(task.position, task.get_total())
+        self.setVisible(task.is_running)
+
+    def on_progressed(self, position, total):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(position)
+
+    def on_task_ended(self):
+        self.hide()
+
+    def on_cancel_clicked(self):
+        if self.task is not None:
+            self.task.cancel()